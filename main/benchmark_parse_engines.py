@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""Compares the csv parse engines on the long unittest files.
+
+Each recorder loads its file from scratch with every available engine. The best of several repetitions is reported,
+together with the speedup of pyarrow with respect to the C engine. Run from the root of the repository:
+
+    python main/benchmark_parse_engines.py
+"""
+
+import os
+import time
+
+from data_eng_utokyo.recorders import (
+    SSDRecorder,
+    PMTRecorder,
+    CoilRecorder,
+    GaugeRecorder,
+    LaserRecorder,
+    IonRecorder,
+    HeaterRecorder,
+)
+from data_eng_utokyo._utilities.csv_engine import is_pyarrow_available
+from data_eng_utokyo._utilities.general_constants import unittest_long_loc as loc
+
+
+def time_initial_load(SpecialRecorder, filepath: str, engine: str, repetitions: int) -> tuple:
+    """Returns the best time in seconds for loading the full table and the number of rows.
+    """
+    best_s = float("inf")
+    for _ in range(repetitions):
+        recorder = SpecialRecorder(filepath=filepath)
+        recorder.parse_engine = engine
+        start_s = time.perf_counter()
+        df = recorder.get_table()
+        best_s = min(best_s, time.perf_counter() - start_s)
+    return best_s, len(df.index)
+
+
+if __name__ == '__main__':
+
+    # Input
+    repetitions = 5
+    engines = ["c", "python"] + (["pyarrow"] if is_pyarrow_available() else [])
+    recorders = [
+        (SSDRecorder, loc.ssd),
+        (PMTRecorder, loc.pmt),
+        (CoilRecorder, loc.coil),
+        (GaugeRecorder, loc.gauge),
+        (LaserRecorder, loc.laser),
+        (IonRecorder, loc.ion),
+        (HeaterRecorder, loc.heater),
+        ]
+
+    if not is_pyarrow_available():
+        print("pyarrow is not installed, only the pandas engines are compared.")
+    speedup_header = f"{'Speedup':>10}" if "pyarrow" in engines else ""
+    print(f"{'Recorder':<16}{'Rows':>8}" + "".join(f"{engine + ' [ms]':>16}" for engine in engines) + speedup_header)
+
+    # Benchmark
+    for SpecialRecorder, filepath in recorders:
+        if not os.path.exists(filepath):
+            continue
+        times_s = {}
+        for engine in engines:
+            times_s[engine], nr_rows = time_initial_load(SpecialRecorder, filepath, engine, repetitions)
+        speedup = f"{times_s['c'] / times_s['pyarrow']:>9.2f}x" if "pyarrow" in engines else ""
+        print(f"{SpecialRecorder.__name__:<16}{nr_rows:>8}"
+              + "".join(f"{1000 * times_s[engine]:>16.1f}" for engine in engines)
+              + speedup)
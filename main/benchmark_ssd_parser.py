@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""Compares the numpy parser for the WE7000 list mode with the pandas csv parser.
+
+The data lines of the long SSD unittest file are repeated until the file has the requested number of pulses, behind
+the original header block. Both parsers read the full file; the numpy parser through an mmap. The best of two
+repetitions is reported. The scaled file is written to a temporary folder and deleted afterwards. Run from the root
+of the repository:
+
+    python main/benchmark_ssd_parser.py [number of pulses, default 1e8]
+
+Note that 1e8 pulses are about 2 GB on disk.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from data_eng_utokyo._utilities.general_constants import unittest_long_loc as loc
+from data_eng_utokyo._utilities.we7000_parser import parse_list_mode_file
+
+header_lines = 38
+
+
+def write_scaled_file(filepath: str, nr_of_pulses: int):
+    """Writes the header block of the SSD unittest file followed by nr_of_pulses repeated data lines.
+    """
+    with open(loc.ssd, "rb") as f:
+        lines = f.readlines()
+    header, body = b"".join(lines[:header_lines]), lines[header_lines:]
+    repetitions, rest = divmod(nr_of_pulses, len(body))
+    body_bytes = b"".join(body)
+    with open(filepath, "wb") as f:
+        f.write(header)
+        for _ in range(repetitions):
+            f.write(body_bytes)
+        f.write(b"".join(body[:rest]))
+
+
+def parse_with_pandas(filepath: str) -> pd.DataFrame:
+    return pd.read_csv(
+        filepath,
+        engine="c",
+        skiprows=header_lines,
+        header=None,
+        names=["TraceName", "Time_x", "PulseHeight"],
+        dtype={"TraceName": "int64", "Time_x": "int64", "PulseHeight": "int16"}
+        )
+
+
+def time_parser(parse: callable, filepath: str, repetitions: int) -> tuple:
+    """Returns the best time in seconds and a checksum of the parsed table.
+    """
+    best_s = float("inf")
+    for _ in range(repetitions):
+        start_s = time.perf_counter()
+        df = parse(filepath)
+        best_s = min(best_s, time.perf_counter() - start_s)
+    checksum = [len(df.index)] + [int(df[column].sum()) for column in df.columns]
+    return best_s, checksum
+
+
+if __name__ == '__main__':
+
+    # Input
+    nr_of_pulses = int(float(sys.argv[1])) if len(sys.argv) > 1 else int(1e8)
+    repetitions = 2
+
+    with tempfile.TemporaryDirectory() as folder:
+        filepath = os.path.join(folder, "ssd_scaled.csv")
+        write_scaled_file(filepath, nr_of_pulses)
+        size_mb = os.path.getsize(filepath) / 1e6
+        print(f"{nr_of_pulses} pulses, {size_mb:.0f} MB")
+
+        # Benchmark
+        numpy_s, numpy_checksum = time_parser(
+            lambda fp: parse_list_mode_file(fp, header_lines=header_lines), filepath, repetitions)
+        pandas_s, pandas_checksum = time_parser(parse_with_pandas, filepath, repetitions)
+        assert numpy_checksum == pandas_checksum, "The parsers disagree."
+
+    print(f"{'Parser':<10}{'Time [s]':>10}{'MB/s':>10}")
+    for name, seconds in (("pandas", pandas_s), ("numpy", numpy_s)):
+        print(f"{name:<10}{seconds:>10.2f}{size_mb / seconds:>10.0f}")
+    print(f"Speedup: {pandas_s / numpy_s:.2f}x")
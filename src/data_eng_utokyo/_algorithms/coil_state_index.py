@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""Tags timestamps with the state of the MOT coil.
+
+The CoilRecorder yields the log of the relay switch, one row per switching
+operation. The CoilStateIndex keeps the times at which the state changed in a
+sorted array, such that the state at any timestamp is found by binary search.
+Tagging n timestamps costs O(n log m) for m switches and is vectorized, which
+allows to split millions of SSD pulses into coil on and coil off without a
+merge. The index is extended with the new rows of the recorder on each
+refresh.
+
+Example:
+    .. code:: python
+
+        coil_index = CoilStateIndex(CoilRecorder(filepath=coil_file))
+        ssd_df = coil_index.tag(ssd_recorder.get_table())
+        on_df = ssd_df[ssd_df["coil_state"] == CoilStateIndex.on]
+"""
+
+import numpy as np
+import pandas as pd
+
+from .._utilities.column_store import ColumnStore
+
+
+class CoilStateIndex(object):
+    """ Intervals of constant coil state, built incrementally from a
+        CoilRecorder.
+
+    Args:
+        recorder (CoilRecorder): Recorder of the relay log.
+
+    Attributes:
+        recorder (CoilRecorder): Recorder of the relay log.
+    """
+
+    on = 1
+    off = 0
+    unknown = -1   # Before the first logged operation
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+        self._switches = ColumnStore()   # timestamp and state of each change of state
+        self._nr_rows = 0                # Number of consumed rows of the recorder
+        self._last_row = None            # Timestamp and operation of the last consumed row
+        self._start_of_last_ts = 0       # Number of consumed rows before the timestamp of the last row
+
+    def refresh(self):
+        """Adds the operations which were logged since the last refresh.
+
+        The last consumed row may be a provisional row of an unfinished line,
+        which the recorder replaces or drops later. In this case the index is
+        rebuilt from the timestamp of this row.
+        """
+        df = self.recorder.get_table(copy=False)
+        timestamps = df["timestamp"].to_numpy()
+        operations = df["CoilOperation"].to_numpy(dtype=object)
+        start = self._get_first_new_row(timestamps, operations)
+        if start == len(timestamps) == self._nr_rows:
+            return
+        if len(timestamps) == 0:
+            self._reset()
+            return
+        if start < len(timestamps):
+            self._add_operations(timestamps[start:], self._to_states(operations[start:]))
+        self._nr_rows = len(timestamps)
+        self._last_row = (timestamps[-1], operations[-1])
+        self._start_of_last_ts = np.searchsorted(timestamps, timestamps[-1], side="left")
+
+    def get_states(self, timestamps) -> np.ndarray:
+        """Returns the coil state at each timestamp.
+
+        Args:
+            timestamps (np.ndarray): Timestamps in ns, in any order.
+
+        Returns:
+            Numpy array with dtype int8: CoilStateIndex.on, off or unknown.
+        """
+        self.refresh()
+        positions = self._get_positions(timestamps)
+        states = np.full(len(positions), self.unknown, dtype=np.int8)
+        known = positions >= 0
+        states[known] = self._switches.column("state")[positions[known]]
+        return states
+
+    def get_time_since_switch(self, timestamps) -> np.ndarray:
+        """Returns the time since the last change of the coil state.
+
+        Args:
+            timestamps (np.ndarray): Timestamps in ns, in any order.
+
+        Returns:
+            Numpy array with the time in seconds, NaN before the first
+            operation.
+        """
+        self.refresh()
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        positions = self._get_positions(timestamps)
+        time_since_switch = np.full(len(positions), np.nan)
+        known = positions >= 0
+        switch_ts = self._switches.column("timestamp")[positions[known]]
+        time_since_switch[known] = (timestamps[known] - switch_ts) / 1e9
+        return time_since_switch
+
+    def tag(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Adds the columns coil_state and time_since_coil_switch_s.
+
+        Args:
+            df (pd.DataFrame): Table with a timestamp column, e.g. of the
+                SSDRecorder.
+
+        Returns:
+            New pandas dataframe.
+        """
+        timestamps = df["timestamp"].to_numpy()
+        return df.assign(
+            coil_state=self.get_states(timestamps),
+            time_since_coil_switch_s=self.get_time_since_switch(timestamps)
+            )
+
+    def _reset(self):
+        self._switches = ColumnStore()
+        self._nr_rows = 0
+        self._last_row = None
+        self._start_of_last_ts = 0
+
+    def _get_first_new_row(self, timestamps: np.ndarray, operations: np.ndarray) -> int:
+        """Position of the first row of the recorder which is not in the index
+        yet. Drops the changes of state which came from replaced or dropped
+        rows at the end of the log.
+        """
+        nr_rows = self._nr_rows
+        if nr_rows == 0:
+            return 0
+        if nr_rows <= len(timestamps) and (timestamps[nr_rows - 1], operations[nr_rows - 1]) == self._last_row:
+            return nr_rows
+        last_ts = self._last_row[0]
+        start = np.searchsorted(timestamps, last_ts, side="left")
+        if start != self._start_of_last_ts:
+            # The log was replaced: Build the index from scratch
+            self._reset()
+            return 0
+        # The last rows were replaced or dropped: Rebuild the index from their timestamp
+        switch_timestamps = self._switches.column("timestamp")
+        self._switches.drop_tail(len(switch_timestamps) - np.searchsorted(switch_timestamps, last_ts, side="left"))
+        return start
+
+    def _to_states(self, operations: np.ndarray) -> np.ndarray:
+        """Maps the logged operations to on and off, and any other entry to
+        unknown.
+        """
+        states = np.full(len(operations), self.unknown, dtype=np.int8)
+        states[operations == "ON"] = self.on
+        states[operations == "OFF"] = self.off
+        return states
+
+    def _add_operations(self, timestamps: np.ndarray, states: np.ndarray):
+        """Appends the operations which change the state. Repeated operations,
+        e.g. two ON in a row, do not start a new interval.
+        """
+        previous_state = self._switches.column("state")[-1] if len(self._switches) > 0 else self.unknown
+        is_change = states != np.concatenate([[previous_state], states[:-1]])
+        self._switches.append(pd.DataFrame({"timestamp": timestamps[is_change], "state": states[is_change]}))
+
+    def _get_positions(self, timestamps) -> np.ndarray:
+        """Position of the last change at or before each timestamp, -1 before
+        the first change.
+        """
+        if len(self._switches) == 0:
+            return np.full(len(timestamps), -1, dtype=np.int64)
+        return np.searchsorted(self._switches.column("timestamp"), timestamps, side="right") - 1
@@ -37,6 +37,25 @@ class PeakFinder(object):
         self.nr_of_pulses = 0               # [1]
         self.background = 0                 # [1/ns]
     
+    def get_state(self) -> dict: 
+        """ Returns the bookkeeping and background estimation, such that the 
+            search can be continued after a restart. 
+        """
+        return {
+            "processed_up_to": self.processed_up_to,
+            "start_timestamp": self.start_timestamp,
+            "nr_of_pulses": self.nr_of_pulses,
+            "background": self.background,
+            }
+    
+    def set_state(self, state: dict): 
+        """ Restores a state as returned by get_state(). 
+        """
+        self.processed_up_to = state["processed_up_to"]
+        self.start_timestamp = state["start_timestamp"]
+        self.nr_of_pulses = state["nr_of_pulses"]
+        self.background = state["background"]
+        
     def get_new_peaks(self, df) -> list: 
         """ Loads the new data, estimates the background, finds the peaks and
             returns them. 
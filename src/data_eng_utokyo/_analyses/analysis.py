@@ -43,7 +43,7 @@ class Analysis(object):
         if self.is_up_to_date():
             print(f"\n{self.name}: No new data -> Stop analysis")
             return
-        df = self.recorder.get_table()
+        df = self._get_table()
         df = self._query_df(df)
         self.last_updated = self.recorder.last_updated
         if len(df.index) == 0: 
@@ -52,6 +52,22 @@ class Analysis(object):
         print(f"\n{self.name}: New data -> Run analysis")
         return self._run_analysis(df)
     
+    def get_state(self) -> dict: 
+        """ Returns everything needed to continue the analysis after a restart. """
+        return {
+            "last_updated": self.last_updated,
+            "recorder": self.recorder.get_state()
+            }
+    
+    def set_state(self, state: dict): 
+        """ Restores a state as returned by get_state(). """
+        self.recorder.set_state(state["recorder"])
+        self.last_updated = state["last_updated"]
+    
+    def get_filepaths(self) -> list: 
+        """ Files and folders whose changes require to run the analysis again. """
+        return [self.recorder.filepath] if self.recorder.filepath else []
+    
     def is_up_to_date(self): 
         return all((
             self.recorder.is_up_to_date(),
@@ -68,6 +84,12 @@ class Analysis(object):
         else: 
             new_result_df.to_csv(self.result_filepath, mode="w", index=False, header=True)
        
+    def _get_table(self) -> pd.DataFrame: 
+        """ Loads the table from the recorder. Overwrite to load just a time range. 
+            The table is not copied and shares memory with the recorder: Copy it before modifying it. 
+        """
+        return self.recorder.get_table(copy=False)
+    
     @abstractmethod
     def _query_df(self, df: pd.DataFrame) -> pd.DataFrame(): 
         """ Narrows down the rows on which we want to perform the analysis. 
@@ -103,7 +125,8 @@ class Analysis(object):
         plt.hist2d(x, y, bins=(nx, ny), range=None, density=False, weights=None, cmin=None, cmax=None)
         
         # Add descriptions
-        plt.title(f"2D Histogram of {y_column} against {x_column}" + (f": {title_addition}." if title_addition else "."))
+        plt.title(f"2D Histogram of {y_column} against {x_column}" 
+                  + (f": {title_addition}." if title_addition else "."))
         ax.set_xlabel(x_column) 
         ax.set_ylabel(y_column) 
         
@@ -112,7 +135,7 @@ class Analysis(object):
     def _plot_1d_hist(self, x_column: str, bin_nr: int=100): 
         
         # Load data
-        ssd_df = self.recorder.get_table()
+        ssd_df = self.recorder.get_table(copy=False)
         x = ssd_df[x_column]
         
         # Prepare parameters
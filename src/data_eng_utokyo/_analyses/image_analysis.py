@@ -70,6 +70,17 @@ class ImageAnalysis(Analysis):
         self.min_signal = min_signal
         self.was_run_before = False
         
+    def get_state(self) -> dict: 
+        """Adds whether the analysis was run before to the state of the Analysis.
+        """
+        state = super(ImageAnalysis, self).get_state()
+        state["was_run_before"] = self.was_run_before
+        return state
+    
+    def set_state(self, state: dict): 
+        super(ImageAnalysis, self).set_state(state)
+        self.was_run_before = state["was_run_before"]
+        
     def is_up_to_date(self): 
         """Tells if the analysis was already run with the most recent data available.
 
@@ -85,17 +96,23 @@ class ImageAnalysis(Analysis):
             self.last_updated == self.recorder.last_updated
             ))
         
-    def _query_df(self, df: pd.DataFrame) -> pd.DataFrame():
-        """Gets the rows of the dataframe which have a time in the interval provided in self.time_interval.
+    def _get_table(self) -> pd.DataFrame:
+        """Gets the rows of the table which have a time in the interval provided in self.time_interval.
 
         Returns:
-            Sliced pandas dataframe.
+            Sliced pandas dataframe, which shares memory with the recorder, see Analysis._get_table().
         """
         if self.time_interval is None:
-            return df
-        start = self.time_interval[0]
-        stop = self.time_interval[1]
-        return df[(start <= df.datetime) & (df.datetime <= stop)]
+            return self.recorder.get_table(copy=False)
+        return self.recorder.get_table(start=self.time_interval[0], end=self.time_interval[1], copy=False)
+
+    def _query_df(self, df: pd.DataFrame) -> pd.DataFrame():
+        """The time interval is already applied in _get_table().
+
+        Returns:
+            Pandas dataframe.
+        """
+        return df
         
     def _run_analysis(self, df: pd.DataFrame): 
         """Runs the fit_mot_number algorithm on all images, saves the images and saves the fit result in a new table.
@@ -147,6 +164,8 @@ class ImageAnalysis(Analysis):
         new_columns = ["A", "A_unc", "sigma_x", "sigma_x_unc", "sigma_y", 
                        "sigma_y_unc", "mu_x", "mu_x_unc", "mu_y", "mu_y_unc", 
                        "C", "C_unc", "X-squared", "p-value", "R^2", "signal_sum"]
-        enriched_rows = [list(row) + [(stat[col] if stat["fit_successful"] else None) for col in new_columns] + [stat["fit_successful"]]\
+        enriched_rows = [list(row) 
+                         + [(stat[col] if stat["fit_successful"] else None) for col in new_columns] 
+                         + [stat["fit_successful"]] 
                          for (i, row), stat in zip(df.iterrows(), statistics_list)]
         return pd.DataFrame(data=enriched_rows, columns=columns + new_columns + ["fit_successful"])
@@ -1,16 +1,89 @@
 # -*- coding: utf-8 -*-
 """Runs a collection of analyses.
+
+By default, the runner wakes up every period_s seconds and runs all analyses. 
+If a FileWatcher is passed, the runner sleeps until the files of an analysis 
+change and then just runs the analyses whose files changed. 
+
+With a checkpoint_path, the state of all analyses (read cursors of the 
+recorders, peak finders, queues) is saved every checkpoint_every cycles and 
+restored when the runner is started again, such that a restart does not 
+reprocess the full data. The tables are not checkpointed, the recorders 
+restore them from their cache or from the csv files. 
 """
 
+import os
+import pickle
 import time
 
 
 class Runner(object): 
+    """Runs a collection of analyses repeatedly.
+    
+    Args: 
+        analyses (list): Analyses, e.g. SSDAnalysisWrapper or ImageAnalysis.
+        checkpoint_path (str): File in which the state of the analyses is 
+            saved. No checkpoints are saved if None.
+        checkpoint_every (int): Number of cycles between two checkpoints.
+    """
     
-    def __init__(self, analyses): 
+    def __init__(self, analyses, checkpoint_path: str=None, checkpoint_every: int=10): 
         self.analyses = analyses
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every
+        
+    def run(self, cycles: int=100, period_s: int=5, watcher=None): 
+        """Runs the analyses repeatedly.
+        
+        Args: 
+            cycles (int): Number of times the runner wakes up.
+            period_s (int): Time between two executions in seconds. With a 
+                watcher, this is the maximal time to wait for a change.
+            watcher (FileWatcher): Optional watcher, e.g. created with 
+                create_file_watcher(). Analyses only run when their files changed.
+        """
+        if self.checkpoint_path is not None: 
+            self.load_checkpoint()
+        if watcher is not None: 
+            self._run_on_change(cycles, period_s, watcher)
+        else: 
+            self._run_periodically(cycles, period_s)
+        if self.checkpoint_path is not None: 
+            self.save_checkpoint()
+        return 
+    
+    def save_checkpoint(self): 
+        """Saves the state of all analyses atomically to checkpoint_path.
+        """
+        states = [analysis.get_state() for analysis in self.analyses]
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "wb") as f: 
+            pickle.dump({"nr_of_analyses": len(states), "states": states}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+        
+    def load_checkpoint(self) -> bool: 
+        """Restores the state of all analyses from checkpoint_path.
         
-    def run(self, cycles: int=100, period_s: int=5): 
+        Returns: 
+            Whether a checkpoint was found and restored.
+        """
+        if not os.path.exists(self.checkpoint_path): 
+            return False
+        with open(self.checkpoint_path, "rb") as f: 
+            checkpoint = pickle.load(f)
+        if checkpoint["nr_of_analyses"] != len(self.analyses): 
+            print("Checkpoint does not match the analyses -> Start from the beginning")
+            return False
+        for analysis, state in zip(self.analyses, checkpoint["states"]): 
+            analysis.set_state(state)
+        return True
+    
+    def next_execution(self, start, period_s, i):
+        return start + period_s * i
+    
+    def _run_periodically(self, cycles: int, period_s: int): 
         last = time.time()
         start = time.time()
         for i in range(cycles):
@@ -19,11 +92,47 @@ class Runner(object):
                 
             for analyses in self.analyses: 
                 analyses.run()
+            self._checkpoint_if_due(i)
                 
             print("Time between executations:", "%.2f" % round(time.time() - last, 2), "s")
             last = time.time()
-                
-        return 
     
-    def next_execution(self, start, period_s, i):
-        return start + period_s * i
+    def _run_on_change(self, cycles: int, period_s: int, watcher): 
+        """Runs each analysis once and afterwards only when its files changed.
+        
+        Note: 
+            Analyses which are not up to date after running (e.g. the SSD
+            analyses, which process large files in chunks) are run again 
+            without waiting.
+        """
+        self._subscribe(watcher)
+        pending = list(self.analyses)
+        for i in range(cycles): 
+            for analysis in pending: 
+                analysis.run()
+            self._subscribe(watcher)
+            self._checkpoint_if_due(i)
+            
+            # Wait for changes if all analyses caught up
+            pending = [analysis for analysis in self.analyses if not analysis.is_up_to_date()]
+            if not pending: 
+                changed_paths = watcher.wait(timeout=period_s)
+                pending = [analysis for analysis in self.analyses 
+                           if changed_paths & self._get_filepaths(analysis)]
+        return
+    
+    def _checkpoint_if_due(self, i: int): 
+        if self.checkpoint_path is not None and (i + 1) % self.checkpoint_every == 0: 
+            self.save_checkpoint()
+    
+    def _subscribe(self, watcher): 
+        """Subscribes the files of all analyses. Files can be added over time."""
+        for analysis in self.analyses: 
+            for filepath in self._get_filepaths(analysis): 
+                watcher.subscribe(filepath)
+                
+    def _get_filepaths(self, analysis) -> set: 
+        get_filepaths = getattr(analysis, "get_filepaths", None)
+        if get_filepaths is None: 
+            return set()
+        return {os.path.abspath(filepath) for filepath in get_filepaths()}
@@ -19,7 +19,7 @@ import datetime as dt
 import queue
 
 from .._recorders.ssd_recorder import SSDRecorder, SSDParser
-from .._recorders.file_recorder import FileParser
+from .._utilities.ssd_file_catalog import SSDFileCatalog
 from .analysis import Analysis, ResultParameter
 from .._algorithms.peak_finder import PeakFinder
 from .mkdir import mkdir_if_not_exist
@@ -57,6 +57,35 @@ class SSDAnalysis(Analysis):
         self.run_nr = 0
         self.result_df = None
     
+    def get_state(self) -> dict: 
+        state = super(SSDAnalysis, self).get_state()
+        state.update({
+            "peak_finder": self.peak_finder.get_state(),
+            "peak_nr": self.peak_nr,
+            "run_nr": self.run_nr,
+            "result_df": self.result_df
+            })
+        return state
+    
+    def set_state(self, state: dict): 
+        super(SSDAnalysis, self).set_state(state)
+        self.peak_finder.set_state(state["peak_finder"])
+        self.peak_nr = state["peak_nr"]
+        self.run_nr = state["run_nr"]
+        self.result_df = state["result_df"]
+    
+    def run_all(self): 
+        """ Analyzes all pulses which were not analyzed yet, chunk by chunk in one pass through the file. 
+            Requires a SSDParser. 
+        """
+        for chunk_df in self.recorder.iter_chunks(): 
+            self.last_updated = self.recorder.last_updated
+            df = self._query_df(chunk_df)
+            if len(df.index) > 0: 
+                print(f"\n{self.name}: New data -> Run analysis")
+                self._run_analysis(df)
+        return self.result_df
+    
     def _run_analysis(self, df: pd.DataFrame):
         # 2D Histogram of PulsHeight vs Timestamp [Full view]
         fig = self._plot_2d_hist(
@@ -166,7 +195,11 @@ class SSDAnalysisWrapper(object):
 
     Solves the problem that we have many ssd csv file and not just one. 
     Keeps track of the csv files that match a certain pattern in a certain 
-    timespan and applies the SSDAnalysis on them 1 by 1. 
+    timespan and applies the SSDAnalysis on them 1 by 1. The timespan of a 
+    file is taken from the start and stop time in its header, which the 
+    SSDFileCatalog stores such that the data lines are never read for it. 
+    Files are analyzed in the order of their start time. With a catalog_path, 
+    the catalog is saved and the headers are not read again after a restart. 
     
     Implements the same public methods as the Analysis class, such that it can
     be used in Runner.
@@ -195,16 +228,19 @@ class SSDAnalysisWrapper(object):
                  time_interval: tuple=(
                      dt.datetime(2000, 1, 1, 12, 0, 0), 
                      dt.datetime(2030, 1, 1, 12, 0, 0)
-                     )): 
-        self.filepath_recorder = FileParser(
-            filepath=folder, 
-            match=match
+                     ),
+                 catalog_path: str=None): 
+        self.catalog = SSDFileCatalog(
+            folder=folder, 
+            match=match,
+            catalog_path=catalog_path
             )
         self.result_path = result_path
         self.plot_path = plot_path
         self.image_extension = image_extension
         self.time_interval = time_interval
         self.filepath_queue = queue.Queue()
+        self.filepath_set = set()
         self.active_analysis = None
 
     def run(self): 
@@ -221,7 +257,19 @@ class SSDAnalysisWrapper(object):
         
         # Get filepath 
         filepath = self.filepath_queue.get()
+        self.active_analysis = self._create_analysis(filepath)
+        self.active_analysis.run()
         
+    def run_all(self): 
+        """ Analyzes the active file and all files in the queue completely, each in one pass. """
+        self._update()
+        while self.active_analysis is not None or not self.filepath_queue.empty(): 
+            if self.active_analysis is None: 
+                self.active_analysis = self._create_analysis(self.filepath_queue.get())
+            self.active_analysis.run_all()
+            self.active_analysis = None
+        
+    def _create_analysis(self, filepath: str) -> SSDAnalysis: 
         # Create parameters and folders
         image_extension=self.image_extension
         result_filepath = self.result_path
@@ -230,44 +278,66 @@ class SSDAnalysisWrapper(object):
         mkdir_if_not_exist(self.plot_path + f"{os.path.basename(filepath)}/")
         mkdir_if_not_exist(image_src)
         
-        # Run analysis
+        # Create analysis
         result_param = ResultParameter(
             image_src=image_src, 
             image_extension=image_extension,
             result_filepath=result_filepath+"ssd_analysis_results.csv"
             )
-        self.active_analysis = SSDAnalysis(
+        return SSDAnalysis(
             recorder=SSDParser(filepath),
             result_param=result_param
             )
-        self.active_analysis.run()
+        
+    def get_state(self) -> dict: 
+        """ Returns the queue, the active analysis and the known filepaths. """
+        active = self.active_analysis
+        return {
+            "filepaths": sorted(self.filepath_set),
+            "filepath_queue": list(self.filepath_queue.queue),
+            "active_filepath": None if active is None else active.recorder.filepath,
+            "active_analysis": None if active is None else active.get_state()
+            }
+    
+    def set_state(self, state: dict): 
+        """ Restores a state as returned by get_state(). """
+        self.filepath_set = set(state["filepaths"])
+        self.filepath_queue = queue.Queue()
+        for filepath in state["filepath_queue"]: 
+            self.filepath_queue.put(filepath)
+        self.active_analysis = None
+        if state["active_filepath"] is not None: 
+            self.active_analysis = self._create_analysis(state["active_filepath"])
+            self.active_analysis.set_state(state["active_analysis"])
         
     def is_up_to_date(self): 
         return self.filepath_queue.empty() and self.active_analysis == None
     
+    def get_filepaths(self): 
+        """ The folder with the csv files and the file which is analyzed at the moment. """
+        filepaths = [self.catalog.folder]
+        if self.active_analysis is not None: 
+            filepaths += self.active_analysis.get_filepaths()
+        return filepaths
+    
     def _update(self): 
         self._add_to_queue()
         
     def _add_to_queue(self): 
-        # Check if necessary
-        if self.filepath_recorder.is_up_to_date(): 
-            return
-        
-        # Load new filepaths
-        df = self.filepath_recorder.get_table()
-        
-        # Select filepaths from the right time
-        start = self.time_interval[0]
-        stop = self.time_interval[1]
-        df = df[(start <= df.datetime) & (df.datetime <= stop)]
+        # Read the headers of new files only
+        self.catalog.update()
         
-        # Stop if there are no new filepaths
-        if len(df.index) == 0: 
-            return 
+        # Files which overlap with the time interval, sorted by start time
+        df = self.catalog.query(
+            start=self.time_interval[0],
+            end=self.time_interval[1]
+            )
         
-        # Add filepaths to queue
+        # Add new filepaths to queue
         for filepath in df["filepath"]: 
-            self.filepath_queue.put(filepath)
+            if filepath not in self.filepath_set: 
+                self.filepath_set.add(filepath)
+                self.filepath_queue.put(filepath)
     
     
 if __name__ == '__main__': 
@@ -5,10 +5,10 @@ The current of the MOT coil is controlled by a relay switch. This text file is
 the log of the relay switch. 
 """
 
-import numpy as np
 import pandas as pd
 
 from .recorder import Recorder
+from .._utilities.time_conversion import parse_timestamps, add_time_columns
 
 
 class CoilRecorder(Recorder): 
@@ -21,6 +21,8 @@ class CoilRecorder(Recorder):
         filepath (str): Path to the text file.
         always_update (bool): Should the recorder always check for new data.
     """
+    
+    coil_states = ["ON", "OFF"]
        
     def __init__(self, filepath: str, always_update: bool=False):
         super(CoilRecorder, self).__init__(
@@ -29,9 +31,20 @@ class CoilRecorder(Recorder):
             delimiter="	",
             always_update=always_update
             )
+        self.time_format = "%Y/%m/%d %H:%M:%S"  # Time: 2022/03/14 12:09:23
+        self.schema = {"Time": "str", "CoilOperation": "category"}
+        # The relay log writes the line break before each entry, such that
+        # the newest entry is only finished by the next one
+        self.parse_partial_line = True
+        
+    def _is_valid_partial_row(self, table_df: pd.DataFrame) -> bool: 
+        """An unfinished entry is only added once it names a full state, 
+        e.g. not for "OF".
+        """
+        return super(CoilRecorder, self)._is_valid_partial_row(table_df) \
+            and table_df["CoilOperation"].isin(self.coil_states).all()
     
-    def _harmonize_time(self): 
+    def _harmonize_time(self, df: pd.DataFrame): 
         """Reads the time from the text file and adds it to the table.
         """
-        self._table_df["datetime"] = self._table_df["Time"]
-        self._table_df["timestamp"] = self._table_df["Time"].apply(pd.Timestamp).values.astype(np.int64)
+        add_time_columns(df, parse_timestamps(df["Time"], self.time_format))
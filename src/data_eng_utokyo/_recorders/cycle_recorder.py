@@ -1,27 +1,298 @@
 # -*- coding: utf-8 -*-
 """Combines all results of an analysis cycle.
 
-The CycleRecorder combines all results of a cycle, namely 
+The CycleRecorder combines all results of a cycle, namely
 
 - Image data (MOT number via MLE)
-- SSD data (MOT number via peak) 
-- Cycle data (Parameters which were set) 
+- SSD data (MOT number via peak)
+- Cycle data (Parameters which were set)
 
 The recorder can then by used in the CycleAnalysis, which allows us to explore
-dependencies of the MOT number. 
+dependencies of the MOT number.
 
-Todo: 
-    * Implement the CycleRecorder.
+Each row of the left recorder (e.g. the ParameterRecorder, one row per cycle)
+is matched with the row of each right recorder whose timestamp is closest in
+the given direction, like pd.merge_asof. The join is streaming: On a refresh,
+only the rows which arrived since the last refresh are joined. A joined row is
+final as soon as every right recorder has a row after it (the watermark),
+because later rows of the right recorders cannot change its match anymore.
+A right recorder which is empty or stalled does not hold back the join
+forever: A row is also final once the left recorder is max_delay_s ahead of
+it. Final rows are stored, the few newest rows which are not final yet are joined
+again on the next refresh.
+
+Note:
+    The streaming join assumes that every recorder appends its rows in the
+    order of their timestamps, which is the case for log files.
+
+Example:
+    .. code:: python
+
+        cycle_recorder = CycleRecorder(
+            left=parameter_recorder,
+            right={"ssd": ssd_results_recorder, "image": image_results_recorder},
+            tolerance_s=5,
+            direction="nearest"
+            )
+        df = cycle_recorder.get_table()   # Columns e.g. Time, ssd_N, image_N
 """
 
-from .recorder import Recorder
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .._utilities.column_store import ColumnStore
+from .._utilities.time_conversion import to_timestamp
+
+
+class CycleRecorder(object):
+    """ Tracks all results and combines them into one dataframe.
+
+    Args:
+        left (Recorder): Recorder with one row per cycle.
+        right (dict): Recorders whose rows are matched to the cycles, by a
+            name which is used as prefix of their columns.
+        tolerance_s (float): Maximal time between a cycle and its match in
+            seconds. Rows without match within the tolerance get missing
+            values. No limit if None.
+        direction (str): "backward" matches the last row at or before the
+            cycle, "forward" the first row at or after the cycle and
+            "nearest" the closest row.
+        max_delay_s (float): Time after which a cycle is final even if a
+            right recorder has no row after it yet, e.g. because it is empty
+            or stalled, measured on the timestamps of the left recorder.
+            Rows which arrive later do not change final rows anymore. No
+            limit if None.
+
+    Attributes:
+        left (Recorder): Recorder with one row per cycle.
+        right (dict): Recorders whose rows are matched to the cycles.
+        tolerance_s (float): Maximal time between a cycle and its match in
+            seconds.
+        direction (str): One of "backward", "forward" and "nearest".
+        max_delay_s (float): Time after which a cycle is final in seconds.
+        last_updated (tuple): last_updated of all recorders at the last
+            refresh.
+    """
+
+    directions = ("backward", "forward", "nearest")
+
+    def __init__(self, left, right: dict, tolerance_s: float=None, direction: str="backward",
+                 max_delay_s: float=600):
+        if direction not in self.directions:
+            raise ValueError(f"Unknown direction {direction}, choose one of {self.directions}.")
+        self.left = left
+        self.right = dict(right)
+        self.tolerance_s = tolerance_s
+        self.direction = direction
+        self.max_delay_s = max_delay_s
+
+        # Public variables from Recorder.
+        self.filepath = None
+        self.has_metadata = False
+        self.always_update = False
+        self.last_updated = None
+
+        # Joined rows
+        self._final_store = None   # Rows whose match cannot change anymore
+        self._final_ts = None      # Timestamp of the last final row
+        self._pending_df = None    # Newest rows, joined again on the next refresh
+        self._table = None         # Final and pending rows, built on request
+        self._update_lock = threading.RLock()
+
+    def get_table(self, start=None, end=None, copy: bool=True) -> pd.DataFrame:
+        """Get the joined table with one row per cycle.
+
+        Args:
+            start: Only rows with timestamp >= start are returned. Accepts
+                timestamps (int) and everything pd.Timestamp accepts.
+            end: Only rows with timestamp <= end are returned.
+            copy (bool): Whether an independent copy is returned, see Recorder.get_table().
+
+        Returns:
+            Pandas dataframe.
+        """
+        with self._update_lock:
+            self.refresh()
+            df = self._slice_rows(self._get_joined_df(), start, end)
+            return df.copy() if copy else df
+
+    def get_data(self, start=None, end=None, copy: bool=True) -> pd.DataFrame:
+        return self.get_table(start=start, end=end, copy=copy)
+
+    def get_metadata(self) -> pd.DataFrame:
+        return pd.DataFrame()
+
+    def refresh(self):
+        """Refreshes all recorders and joins the cycles which arrived or were
+        not final at the last refresh.
+        """
+        with self._update_lock:
+            for recorder in self._get_recorders():
+                recorder.refresh()
+            last_updated = tuple(recorder.last_updated for recorder in self._get_recorders())
+            if last_updated == self.last_updated and self._final_store is not None:
+                return
+            self._update()
+            self.last_updated = last_updated
+
+    def is_up_to_date(self) -> bool:
+        """Returns true if none of the recorders changed since the last refresh.
+        """
+        return self._final_store is not None and all(recorder.is_up_to_date() for recorder in self._get_recorders())
+
+    def subscribe(self, watcher, callback: callable=None):
+        """Lets a FileWatcher report changes of the files of all recorders.
+
+        Args:
+            watcher (FileWatcher): Watcher as created by create_file_watcher().
+            callback (callable): Called with the filepath when a file changes.
+        """
+        for recorder in self._get_recorders():
+            recorder.subscribe(watcher, callback)
+
+    def get_state(self) -> dict:
+        """Returns the states of all recorders, e.g. for a checkpoint of the
+        Runner.
+
+        Note:
+            The joined rows are not part of the state. They are joined again
+            from the restored recorders.
+
+        Returns:
+            Picklable dictionary. Empty if nothing was joined yet.
+        """
+        if self._final_store is None:
+            return {}
+        return {
+            "left": self.left.get_state(),
+            "right": {name: recorder.get_state() for name, recorder in self.right.items()}
+            }
+
+    def set_state(self, state: dict):
+        """Restores a state as returned by get_state().
+
+        Args:
+            state (dict): State as returned by get_state().
+        """
+        if not state:
+            return
+        self.left.set_state(state["left"])
+        for name, recorder in self.right.items():
+            recorder.set_state(state["right"].get(name, {}))
+        self._reset()
+        self.last_updated = None
+
+    def _get_recorders(self) -> list:
+        return [self.left] + list(self.right.values())
+
+    def _reset(self):
+        """Forgets all joined rows, such that the next update joins the full
+        history.
+        """
+        self._final_store = None
+        self._final_ts = None
+        self._pending_df = None
+        self._table = None
+
+    def _update(self):
+        """Joins the rows of the left recorder after the last final row.
+        """
+        left_df = self.left.get_table(copy=False)
+        left_ts = left_df["timestamp"].to_numpy()
+        position = 0 if self._final_ts is None else np.searchsorted(left_ts, self._final_ts, side="left")
+        if self._final_ts is not None and (position == len(left_ts) or left_ts[position] != self._final_ts):
+            # The left file was replaced: The final rows are not valid anymore
+            self._reset()
+        if self._final_store is None:
+            self._final_store = ColumnStore()
+
+        # Join the rows which are not final
+        lo = 0 if self._final_ts is None else np.searchsorted(left_ts, self._final_ts, side="right")
+        new_df = self._join(left_df.iloc[lo:])
+
+        # Store the rows which are final
+        nr_final = self._get_nr_of_final_rows(left_ts[lo:])
+        if nr_final > 0:
+            self._final_store.append(new_df.iloc[:nr_final])
+            self._final_ts = left_ts[lo + nr_final - 1]
+        self._pending_df = new_df.iloc[nr_final:]
+        self._table = None
+
+    def _join(self, left_df: pd.DataFrame) -> pd.DataFrame:
+        """Joins rows of the left recorder with all right recorders.
 
+        Note:
+            Each right table is cut to the rows between the first and the last
+            cycle before it is joined, plus one row on each side, such that
+            the cost does not depend on the length of the history.
+        """
+        df = left_df.reset_index(drop=True)
+        if len(df.index) == 0:
+            return df
+        left_ts = df["timestamp"].to_numpy()
+        tolerance = None if self.tolerance_s is None else int(self.tolerance_s * 1e9)
+        for name, recorder in self.right.items():
+            right_df = recorder.get_table(copy=False)
+            if len(right_df.index) == 0:
+                # The timestamps of an empty table have no numeric dtype yet
+                right_df = right_df.astype({"timestamp": np.int64})
+            right_ts = right_df["timestamp"].to_numpy()
+            lo = max(np.searchsorted(right_ts, left_ts[0], side="left") - 1, 0)
+            hi = np.searchsorted(right_ts, left_ts[-1], side="right") + 1
+            right_df = right_df.iloc[lo:hi].add_prefix(f"{name}_").reset_index(drop=True)
+            df = pd.merge_asof(
+                df,
+                right_df,
+                left_on="timestamp",
+                right_on=f"{name}_timestamp",
+                direction=self.direction,
+                tolerance=tolerance
+                )
+        return df
 
-class CycleRecorder(Recorder): 
-    """ Tracks all results and combines them into one dataframe. 
-    """ 
-    pass
-    
-    
+    def _get_nr_of_final_rows(self, left_ts: np.ndarray) -> int:
+        """Counts the cycles which are before the watermark of every right
+        recorder, i.e. whose match cannot change when rows are appended, or
+        which are more than max_delay_s older than the newest cycle.
+        """
+        nr_final = len(left_ts)
+        if nr_final == 0:
+            return 0
+        nr_timed_out = 0
+        if self.max_delay_s is not None:
+            nr_timed_out = np.searchsorted(left_ts, left_ts[-1] - int(self.max_delay_s * 1e9), side="right")
+        for recorder in self.right.values():
+            right_df = recorder.get_table(copy=False)
+            if len(right_df.index) == 0:
+                nr_final = min(nr_final, nr_timed_out)
+                continue
+            watermark = right_df["timestamp"].iloc[-1]
+            # A backward or nearest match can still change while a right row with the same timestamp may follow
+            side = "right" if self.direction == "forward" else "left"
+            nr_final = min(nr_final, max(np.searchsorted(left_ts, watermark, side=side), nr_timed_out))
+        return int(nr_final)
 
+    def _get_joined_df(self) -> pd.DataFrame:
+        """Final rows followed by the pending rows.
+        """
+        if self._table is None:
+            final_df = self._final_store.to_frame()
+            if self._pending_df is None or len(self._pending_df.index) == 0:
+                self._table = final_df
+            elif len(final_df.index) == 0:
+                self._table = self._pending_df
+            else:
+                self._table = pd.concat([final_df, self._pending_df], ignore_index=True)
+        return self._table
 
+    def _slice_rows(self, df: pd.DataFrame, start, end) -> pd.DataFrame:
+        """Selects the rows in [start, end] by binary search on the timestamps.
+        """
+        if start is None and end is None:
+            return df
+        timestamps = df["timestamp"].to_numpy()
+        lo = 0 if start is None else np.searchsorted(timestamps, to_timestamp(start), side="left")
+        hi = len(timestamps) if end is None else np.searchsorted(timestamps, to_timestamp(end), side="right")
+        return df.iloc[lo:max(lo, hi)]
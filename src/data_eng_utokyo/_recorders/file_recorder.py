@@ -6,11 +6,13 @@ Use cases include the image data from the CMOS camera and the SSD data.
 
 import os
 import pandas as pd
-from datetime import datetime
 from pathlib import Path
 
 from .recorder import Recorder
+from .._utilities.column_store import ColumnStore
+from .._utilities.file_fingerprint import FileChange, FileFingerprint
 from .._utilities.path_helper import PathHelper
+from .._utilities.time_conversion import epoch_seconds_to_timestamps, add_time_columns
 
 
 class FileRecorder(Recorder): 
@@ -64,17 +66,66 @@ class FileRecorder(Recorder):
             print("Do not call this function if there is no need for it!")
             return pd.DataFrame()
         self.filepath_set = self.filepath_set | new_filepaths
+        return self._get_file_rows(new_filepaths)
+    
+    def _get_file_rows(self, filepaths) -> pd.DataFrame: 
+        """Gets the filepath and metadata of images, one row per file.
         
-        # Load metadata and create table
+        Returns: 
+            Data as a pandas dataframe.
+        """
         columns = ["filename", "filename_with_extension", "filepath", "mtime", "ctime"]
         funcs = [lambda x: Path(x).stem, 
                 os.path.basename, 
                  lambda x: x, 
                  os.path.getmtime, 
                  os.path.getctime]
-        rows = [list(func(path) for func in funcs) for path in new_filepaths]
+        rows = [list(func(path) for func in funcs) for path in filepaths]
         return pd.DataFrame(data=rows, columns=columns)
     
+    def _get_file_change(self, fingerprint) -> str: 
+        """Files are only added to the folder, the new ones are found by _load_new_data().
+        """
+        return FileChange.unchanged if fingerprint == self.last_updated else FileChange.appended
+    
+    def _get_cache_state(self) -> dict: 
+        """The files which were found so far. There is no read cursor.
+        """
+        return {
+            "fingerprint": list(self.last_updated),
+            "read_data_lines": self.read_data_lines,
+            "data_columns": list(self._data_columns),
+            "filepaths": sorted(self.filepath_set),
+            }
+    
+    def _set_cache_state(self, state: dict): 
+        self.last_updated = FileFingerprint(*state["fingerprint"])
+        self.read_data_lines = state["read_data_lines"]
+        self._data_columns = state["data_columns"]
+        self.filepath_set = set(state["filepaths"])
+    
+    def _is_cache_valid(self, state: dict) -> bool: 
+        return os.path.isdir(self.filepath)
+    
+    def _is_at_cursor(self, cursor: dict) -> bool: 
+        return self._table_store is not None and self.filepath_set == set(cursor["filepaths"])
+    
+    def _reload_until(self, cursor: dict): 
+        """Lists the files of cursor again which still exist. Files which were 
+        added since then are found by the next update.
+        """
+        self._reset()
+        filepaths = sorted(fp for fp in cursor["filepaths"] if os.path.isfile(fp))
+        self.filepath_set = set(filepaths)
+        if not filepaths: 
+            return
+        data_df = self._get_file_rows(filepaths)
+        self._data_columns = list(data_df.columns)
+        self._table_store = ColumnStore.from_frame(self._build_table(data_df))
+        self._table_store.sort(by='timestamp')
+        self._rebuild_rollups()
+        self._rebuild_rolling_aggregates()
+    
     def _load_metadata(self) -> pd.DataFrame: 
         """Reloads all metadata. 
         
@@ -83,11 +134,10 @@ class FileRecorder(Recorder):
         """
         return pd.DataFrame()
     
-    def _harmonize_time(self):
-        """Reads the time and adds it to the table.
+    def _harmonize_time(self, df: pd.DataFrame):
+        """Reads the creation time (local time) and adds it to the table.
         """
-        self._table_df["timestamp"] = self._table_df["ctime"].apply(lambda x: datetime.fromtimestamp(x).strftime('%Y-%m-%d %H:%M:%S.%f'))
-        self._table_df["datetime"] =  self._table_df["timestamp"].apply(pd.Timestamp)
+        add_time_columns(df, epoch_seconds_to_timestamps(df["ctime"]))
        
         
 class FileParser(FileRecorder):
@@ -113,13 +163,10 @@ class FileParser(FileRecorder):
         filepath_set (set): Set of filepaths that were found.
     """
     
-    def _update_data(self):
-        """Loads new data.
+    def _append_to_table(self, new_table_df: pd.DataFrame): 
+        """Replaces the table by the new files only.
         """
-        new_data_df = self._load_new_data()
-        self.read_data_lines += len(new_data_df.index)
-        self._data_df = new_data_df
-        self.last_updated = self._get_mod_time()
+        self._table_store = ColumnStore.from_frame(new_table_df)
         
     def is_up_to_date(self) -> bool:
         """Returns whether all data has already been returned.
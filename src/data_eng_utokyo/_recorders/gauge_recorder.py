@@ -2,10 +2,10 @@
 """Tracks the Rb dispenser and the neutralizer current.
 """
 
-import numpy as np
 import pandas as pd
 
 from .recorder import Recorder
+from .._utilities.time_conversion import parse_timestamps, add_time_columns
 
 
 class GaugeRecorder(Recorder): 
@@ -19,15 +19,17 @@ class GaugeRecorder(Recorder):
             delimiter=",",
             always_update=always_update
             )
+        self.time_format = "%Y/%m/%d %H:%M:%S"  # Timestamp: 2022/03/12 20:32:19
+        self.schema = {"Timestamp": "str"}
+        self.schema_default = "float"
         
     def _load_initial_data(self): 
-        return pd.read_csv(
-            filepath_or_buffer=self.filepath, 
+        return self._read_csv(
+            self._read_new_lines(),
             header=0, 
             names=["Timestamp", "Rb disp.", "Neut.", "Surf. Ref.", "NC1", "NC2", "NC3"]
             )  
     
-    def _harmonize_time(self): 
-        self._table_df["datetime"] = pd.to_datetime(self._table_df["Timestamp"])
-        self._table_df["timestamp"] = self._table_df["datetime"].values.astype(np.int64)
+    def _harmonize_time(self, df: pd.DataFrame): 
+        add_time_columns(df, parse_timestamps(df["Timestamp"], self.time_format))
 
@@ -2,10 +2,10 @@
 """Records the HeatTimeLog.
 """
 
-import numpy as np
 import pandas as pd
 
 from .recorder import Recorder
+from .._utilities.time_conversion import parse_timestamps, add_time_columns
 
 
 class HeatTimeRecorder(Recorder): 
@@ -22,16 +22,15 @@ class HeatTimeRecorder(Recorder):
     def _load_initial_data(self) -> pd.DataFrame: 
         """ Returns all data up to now and defines the data columns. 
         """
-        return pd.read_csv(self.filepath, delimiter="\t", names=["Time", "VoltageDurationPower", "Coil"])
+        return self._read_csv(self._read_new_lines(), names=["Time", "VoltageDurationPower", "Coil"])
         
     def _load_new_data(self) -> pd.DataFrame: 
         """ Returns the rows which have not been loaded so far. 
         """
-        return
+        return self._read_csv(self._read_new_lines(), names=["Time", "VoltageDurationPower", "Coil"])
     
-    def _harmonize_time(self): 
-        self._table_df["datetime"] = self._table_df["Time"].apply(lambda s: self.day + s).apply(pd.Timestamp)
-        self._table_df["timestamp"] = self._table_df["Time"].apply(pd.Timestamp).values.astype(np.int64)
+    def _harmonize_time(self, df: pd.DataFrame): 
+        add_time_columns(df, parse_timestamps(self.day + df["Time"], self.time_format))
 
 
     
@@ -2,55 +2,74 @@
 """Records the log of the IR heater output percentage for target heating.
 """
 
-import numpy as np
+import functools
+
 import pandas as pd
-import csv
 
 from .recorder import Recorder
+from .._utilities.parallel_loader import parse_csv_lines
+from .._utilities.time_conversion import parse_timestamps, add_time_columns
 
 
 class HeaterRecorder(Recorder): 
     """ Class for data engineering of the heater data. """
     
-    def __init__(self, filepath: str, always_update: bool=False):
+    def __init__(self, filepath: str, always_update: bool=False, broadcast_metadata: bool=True):
         super(HeaterRecorder, self).__init__(
             filepath=filepath, 
             has_metadata=True,
             delimiter=",",
-            always_update=always_update
+            always_update=always_update,
+            broadcast_metadata=broadcast_metadata
             )
         self.nr_meta_data_rows = 6
+        self.time_format = "%Y/%m/%d %H:%M:%S"  # Date + Time: 2022/03/14 10:07:41
+        self.schema = {
+            "Date": "category", 
+            "Time": "str", 
+            "Unknown": "int32", 
+            "TargetPercentage": "float", 
+            "MeasuredPercentage": "float"
+            }
         
     def _load_initial_data(self) -> pd.DataFrame: 
-        return pd.read_csv(
-            filepath_or_buffer=self.filepath, 
+        return self._read_csv(
+            self._read_new_lines(),
             skiprows=self.nr_meta_data_rows - 1, 
             header=0, 
             names=["Date", "Time", "Unknown", "TargetPercentage", "MeasuredPercentage"],
-            encoding='Shift-JIS',
-            delimiter=self.delimiter
+            encoding='Shift-JIS'
             )
     
     def _load_new_data(self) -> pd.DataFrame: 
         """ Returns the rows which have not been loaded so far. 
         """
-        return pd.read_csv(
-            filepath_or_buffer=self.filepath, 
-            skiprows=self.nr_meta_data_rows + self.read_data_lines - 1, 
-            header=0, 
+        return self._read_csv(
+            self._read_new_lines(),
+            header=None, 
+            names=["Date", "Time", "Unknown", "TargetPercentage", "MeasuredPercentage"],
+            encoding='Shift-JIS'
+            )
+    
+    def _get_range_parser(self): 
+        """ Lines of the log are independent, such that the initial load can be parsed in parallel. """
+        return functools.partial(
+            parse_csv_lines,
+            engine=self.parse_engine,
             names=["Date", "Time", "Unknown", "TargetPercentage", "MeasuredPercentage"],
+            delimiter=self.delimiter,
             encoding='Shift-JIS',
-            delimiter=self.delimiter
+            dtype=self._get_dtypes()
             )
     
     def _load_metadata(self): 
-        with open(self.filepath, newline='', encoding="Shift-JIS") as f:
-            reader = csv.reader(f)
-            metadata_list = list(reader)[:self.nr_meta_data_rows]
-            columns = [m[0] for m in metadata_list]
-            row = [metadata_list[i][1] for i in range(2)] +  [f"{metadata_list[i][3]},{metadata_list[i][4]}" for i in range(2, 6)]
-            return pd.DataFrame(data=[row], columns=columns)
+        """ Parses the header lines, the data lines are not read. """
+        metadata_list = self._read_header_lines(self.nr_meta_data_rows, encoding="Shift-JIS")
+        columns = [m[0] for m in metadata_list]
+        row = [metadata_list[i][1] for i in range(2)] \
+            + [f"{metadata_list[i][3]},{metadata_list[i][4]}" for i in range(2, 6)]
+        return pd.DataFrame(data=[row], columns=columns)
     
-    def _harmonize_time(self): 
-        self._table_df["datetime"] = self._table_df["Date"].apply(lambda s: s.replace("/", "-")) + " " + self._table_df["Time"]
-        self._table_df["timestamp"] = self._table_df["datetime"].apply(pd.Timestamp).values.astype(np.int64)
+    def _harmonize_time(self, df: pd.DataFrame): 
+        timestamps = parse_timestamps(df["Date"].astype(str) + " " + df["Time"], self.time_format)
+        add_time_columns(df, timestamps)
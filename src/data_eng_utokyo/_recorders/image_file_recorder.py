@@ -7,12 +7,12 @@ according to the number.
 """
 
 import os
-import numpy as np
 import pandas as pd
 from pathlib import Path
 
 from .recorder import Recorder
 from .._utilities.path_helper import PathHelper
+from .._utilities.time_conversion import parse_timestamps, add_time_columns
 
 
 class ImageFileRecorder(Recorder): 
@@ -30,6 +30,7 @@ class ImageFileRecorder(Recorder):
             )
         self.match = match
         self.filepath_set = set()
+        self.time_format = "%Y/%m/%d %H:%M:%S.%f"  # Time: 2022/03/15 08:18:00.266
 
     def _load_initial_data(self) -> pd.DataFrame: 
         """ Returns all data (filepath and metadata of images) which are new. 
@@ -52,7 +53,8 @@ class ImageFileRecorder(Recorder):
             
             # Create metadata lookup
             metadata_filepath = os.path.join(folder, "all_data.csv")
-            assert os.path.isfile(metadata_filepath), f"Expected metadata file at {metadata_filepath}, but did not find it."
+            assert os.path.isfile(metadata_filepath), \
+                f"Expected metadata file at {metadata_filepath}, but did not find it."
             metadata_df = Recorder(filepath=metadata_filepath,
                                    has_metadata=False).get_table()
             metadata_lookup = {
@@ -72,14 +74,18 @@ class ImageFileRecorder(Recorder):
         columns = ["filename", "filepath", "filename_with_extension", "Time", "ROI Sum", "Coil (1:ON 0:OFF)"]
         return pd.DataFrame(data=rows, columns=columns)
     
+    def get_state(self) -> dict: 
+        """ There is no read cursor, the folder is listed again after a restart. 
+        """
+        return {}
+    
     def _load_metadata(self) -> pd.DataFrame: 
         """ Reloads all metadata. 
         """
         return pd.DataFrame()
     
-    def _harmonize_time(self): 
-        self._table_df["timestamp"] = self._table_df["Time"].apply(pd.Timestamp).values.astype(np.int64)
-        self._table_df["datetime"] =  self._table_df["Time"].apply(pd.Timestamp)
+    def _harmonize_time(self, df: pd.DataFrame): 
+        add_time_columns(df, parse_timestamps(df["Time"], self.time_format))
         
     def _filepath_to_nr(self, fp: str): 
         """ Takes something of the form "...cmos_000043.csv" and returns 43."""
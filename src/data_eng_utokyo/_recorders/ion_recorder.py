@@ -11,10 +11,10 @@ Todo:
     * Check the usage of abstractmethods.
 """
 
-import numpy as np
 import pandas as pd
 
 from .recorder import Recorder
+from .._utilities.time_conversion import parse_timestamps, add_time_columns
 
 
 class IonRecorder(Recorder): 
@@ -26,7 +26,9 @@ class IonRecorder(Recorder):
             always_update=always_update,
             encoding='Shift-JIS'
             )
+        self.time_format = "%Y/%m/%d %H:%M:%S"  # Timestamp: 2022/03/14 11:41:38
+        self.schema = {"Timestamp": "str"}
+        self.schema_default = "float"
 
-    def _harmonize_time(self): 
-        self._table_df["datetime"] = pd.to_datetime(self._table_df["Timestamp"])
-        self._table_df["timestamp"] = self._table_df["datetime"].values.astype(np.int64)
+    def _harmonize_time(self, df: pd.DataFrame): 
+        add_time_columns(df, parse_timestamps(df["Timestamp"], self.time_format))
@@ -4,46 +4,68 @@
 
 import numpy as np
 import pandas as pd
-import csv
 
 from .recorder import Recorder
+from .._utilities.line_index import LineIndex
+from .._utilities.time_conversion import parse_timestamp, add_time_columns
 
 
 class LaserRecorder(Recorder): 
     
-    def __init__(self, filepath: str, always_update: bool=False): 
+    def __init__(self, filepath: str, always_update: bool=False, broadcast_metadata: bool=True): 
         super(LaserRecorder, self).__init__(
             filepath=filepath, 
             has_metadata=True,
-            always_update=always_update
+            always_update=always_update,
+            broadcast_metadata=broadcast_metadata
             )
+        self.time_format = "%d.%m.%Y, %H:%M:%S.%f"  # StartTime: 15.03.2022, 08:46:39.387
+        self.schema = {"Time  [ms]": "float64"}
+        self.schema_default = "float"
+        self._line_index = None
+        
+    def get_line_index(self, every: int=1024) -> LineIndex: 
+        """ Returns the index of the byte offset and the time in ms of every n-th raw line, extended with the lines 
+            which were appended since the last call. Note that six raw lines form one row of the table. 
+        """
+        if self._line_index is None or self._line_index.every != every: 
+            self._line_index = LineIndex(self.filepath, header_lines=120, key_column=0, delimiter="\t", every=every, 
+                                         sidecar_path=self._get_sidecar_path("line_index"))
+        self._line_index.update()
+        return self._line_index
         
     def _load_initial_data(self):
-        df = pd.read_csv(
-            filepath_or_buffer=self.filepath, 
+        df = self._read_csv(
+            self._read_new_lines(),
             skiprows=119,
             delimiter="	"
             )
-        df = self._aggregate_laser_rows(df)
-        self.read_data_lines += 5 * len(df.index)
-        return df
+        return self._aggregate_new_rows(df)
     
     def _load_new_data(self): 
-        df = pd.read_csv(
-            filepath_or_buffer=self.filepath, 
-            skiprows=119+self.read_data_lines,
+        df = self._read_csv(
+            self._read_new_lines(),
             delimiter="	",
-            header=0,
+            header=None,
             names=self._data_columns
             )
-        df = self._aggregate_laser_rows(df)
-        self.read_data_lines += 5 * len(df.index)
+        return self._aggregate_new_rows(df)
+    
+    def _aggregate_new_rows(self, original_df: pd.DataFrame): 
+        """ Aggregates the new rows and gives the rows of an incomplete measurement back to the tail reader, such
+            that they are read again together with the rest of their measurement. 
+        """
+        df, consumed_rows = self._aggregate_laser_rows(original_df)
+        self._tail_reader.unread_lines(len(original_df.index) - consumed_rows)
+        # The base class adds one line per aggregated row
+        self.read_data_lines += consumed_rows - len(df.index)
         return df
 
     def _aggregate_laser_rows(self, original_df: pd.DataFrame): 
         """ Originally, one measurement of the six laser wavelengths is distributed over six rows. We aggregate 
             these rows into one row. The only tradeoff is that we have to approximate the time with the time
-            of the last measurement. 
+            of the last measurement. Returns the aggregated dataframe and the number of original rows which 
+            belong to complete measurements. 
         """
         
         time_column = 'Time  [ms]'
@@ -51,8 +73,9 @@ class LaserRecorder(Recorder):
         
         row_lookup = {}
         row_list = []
+        consumed_rows = 0
         
-        for index, row in original_df.iterrows():
+        for i, (index, row) in enumerate(original_df.iterrows()):
             column_index = pd.Series.first_valid_index(row[1:])
             row_lookup[column_index] = row[column_index]
             # Count if all 6 lasers have been measured
@@ -60,49 +83,49 @@ class LaserRecorder(Recorder):
                 item = [row[time_column]] + [row_lookup[col] for col in laser_columns]
                 row_list.append(item)
                 row_lookup = {}
+                consumed_rows = i + 1
 
         df = pd.DataFrame(data=row_list, columns=original_df.columns)
-        return df
+        return df, consumed_rows
+        
+    def _load_metadata(self): 
+        """ Parses the 119 header lines, the data lines are not read. """
+        metadata_list = self._read_header_lines(119, encoding="cp932", delimiter="	")
+        
+        # Title
+        title_column = ["Title"]
+        title_row = [metadata_list[0][0]]
         
-    def _load_metadata(self):     
-        with open(self.filepath, newline='', encoding="cp932") as f:
-            reader = csv.reader(f, delimiter="	")
-            metadata_list = list(reader)[:119]
-            
-            # Title
-            title_column = ["Title"]
-            title_row = [metadata_list[0][0]]
-            
-            # General info
-            gi_columns = [m[0] for m in metadata_list[1:7]]
-            gi_rows = [self._combine(m[1:]) for m in metadata_list[1:7]]
-            
-            # General settings
-            gs_columns = [m[0] for m in metadata_list[9:20]]
-            gs_rows = [self._combine(m[1:]) for m in metadata_list[9:20]]
+        # General info
+        gi_columns = [m[0] for m in metadata_list[1:7]]
+        gi_rows = [self._combine(m[1:]) for m in metadata_list[1:7]]
+        
+        # General settings
+        gs_columns = [m[0] for m in metadata_list[9:20]]
+        gs_rows = [self._combine(m[1:]) for m in metadata_list[9:20]]
 
-            # Frames 1-6
-            frame_columns = (
-                [m[0] for m in metadata_list[22:36]]
-                + [m[0] for m in metadata_list[38:52]]
-                + [m[0] for m in metadata_list[54:68]]
-                + [m[0] for m in metadata_list[70:84]]
-                + [m[0] for m in metadata_list[86:100]]
-                + [m[0] for m in metadata_list[102:116]]
-            )
-            
-            frame_rows = (
-                [self._combine(m[1:]) for m in metadata_list[22:36]]
-                + [self._combine(m[1:]) for m in metadata_list[38:52]]
-                + [self._combine(m[1:]) for m in metadata_list[54:68]]
-                + [self._combine(m[1:]) for m in metadata_list[70:84]]
-                + [self._combine(m[1:]) for m in metadata_list[86:100]]
-                + [self._combine(m[1:]) for m in metadata_list[102:116]]
-            )
-            
-            columns = title_column + gi_columns + gs_columns + frame_columns
-            row = title_row + gi_rows + gs_rows + frame_rows
-            return pd.DataFrame(data=[row], columns=columns)
+        # Frames 1-6
+        frame_columns = (
+            [m[0] for m in metadata_list[22:36]]
+            + [m[0] for m in metadata_list[38:52]]
+            + [m[0] for m in metadata_list[54:68]]
+            + [m[0] for m in metadata_list[70:84]]
+            + [m[0] for m in metadata_list[86:100]]
+            + [m[0] for m in metadata_list[102:116]]
+        )
+        
+        frame_rows = (
+            [self._combine(m[1:]) for m in metadata_list[22:36]]
+            + [self._combine(m[1:]) for m in metadata_list[38:52]]
+            + [self._combine(m[1:]) for m in metadata_list[54:68]]
+            + [self._combine(m[1:]) for m in metadata_list[70:84]]
+            + [self._combine(m[1:]) for m in metadata_list[86:100]]
+            + [self._combine(m[1:]) for m in metadata_list[102:116]]
+        )
+        
+        columns = title_column + gi_columns + gs_columns + frame_columns
+        row = title_row + gi_rows + gs_rows + frame_rows
+        return pd.DataFrame(data=[row], columns=columns)
     
     def _combine(self, entries: list): 
         """ If entries has length 1, then it returns the entry. 
@@ -116,19 +139,14 @@ class LaserRecorder(Recorder):
         
         return ",".join(entries)
     
-    def _harmonize_time(self):
+    def _harmonize_time(self, df: pd.DataFrame):
 
-        # Convert 15.03.2022, 08:46:39.387 to 15-03-2022 08:46:39.387
-        helper_df = pd.DataFrame()
-        helper_df["StartTime"] = self._table_df["StartTime"].apply(lambda s: s.replace(",", "").replace(".", "-", 2))
-        
-        # Calculate absolute time based on relative time
-        helper_df["start_datetime"] = pd.to_datetime(helper_df["StartTime"])
-        helper_df["start_timestamp"] = helper_df["start_datetime"].values.astype(np.int64)
-        helper_df["timestamp"] = helper_df["start_timestamp"] + self._table_df["Time  [ms]"] * 1e3
-        
-        # Add datetimes
-        self._table_df["timestamp"] = helper_df["timestamp"]
-        self._timestamp_to_datetimes(self._table_df)
+        # The start time is the same for all rows of the file
+        if len(df.index) == 0: 
+            add_time_columns(df, [])
+            return
+        start_timestamp = parse_timestamp(self._metadata_df["StartTime"].iloc[0], self.time_format)
         
-        return
+        # Calculate absolute time based on relative time [ms -> ns]
+        relative_time_ns = np.rint(df["Time  [ms]"].to_numpy(dtype=np.float64) * 1e6).astype(np.int64)
+        add_time_columns(df, start_timestamp + relative_time_ns)
@@ -4,10 +4,10 @@
 PMT stands for photo multiplier tube.
 """
 
-import numpy as np
 import pandas as pd
 
 from .recorder import Recorder
+from .._utilities.time_conversion import parse_timestamps, add_time_columns
 
 
 class PMTRecorder(Recorder): 
@@ -22,11 +22,27 @@ class PMTRecorder(Recorder):
             delimiter=",",
             always_update=always_update
             )
+        self.time_format = "%Y/%m/%d %H:%M:%S.%f"  # Time: 2022/03/15 08:18:00.266
+        self.schema = {
+            "No.": "int32", 
+            "Time": "str", 
+            "PMT Current (A)": "float", 
+            "ROI Sum": "int64", 
+            "Coil (1:ON 0:OFF)": "bool"
+            }
         
     def _load_initial_data(self): 
-        df = pd.read_csv(filepath_or_buffer=self.filepath)
+        df = self._read_csv(self._read_new_lines())
         return df.drop(["Unnamed: 5"], axis=1)
     
-    def _harmonize_time(self):
-        self._table_df["datetime"] = self._table_df["Time"]
-        self._table_df["timestamp"] = self._table_df["Time"].apply(pd.Timestamp).values.astype(np.int64)
+    def _load_new_data(self): 
+        """ Each line ends with a delimiter, which yields an empty column. """
+        df = self._read_csv(
+            self._read_new_lines(),
+            header=None,
+            names=self._data_columns + ["Unnamed: 5"]
+            )
+        return df.drop(["Unnamed: 5"], axis=1)
+    
+    def _harmonize_time(self, df: pd.DataFrame):
+        add_time_columns(df, parse_timestamps(df["Time"], self.time_format))
@@ -6,12 +6,29 @@ Note:
     csv table which you want to map to a real-time recorder object. 
 """
 
+import csv
+import hashlib
+import inspect
+import io
+import itertools
+from collections import defaultdict
 import os
+import numpy as np
 import pandas as pd
+import threading
 import time
-import datetime
 from abc import abstractmethod
 
+from .._utilities.tail_reader import TailReader
+from .._utilities.column_store import ColumnStore
+from .._utilities.csv_engine import read_csv
+from .._utilities.file_fingerprint import FileChange, FileFingerprint, compare_fingerprints
+from .._utilities.parallel_loader import parse_line_ranges, split_line_ranges
+from .._utilities.rolling import RollingAggregate
+from .._utilities.rollup import RollupPyramid
+from .._utilities.table_cache import TableCache
+from .._utilities.time_conversion import timestamps_to_datetimes, to_timestamp
+
 
 class Recorder(object): 
     """ Base class for mapping a csv file to a pandas dataframe in real-time.
@@ -22,6 +39,9 @@ class Recorder(object):
         delimiter (str): Delimiter used in the csv file.
         always_update (bool): Should the loading of new data be forced.
         encoding (str): Encoding used in the csv file.
+        broadcast_metadata (bool): Whether the metadata columns are added to 
+            every row of the table. If False, the metadata is stored once and
+            can be joined with join_metadata() when needed.
         
     Attributes: 
         filepath (str): Full path to the csv file.
@@ -29,9 +49,57 @@ class Recorder(object):
         delimiter (str): Delimiter used in the csv file.
         always_update (bool): Should the loading of new data be forced.
         encoding (str): Encoding used in the csv file.
+        broadcast_metadata (bool): Whether the metadata columns are added to 
+            every row of the table.
+        time_format (str): Format of the time column in the csv file as used
+            by strptime. Inferred by pandas if None.
+        schema (dict): Dtype of each data column, passed to pd.read_csv. The
+            special dtype "float" marks measured values, see downcast_floats.
+            Inferred by pandas for columns which are not in the schema.
+        schema_default (str): Dtype of the data columns which are not in the 
+            schema. Inferred by pandas if None.
+        downcast_floats (bool): Whether the "float" columns of the schema are 
+            stored as float32 instead of float64.
+        parse_engine (str): Engine for parsing the csv lines, one of "auto",
+            "pyarrow", "c" and "python". "auto" uses the C engine. "pyarrow" 
+            opts in to the multithreaded pyarrow engine if pyarrow is 
+            installed.
+        parse_partial_line (bool): Whether an unfinished last line is added 
+            to the table as provisional row. It is read again when the file 
+            grows and its row is replaced if the line changed. Only rows 
+            which pass _is_valid_partial_row() are added. Only for files
+            with one row per line which are written in time order, e.g. logs
+            which write the line break before each entry. 
         read_data_lines (int): How many lines corresponding to data have been 
             read.
-        last_updated (str): Time in human readable format as string.
+        last_updated (FileFingerprint): Fingerprint of the csv file at the 
+            last update. 
+        max_rows (int): Only the newest max_rows rows are kept in the table. 
+            Unlimited if None.
+        max_age_s (float): Only rows at most max_age_s seconds older than the 
+            newest row are kept in the table. Unlimited if None.
+        spill_path (str): Csv file to which evicted rows are appended. 
+            Evicted rows are discarded if None.
+        rollup_resolutions_s (list): Bucket durations in seconds of the 
+            rollups of the numeric columns. No rollups are kept if None.
+        rolling_aggregates (dict): Rolling statistics registered with 
+            rolling(), by column, window and stats.
+        parallel_load_workers (int): Number of processes which parse the 
+            initial load of large files. Serial loading if None.
+        parallel_load_min_bytes (int): Minimal file size for the parallel 
+            initial load.
+        
+    Note: 
+        New data is read with a TailReader, which remembers the byte offset 
+        of the last complete line. A refresh therefore only parses the bytes 
+        which were appended since the last refresh. The file is only read 
+        from the beginning again if it was truncated or replaced. The table is kept in a 
+        ColumnStore, to which new rows are appended in amortized O(1) per row. 
+        The pandas dataframe is only built when it is requested. 
+        
+        With enable_cache(), the table and the read cursor are saved to disk, 
+        such that a restarted recorder only parses the lines which were 
+        appended since then. 
     """
     
     def __init__(self, 
@@ -39,7 +107,8 @@ class Recorder(object):
                  has_metadata: bool=True, 
                  delimiter: str=",", 
                  always_update: bool=False,
-                 encoding="utf-8"): 
+                 encoding="utf-8",
+                 broadcast_metadata: bool=True): 
         
         # Settings
         self.filepath = filepath
@@ -47,110 +116,947 @@ class Recorder(object):
         self.delimiter = delimiter
         self.always_update = always_update
         self.encoding = encoding
+        self.broadcast_metadata = broadcast_metadata
+        self.time_format = None
+        self.schema = {}
+        self.schema_default = None
+        self.downcast_floats = False
+        self.parse_engine = "auto"
+        self.parse_partial_line = False
         
         # Tracking
         self.read_data_lines = 0
         self.last_updated = 0
+        self._tail_reader = TailReader(filepath)
+        self._synced_data_lines = 0   # read_data_lines at the tail offset
+        self._nr_header_lines = 0     # Lines before the first data line
+        self._partial_line = None     # (offset, bytes) of the provisional row
         
         # Dataframes 
-        self._table_df = None     # Data x Metadata
-        self._data_df = None      # Data
+        self._table_store = None  # Data x Metadata
         self._metadata_df = None  # Metadata
+        self._metadata_fingerprint = None
         self._data_columns = []
+        
+        # Retention
+        self.max_rows = None
+        self.max_age_s = None
+        self.spill_path = None
+        
+        # Rollups
+        self.rollup_resolutions_s = None
+        self._rollups = None
+        self.rolling_aggregates = {}
+        
+        # Parallel initial load
+        self.parallel_load_workers = None
+        self.parallel_load_min_bytes = 64 << 20
+        
+        # Cache
+        self._cache = None
+        self._cache_interval_s = 0
+        self._cache_saved_at = None
+        
+        # Serializes updates, e.g. by a RecorderGroup and an analysis
+        self._update_lock = threading.RLock()
+        
+        # Rows which are harmonized by a _harmonize_time() without arguments
+        self._harmonizing_df = None
+        
+    @property
+    def _table_df(self) -> pd.DataFrame: 
+        """Read-only pandas view of the table (data x metadata).
+        
+        Note: 
+            While a _harmonize_time() without arguments runs, these are the 
+            rows which it harmonizes, as it was the case before the table was
+            kept in a ColumnStore.
+        """
+        if self._harmonizing_df is not None: 
+            return self._harmonizing_df
+        return None if self._table_store is None else self._table_store.to_frame()
+    
+    @_table_df.setter
+    def _table_df(self, df: pd.DataFrame): 
+        if self._harmonizing_df is not None: 
+            self._harmonizing_df = df
+            return
+        self._table_store = None if df is None else ColumnStore.from_frame(df)
+    
+    @property
+    def _data_df(self) -> pd.DataFrame: 
+        """Read-only pandas view of the data columns of the table.
+        """
+        if self._table_store is None: 
+            return None
+        return self._table_df[[col for col in self._data_columns if col in self._table_store.columns]]
 
-    def get_table(self) -> pd.DataFrame: 
+    def get_table(self, start=None, end=None, copy: bool=True) -> pd.DataFrame: 
         """Get the full table consisting of data and metdata.
         
+        Args: 
+            start: Only rows with timestamp >= start are returned. Accepts 
+                timestamps (int) and everything pd.Timestamp accepts.
+            end: Only rows with timestamp <= end are returned.
+            copy (bool): Whether an independent copy is returned. With False, 
+                the dataframe shares memory with the recorder, which saves 
+                the copy of the table. It is then read-only and must not be 
+                modified, not even by adding columns.
+        
         Returns: 
             Pandas dataframe.
         """
-        self._update()
-        self.last_updated = self._get_mod_time()
-        return self._table_df
+        # The lock keeps a concurrent refresh from changing the table between the refresh and the slicing
+        with self._update_lock: 
+            self.refresh()
+            return self._copy_if(self._slice_rows(self._table_df, start, end), copy)
     
-    def get_data(self) -> pd.DataFrame: 
+    def get_data(self, start=None, end=None, copy: bool=True) -> pd.DataFrame: 
         """Get just the data.
         
+        Args: 
+            start: Only rows with timestamp >= start are returned.
+            end: Only rows with timestamp <= end are returned.
+            copy (bool): Whether an independent copy is returned, see 
+                get_table().
+        
         Returns: 
             Pandas dataframe.
         """
-        self._update_data()
-        self.data_last_updated = self._get_mod_time()
-        return self._data_df
+        with self._update_lock: 
+            self.refresh()
+            return self._copy_if(self._slice_rows(self._data_df, start, end), copy)
+    
+    def refresh(self): 
+        """Loads the rows which were appended to the csv file since the last 
+        update. Called by get_table() and get_data(). 
+        
+        Note: 
+            Thread-safe: Concurrent calls for the same recorder are executed 
+            one after the other.
+        """
+        with self._update_lock: 
+            self._update()
     
     def get_metadata(self) -> pd.DataFrame:
         """Get just the metadata
         
+        Note: 
+            The metadata is parsed from the header once and cached. It is 
+            only parsed again when the csv file was truncated or replaced, 
+            because appending rows does not change the header.
+        
         Returns: 
             Pandas dataframe.
         """
-        self._metadata_df = self._load_metadata() if self.has_metadata else pd.DataFrame()
+        if not self.has_metadata: 
+            self._metadata_df = pd.DataFrame()
+            return self._metadata_df
+        fingerprint = self._get_fingerprint()
+        change = compare_fingerprints(self._metadata_fingerprint, fingerprint)
+        if self._metadata_df is None or change in (FileChange.truncated, FileChange.replaced): 
+            self._metadata_df = self._load_metadata()
+        self._metadata_fingerprint = fingerprint
         return self._metadata_df
     
+    def set_retention(self, max_rows: int=None, max_age_s: float=None, spill_path: str=None): 
+        """Bounds the memory of the table by evicting the oldest rows.
+        
+        Note: 
+            Eviction is O(1) amortized per row. It is applied after each 
+            update, so the table can briefly hold the rows of one update more.
+        
+        Args: 
+            max_rows (int): Keep the newest max_rows rows. Unlimited if None.
+            max_age_s (float): Keep the rows which are at most max_age_s 
+                seconds older than the newest row. Unlimited if None.
+            spill_path (str): Csv file to which evicted rows are appended. 
+                Evicted rows are discarded if None.
+        """
+        self.max_rows = max_rows
+        self.max_age_s = max_age_s
+        self.spill_path = spill_path
+        if self._table_store is not None: 
+            self._apply_retention()
+    
+    def enable_rollups(self, resolutions_s: list=(1, 10, 60, 600)): 
+        """Keeps the min, max, mean and count of each numeric data column per
+        bucket of time, updated with the new rows of each update.
+        
+        Note: 
+            Rollups are off by default. Rows are added to the rollups before 
+            the retention evicts them. However, the rollups are rebuilt from 
+            the rows which are still in the table whenever the table is 
+            rebuilt, e.g. when the metadata changed or after a restart from 
+            the cache or a checkpoint. With max_rows or max_age_s, they then 
+            only cover the retained rows again. 
+        
+        Args: 
+            resolutions_s (list): Bucket durations in seconds.
+        """
+        self.rollup_resolutions_s = list(resolutions_s)
+        self._rollups = None
+        if self._table_store is not None: 
+            self._rebuild_rollups()
+    
+    def get_rollup(self, resolution_s: float, start=None, end=None) -> pd.DataFrame: 
+        """Get the buckets of one rollup, see enable_rollups().
+        
+        Args: 
+            resolution_s (float): One of the resolutions of enable_rollups().
+            start: Only buckets which start at or after start are returned. 
+            end: Only buckets which start at or before end are returned.
+        
+        Returns: 
+            Pandas dataframe with the columns timestamp and datetime (start of 
+            the bucket) and <column>_min, _max, _mean and _count for each 
+            numeric column.
+        """
+        if self.rollup_resolutions_s is None: 
+            raise ValueError("Rollups are not enabled, call enable_rollups() first.")
+        with self._update_lock: 
+            self.refresh()
+            if self._rollups is None: 
+                return pd.DataFrame(columns=["timestamp", "datetime"])
+            rollup_df = self._rollups.get_frame(resolution_s)
+            return self._slice_rows(rollup_df, start, end, timestamps=rollup_df["timestamp"].to_numpy())
+    
+    def rolling(self, column: str, window, stats: list=("mean", "std"), start=None, end=None, 
+                copy: bool=True) -> pd.DataFrame: 
+        """Get rolling statistics of a column, e.g. the mean and the standard 
+        deviation of the last 60 s at each row.
+        
+        Note: 
+            The first call registers the statistics and calculates them for 
+            the full table. Later calls only process the rows which were 
+            appended since then, in O(1) per row. The statistics are 
+            recalculated from the table if it is rebuilt or if rows arrive 
+            out of order. 
+        
+        Args: 
+            column (str): Numeric data column, e.g. MeasuredPercentage.
+            window: Number of rows (int) or duration (str or pd.Timedelta, 
+                e.g. "60s") of the window. 
+            stats (list): Any of count, sum, sumsq, mean, std, var, min and max.
+            start: Only rows with timestamp >= start are returned. 
+            end: Only rows with timestamp <= end are returned.
+            copy (bool): Whether an independent copy is returned, see 
+                get_table().
+        
+        Returns: 
+            Pandas dataframe with one row per row of the table, with the 
+            columns timestamp and <column>_<stat> for each stat.
+        """
+        key = (column, window, tuple(stats))
+        with self._update_lock: 
+            if key not in self.rolling_aggregates: 
+                aggregate = RollingAggregate(column, window, stats)
+                if self._table_store is not None and 'timestamp' in self._table_store.columns: 
+                    table_df = self._table_df
+                    values = table_df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+                    aggregate.add(table_df['timestamp'].to_numpy(), values)
+                self.rolling_aggregates[key] = aggregate
+            self.refresh()
+            rolling_df = self.rolling_aggregates[key].get_frame()
+            rolling_df = self._slice_rows(rolling_df, start, end, timestamps=rolling_df["timestamp"].to_numpy())
+            return self._copy_if(rolling_df, copy)
+    
+    def enable_parallel_load(self, max_workers: int=None, min_bytes: int=64 << 20): 
+        """Parses the initial load of large files in a process pool, e.g. 
+        for archive data of a finished beamtime. 
+        
+        Note: 
+            The header and the first lines are loaded as usual. The rest of 
+            the file is split into byte ranges of complete lines, which are 
+            parsed in parallel and concatenated in order. Only recorders 
+            whose lines can be parsed independently support it, see 
+            _get_range_parser(). The others load serially. 
+        
+        Args: 
+            max_workers (int): Number of processes. One per CPU core if None.
+            min_bytes (int): Smaller files are loaded serially.
+        """
+        self.parallel_load_workers = max_workers or os.cpu_count() or 1
+        self.parallel_load_min_bytes = min_bytes
+    
+    def enable_cache(self, cache_dir: str, min_interval_s: float=60): 
+        """Saves the table and the read cursor to disk and restores them on the 
+        next start.
+        
+        Note: 
+            The cache is only used if the csv file still starts with the lines 
+            which were read (same inode, not truncated, same bytes before the 
+            cursor). Otherwise the csv file is parsed from the beginning. 
+        
+        Args: 
+            cache_dir (str): Folder in which the cache files are stored.
+            min_interval_s (float): Minimal time between two automatic saves 
+                in seconds. Saving writes the full table. 
+        """
+        self._cache = TableCache(cache_dir)
+        self._cache_interval_s = min_interval_s
+        
+    def save_cache(self): 
+        """Writes the table and the read cursor to the cache immediately.
+        """
+        if self._cache is None or self._table_store is None: 
+            return
+        self._cache.save(self._get_cache_key(), self._table_store, self._get_cache_state())
+        self._cache_saved_at = time.monotonic()
+    
+    def get_state(self) -> dict: 
+        """Returns the read cursor, e.g. for a checkpoint of the Runner. 
+        
+        Note: 
+            The table is not part of the state. It is restored from the cache 
+            or parsed from the csv file again by set_state(). 
+        
+        Returns: 
+            Picklable dictionary. Empty if nothing was read yet.
+        """
+        if self._table_store is None: 
+            return {}
+        return {"cursor": self._get_cache_state()}
+    
+    def set_state(self, state: dict): 
+        """Restores a state as returned by get_state().
+        
+        Note: 
+            The table is taken from the cache if it was saved at the same 
+            cursor. Otherwise the lines in front of the cursor are parsed 
+            from the csv file again. The state is ignored if the csv file does 
+            not start with the lines which were read anymore. The csv file is 
+            then parsed from the beginning.
+        
+        Args: 
+            state (dict): State as returned by get_state().
+        """
+        if not state or not self._is_cache_valid(state["cursor"]): 
+            return
+        cursor = state["cursor"]
+        with self._update_lock: 
+            if self._cache is not None: 
+                self._reset()
+                self._load_cache()
+            if not self._is_at_cursor(cursor): 
+                self._reload_until(cursor)
+            if self._table_store is None: 
+                return
+            self._set_cache_state(cursor)
+    
+    def subscribe(self, watcher, callback: callable=None): 
+        """Lets a FileWatcher report changes of the csv file.
+        
+        Args: 
+            watcher (FileWatcher): Watcher as created by create_file_watcher().
+            callback (callable): Called with the filepath when the csv file 
+                changes.
+        """
+        watcher.subscribe(self.filepath, callback)
+    
+    def join_metadata(self, df: pd.DataFrame) -> pd.DataFrame: 
+        """Adds the metadata columns to the rows of df.
+        
+        Note: 
+            Meant for recorders with broadcast_metadata=False: Query the rows 
+            first, e.g. with get_table(start=..., end=...), and join the 
+            metadata to these rows only. Each metadata column is a categorical 
+            with a single category, which costs one byte per row. 
+        
+        Args: 
+            df (pd.DataFrame): Rows of the table.
+        
+        Returns: 
+            New dataframe with the columns of df and the metadata columns.
+        """
+        if not self.has_metadata or self._metadata_df is None or len(self._metadata_df.index) == 0: 
+            return df
+        codes = np.zeros(len(df.index), dtype=np.int8)
+        metadata_columns = {
+            i: pd.Categorical.from_codes(codes, categories=pd.Index([value], dtype=object))
+            for i, value in enumerate(self._metadata_df.iloc[0])
+            }
+        metadata_df = pd.DataFrame(metadata_columns, index=df.index)
+        metadata_df.columns = self._metadata_df.columns
+        return pd.concat([df, metadata_df], axis=1)
+    
     def is_up_to_date(self) -> bool:
         """Returns true if the csv has not been modified since the last loading.
         
         Returns: 
             bool
         """
-        return self.last_updated == self._get_mod_time()
+        return self.last_updated == self._get_fingerprint()
     
-    def _get_mod_time(self): 
-        """Get the modification time of the csv file.
+    def _get_fingerprint(self) -> FileFingerprint: 
+        """Get the fingerprint (modification time, size, inode) of the csv file.
         """
-        return time.ctime(os.path.getmtime(self.filepath))
+        return FileFingerprint.of_file(self.filepath)
+    
+    def _get_file_change(self, fingerprint: FileFingerprint) -> str: 
+        """Classifies the change of the csv file since the last update.
+        
+        Returns: 
+            One of the attributes of FileChange.
+        """
+        return compare_fingerprints(self.last_updated, fingerprint)
+    
+    def _reset(self): 
+        """Forgets everything which was read, such that the next update reads 
+        the csv file from the beginning.
+        """
+        self.read_data_lines = 0
+        self._synced_data_lines = 0
+        self._tail_reader.reset()
+        self._partial_line = None
+        self._table_store = None
+        self._metadata_df = None
+        self._metadata_fingerprint = None
+        self._rollups = None
+        for aggregate in self.rolling_aggregates.values(): 
+            aggregate.reset()
     
-    def _update(self): 
+    def _update(self, use_cache: bool=True): 
         """Update both the data and the metadata with the csv file.
+        
+        Note: 
+            Only the new rows are merged with the metadata, harmonized and 
+            appended to the table. The full table is just rebuilt on the first 
+            loading or when the metadata changed. A truncated or replaced csv 
+            file is read from the beginning again.
+        
+        Args: 
+            use_cache (bool): Whether the table may be restored from the cache 
+                on the first loading.
         """
+        if self._table_store is None and self._cache is not None and use_cache: 
+            self._load_cache()
         if self.is_up_to_date() and not self.always_update: 
             return 
         
-        # Merge with metadata
-        self._data_df = self.get_data()
+        # Take the fingerprint before reading, such that data which is 
+        # appended while reading is detected by the next update
+        fingerprint = self._get_fingerprint()
+        if self._get_file_change(fingerprint) in (FileChange.truncated, FileChange.replaced): 
+            self._reset()
+        
+        # Load new data and metadata
+        old_metadata_df = self._metadata_df
+        new_data_df = self._update_data()
+        self.data_last_updated = fingerprint
         if self.has_metadata: 
             self._metadata_df = self.get_metadata()
-            self._table_df = self._data_df.merge(self._metadata_df, how='cross')
+        new_data_df = self._update_partial_line(new_data_df)
+            
+        # Case first loading or changed metadata: Rebuild the full table
+        if self._table_store is None or not self._is_same_metadata(old_metadata_df): 
+            if self._table_store is not None: 
+                new_data_df = pd.concat([self._data_df, new_data_df], ignore_index=True)
+            self._table_store = ColumnStore.from_frame(self._build_table(new_data_df))
+            if 'timestamp' in self._table_store.columns:
+                self._table_store.sort(by='timestamp')
+            self._rebuild_rollups()
+            self._rebuild_rolling_aggregates()
+        
+        # Case reloading: Just process the new rows
         else: 
-            self._table_df = self._data_df
+            new_table_df = self._build_table(new_data_df)
+            self._append_to_table(new_table_df)
+            self._update_rollups(new_table_df)
+            self._update_rolling_aggregates(new_table_df)
             
-        # Harmonize timestamps
-        self._harmonize_time()
+        self._apply_retention()
+        self.last_updated = fingerprint
+        if self._cache is not None and (self._cache_saved_at is None 
+                or time.monotonic() - self._cache_saved_at >= self._cache_interval_s): 
+            self.save_cache()
+        
+    def _apply_retention(self): 
+        """Evicts the oldest rows according to max_rows and max_age_s.
+        """
+        store = self._table_store
+        nr_evicted = 0
+        if self.max_rows is not None: 
+            nr_evicted = max(nr_evicted, len(store) - int(self.max_rows))
+        if self.max_age_s is not None and len(store) > 0 and 'timestamp' in store.columns: 
+            timestamps = store.column('timestamp')
+            cutoff = timestamps[-1] - int(self.max_age_s * 1e9)
+            nr_evicted = max(nr_evicted, int(np.searchsorted(timestamps, cutoff, side='left')))
+        if nr_evicted <= 0: 
+            return
+        if self.spill_path is not None: 
+            evicted_df = self._table_df.iloc[:nr_evicted]
+            header = not os.path.exists(self.spill_path)
+            evicted_df.to_csv(self.spill_path, mode="a", index=False, header=header)
+        store.drop_head(nr_evicted)
+        for aggregate in self.rolling_aggregates.values(): 
+            aggregate.drop_head(nr_evicted)
+    
+    @staticmethod
+    def _copy_if(df: pd.DataFrame, copy: bool) -> pd.DataFrame: 
+        return df.copy() if copy and df is not None else df
+    
+    def _slice_rows(self, df: pd.DataFrame, start, end, timestamps: np.ndarray=None) -> pd.DataFrame: 
+        """Selects the rows in [start, end] by binary search on the timestamps.
         
-        # Sort if possible
-        if 'timestamp' in self._table_df.columns:
-            self._table_df.sort_values(by='timestamp', inplace=True)
+        Note: 
+            The table is kept sorted by timestamp, such that the query costs
+            O(log n) and returns a view instead of a copy. 
+        """
+        if df is None or (start is None and end is None): 
+            return df
+        if timestamps is None: 
+            timestamps = self._table_store.column("timestamp")
+        lo = 0 if start is None else np.searchsorted(timestamps, to_timestamp(start), side="left")
+        hi = len(timestamps) if end is None else np.searchsorted(timestamps, to_timestamp(end), side="right")
+        return df.iloc[lo:max(lo, hi)]
+    
+    def _rebuild_rollups(self): 
+        """Builds the rollups from the rows of the table.
+        """
+        self._rollups = None
+        if self.rollup_resolutions_s is None or self._table_store is None: 
+            return
+        self._update_rollups(self._table_df)
+    
+    def _update_rollups(self, new_table_df: pd.DataFrame): 
+        """Adds new rows to the rollups. The rollups are rebuilt from the table
+        if the new rows are older than the open buckets.
+        """
+        if self.rollup_resolutions_s is None or 'timestamp' not in new_table_df.columns: 
+            return
+        if self._rollups is None: 
+            columns = [
+                column for column in self._data_columns 
+                if column in new_table_df.columns and new_table_df[column].dtype.kind in "iuf"
+                ]
+            self._rollups = RollupPyramid(self.rollup_resolutions_s, columns)
+        elif not self._rollups.is_in_order(new_table_df): 
+            self._rebuild_rollups()
+            return
+        self._rollups.add(new_table_df)
+    
+    def _rebuild_rolling_aggregates(self): 
+        """Calculates the rolling statistics from the rows of the table.
+        """
+        for aggregate in self.rolling_aggregates.values(): 
+            aggregate.reset()
+        if self._table_store is not None: 
+            self._update_rolling_aggregates(self._table_df)
+    
+    def _update_rolling_aggregates(self, new_table_df: pd.DataFrame): 
+        """Adds new rows to the rolling statistics. They are recalculated from 
+        the table if the new rows are older than the last processed row.
+        """
+        if not self.rolling_aggregates or 'timestamp' not in new_table_df.columns: 
+            return
+        if not new_table_df['timestamp'].is_monotonic_increasing: 
+            new_table_df = new_table_df.sort_values(by='timestamp', kind='stable')
+        timestamps = new_table_df['timestamp'].to_numpy()
+        if len(timestamps) == 0: 
+            return
+        for aggregate in self.rolling_aggregates.values(): 
+            if aggregate.last_timestamp is not None and timestamps[0] < aggregate.last_timestamp: 
+                self._rebuild_rolling_aggregates()
+                return
+        for aggregate in self.rolling_aggregates.values(): 
+            values = new_table_df[aggregate.column].to_numpy(dtype=np.float64, na_value=np.nan)
+            aggregate.add(timestamps, values)
+    
+    def _get_cache_key(self) -> str: 
+        return type(self).__name__ + ":" + os.path.abspath(self.filepath)
+    
+    def _get_sidecar_path(self, name: str) -> str: 
+        """Path of a file with additional data of the recorder (e.g. a line 
+        index) in the cache folder. None if the cache is not enabled.
+        """
+        if self._cache is None: 
+            return None
+        return self._cache.get_filepath(self._get_cache_key() + ":" + name)
+    
+    def _get_cache_state(self) -> dict: 
+        """Everything apart from the table which is needed to continue reading.
+        """
+        return {
+            "fingerprint": list(self.last_updated),
+            "offset": self._tail_reader.offset,
+            "lines": self._tail_reader.lines,
+            "tail_digest": self._get_tail_digest(self._tail_reader.offset),
+            "read_data_lines": self.read_data_lines,
+            "nr_header_lines": self._nr_header_lines,
+            "partial_line": None if self._partial_line is None else [
+                self._partial_line[0], self._partial_line[1].decode("latin-1")
+                ],
+            "data_columns": list(self._data_columns),
+            "metadata": None if self._metadata_df is None else {
+                "columns": list(self._metadata_df.columns), 
+                "rows": self._metadata_df.values.tolist()
+                },
+            }
+    
+    def _set_cache_state(self, state: dict): 
+        self.last_updated = FileFingerprint(*state["fingerprint"])
+        self.data_last_updated = self.last_updated
+        self._tail_reader.reset()
+        self._tail_reader.offset = state["offset"]
+        self._tail_reader.lines = state["lines"]
+        self.read_data_lines = state["read_data_lines"]
+        self._synced_data_lines = self.read_data_lines
+        self._nr_header_lines = state["nr_header_lines"]
+        partial_line = state["partial_line"]
+        self._partial_line = None if partial_line is None else (partial_line[0], partial_line[1].encode("latin-1"))
+        self._data_columns = state["data_columns"]
+        metadata = state["metadata"]
+        if metadata is not None: 
+            self._metadata_df = pd.DataFrame(data=metadata["rows"], columns=metadata["columns"])
+    
+    def _is_cache_valid(self, state: dict) -> bool: 
+        """Checks that the csv file still starts with the bytes which were read.
+        """
+        fingerprint = self._get_fingerprint()
+        return fingerprint.inode == state["fingerprint"][2] \
+            and fingerprint.size >= state["offset"] \
+            and self._get_tail_digest(state["offset"]) == state["tail_digest"]
+    
+    def _load_cache(self): 
+        """Restores the table and the read cursor if the cache is valid.
+        """
+        cached = self._cache.load(self._get_cache_key())
+        if cached is None: 
+            return
+        store, state = cached
+        if not self._is_cache_valid(state): 
+            return
+        self._table_store = store
+        self._set_cache_state(state)
+        self._cache_saved_at = time.monotonic()
+        self._rebuild_rollups()
+        self._rebuild_rolling_aggregates()
+    
+    def _is_at_cursor(self, cursor: dict) -> bool: 
+        """Whether the table contains exactly the rows which were read up to 
+        cursor, e.g. after it was restored from the cache.
+        """
+        return self._table_store is not None and self._tail_reader.offset == cursor["offset"]
+    
+    def _reload_until(self, cursor: dict): 
+        """Parses the csv file from the beginning up to the offset of cursor 
+        (plus the partial line which was read), e.g. to restore the table of 
+        a checkpoint.
+        
+        Note: 
+            Recorders which read in chunks (e.g. lines_per_update of the 
+            SSDRecorder) are updated until they reach the offset.
+        """
+        self._reset()
+        partial_line = cursor["partial_line"]
+        self._tail_reader.stop_offset = cursor["offset"] \
+            + (0 if partial_line is None else len(partial_line[1].encode("latin-1")))
+        try: 
+            while True: 
+                offset = self._tail_reader.offset
+                self.last_updated = None
+                self._update(use_cache=False)
+                if self._tail_reader.offset >= cursor["offset"] or self._tail_reader.offset == offset: 
+                    break
+        finally: 
+            self._tail_reader.stop_offset = None
+    
+    def _get_tail_digest(self, offset: int, nbytes: int=4096) -> str: 
+        """Hash of the nbytes bytes in front of offset.
+        """
+        with open(self.filepath, "rb") as f: 
+            f.seek(max(offset - nbytes, 0))
+            return hashlib.sha1(f.read(min(offset, nbytes))).hexdigest()
+    
+    def _build_table(self, data_df: pd.DataFrame) -> pd.DataFrame: 
+        """Merges data rows with the metadata and harmonizes their timestamps.
+        
+        Args: 
+            data_df (pd.DataFrame): Rows of the data.
+            
+        Returns: 
+            Pandas dataframe with the same index as data_df.
+        """
+        if len(data_df.index) == 0 and self._table_store is not None: 
+            return self._table_df.iloc[:0]
+        
+        # Merge with metadata
+        if self.has_metadata and self.broadcast_metadata: 
+            table_df = data_df.merge(self._metadata_df, how='cross')
+            table_df.index = data_df.index
+        else: 
+            table_df = data_df.copy(deep=False)
             
-        self.last_updated = self._get_mod_time()
+        # Harmonize timestamps
+        if len(inspect.signature(self._harmonize_time).parameters) > 0: 
+            self._harmonize_time(table_df)
+            return table_df
+        
+        # Subclasses which were written for the full table harmonize 
+        # self._table_df in place
+        self._harmonizing_df = table_df
+        try: 
+            self._harmonize_time()
+            return self._harmonizing_df
+        finally: 
+            self._harmonizing_df = None
+    
+    def _append_to_table(self, new_table_df: pd.DataFrame): 
+        """Appends new rows to the table and keeps it sorted by timestamp.
+        
+        Note: 
+            The full table is only sorted when the new rows are older than the 
+            last row of the table. 
+        
+        Args: 
+            new_table_df (pd.DataFrame): New rows as returned by _build_table().
+        """
+        if len(new_table_df.index) == 0: 
+            return
+        
+        # Check the order
+        in_order = True
+        if 'timestamp' in new_table_df.columns: 
+            if not new_table_df['timestamp'].is_monotonic_increasing: 
+                new_table_df = new_table_df.sort_values(by='timestamp', kind='stable')
+            in_order = len(self._table_store) == 0 \
+                or new_table_df['timestamp'].iloc[0] >= self._table_store.column('timestamp')[-1]
+        
+        # Append and sort if necessary
+        self._table_store.append(new_table_df)
+        if not in_order: 
+            self._table_store.sort(by='timestamp')
+    
+    def _is_same_metadata(self, old_metadata_df: pd.DataFrame) -> bool: 
+        """Returns true if the metadata did not change since the last update.
+        """
+        if not self.has_metadata: 
+            return True
+        return old_metadata_df is not None and old_metadata_df.equals(self._metadata_df)
         
-    def _update_data(self):
-        """ Updates self._data_df and self.data_last_updated incrementally. 
+    def _update_data(self) -> pd.DataFrame:
+        """ Loads the data rows which were added since the last update. 
         
         Note: 
-            Makes use of _load_new_data(). 
+            Makes use of _load_initial_data() and _load_new_data(). 
+            
+        Returns: 
+            Pandas dataframe with the rows which were added.
         """
         
         # Case first loading 
         if self.read_data_lines == 0: 
-            self._data_df = self._load_initial_data()
-            self._data_columns = list(self._data_df.columns) 
-            self.read_data_lines += len(self._data_df.index)
-            return 
+            self._tail_reader.reset()
+            if self._is_parallel_load(): 
+                data_df = self._load_initial_data_in_parallel()
+            else: 
+                data_df = self._apply_schema(self._load_initial_data())
+            self._data_columns = list(data_df.columns) 
+            self.read_data_lines += len(data_df.index)
+            self._nr_header_lines = self._tail_reader.lines - self.read_data_lines
+            self._synced_data_lines = self.read_data_lines
+            return data_df
         
         # Case reloading
-        new_data_df = self._load_new_data()
+        self._sync_tail_reader()
+        new_data_df = self._apply_schema(self._load_new_data())
         self.read_data_lines += len(new_data_df.index)
+        self._synced_data_lines = self.read_data_lines
+        return new_data_df
+    
+    def _update_partial_line(self, new_data_df: pd.DataFrame) -> pd.DataFrame: 
+        """Reads the unfinished last line of the previous update again and 
+        adds the current unfinished line as provisional row, see 
+        parse_partial_line. 
+        
+        Note: 
+            The provisional row stays in the table if its line was complete 
+            already, which is the usual case. Otherwise it is dropped and the 
+            rollups and rolling statistics are rebuilt. 
+        
+        Args: 
+            new_data_df (pd.DataFrame): Rows of the complete lines which were 
+                read by this update.
+        
+        Returns: 
+            The rows which have to be added to the table.
+        """
+        if self._partial_line is not None: 
+            offset, line = self._partial_line
+            self._partial_line = None
+            last_read = self._tail_reader.last_read
+            first_line = last_read.split(b"\n", 1)[0].rstrip(b"\r")
+            if self._tail_reader.offset - len(last_read) == offset and len(new_data_df.index) > 0 \
+                    and first_line == line.rstrip(b"\r"): 
+                new_data_df = new_data_df.iloc[1:]
+            elif self._table_store is not None: 
+                self._table_store.drop_tail(1)
+                self._rebuild_rollups()
+                self._rebuild_rolling_aggregates()
+        
+        if not self.parse_partial_line or not self._data_columns: 
+            return new_data_df
+        line = self._tail_reader.read_partial_line()
+        if not line.strip(): 
+            return new_data_df
+        try: 
+            partial_df = self._apply_schema(self._read_csv(
+                io.BytesIO(line + b"\n"), header=None, names=self._data_columns))
+            is_valid = self._is_valid_partial_row(self._build_table(partial_df))
+        except (ValueError, TypeError, KeyError): 
+            # Not readable yet, e.g. a half-written timestamp
+            return new_data_df
+        if not is_valid: 
+            return new_data_df
+        self._partial_line = (self._tail_reader.offset, line)
         if len(new_data_df.index) == 0: 
+            return partial_df
+        return self._apply_schema(pd.concat([new_data_df, partial_df], ignore_index=True))
+    
+    def _is_valid_partial_row(self, table_df: pd.DataFrame) -> bool: 
+        """Checks that the row of an unfinished line is complete, i.e. that 
+        no column is missing. Subclasses can check the values, e.g. against 
+        the states which a log can contain.
+        
+        Args: 
+            table_df (pd.DataFrame): Provisional row, merged and harmonized.
+        """
+        return not table_df[self._data_columns].isna().to_numpy().any()
+    
+    def _is_parallel_load(self) -> bool: 
+        return self.parallel_load_workers is not None \
+            and self._tail_reader.stop_offset is None \
+            and self._get_range_parser() is not None \
+            and self._get_fingerprint().size >= self.parallel_load_min_bytes
+    
+    def _load_initial_data_in_parallel(self) -> pd.DataFrame: 
+        """Loads the header and the first lines with _load_initial_data() 
+        and parses the remaining complete lines in a process pool.
+        """
+        nr_of_ranges = self.parallel_load_workers
+        self._tail_reader.stop_offset = self._get_fingerprint().size // (nr_of_ranges + 1)
+        try: 
+            head_df = self._apply_schema(self._load_initial_data())
+        finally: 
+            self._tail_reader.stop_offset = None
+        
+        ranges = split_line_ranges(self.filepath, nr_of_ranges, start=self._tail_reader.offset)
+        dfs = parse_line_ranges(self.filepath, ranges, self._get_range_parser(), max_workers=nr_of_ranges)
+        if len(ranges) > 0: 
+            # Continue behind the last range, each parsed line is one row
+            self._tail_reader.offset = ranges[-1][1]
+            self._tail_reader.lines += sum(len(df.index) for df in dfs)
+        dfs = [df for df in dfs if len(df.index) > 0]
+        if not dfs: 
+            return head_df
+        # Categories differ between the ranges and are unified by the schema
+        return self._apply_schema(pd.concat([head_df] + dfs, ignore_index=True))
+    
+    def _get_range_parser(self): 
+        """Returns a picklable function which parses the bytes of complete 
+        data lines like _load_new_data(), one row per line. None if the 
+        lines cannot be parsed independently, which disables the parallel 
+        initial load.
+        """
+        return None
+    
+    def _get_dtypes(self) -> dict: 
+        """Resolves the schema to dtypes which pandas understands.
+        
+        Returns: 
+            Dictionary from column to dtype. A defaultdict if schema_default 
+            is set.
+        """
+        float_dtype = "float32" if self.downcast_floats else "float64"
+        resolve = lambda dtype: float_dtype if dtype == "float" else dtype
+        dtypes = {column: resolve(dtype) for column, dtype in self.schema.items()}
+        if self.schema_default is None: 
+            return dtypes
+        default_dtype = resolve(self.schema_default)
+        return defaultdict(lambda: default_dtype, dtypes)
+    
+    def _apply_schema(self, df: pd.DataFrame) -> pd.DataFrame: 
+        """Converts the columns whose dtype differs from the schema, e.g. the 
+        columns of empty or aggregated dataframes.
+        """
+        if not self.schema and self.schema_default is None: 
+            return df
+        dtypes = self._get_dtypes()
+        conversions = {}
+        for column in df.columns.unique(): 
+            if column not in dtypes and self.schema_default is None: 
+                continue
+            dtype = pd.api.types.pandas_dtype(dtypes[column])
+            if df[column].dtype != dtype: 
+                conversions[column] = dtype
+        return df.astype(conversions) if conversions else df
+    
+    def _sync_tail_reader(self): 
+        """Moves the tail reader to the line after read_data_lines data lines.
+        
+        Note: 
+            Only necessary when read_data_lines was changed from outside, for 
+            example to read the last lines again. 
+        """
+        if self.read_data_lines == self._synced_data_lines or self._tail_reader.lines == 0: 
             return
-
-        # Concatenate old and new
-        self._data_df = pd.concat(
-            [self._data_df, new_data_df],
-            axis=0,
-            join="outer",
-            ignore_index=True,
-            copy=True
-        )
+        self._tail_reader.seek_line(self._nr_header_lines + self.read_data_lines)
+        self._synced_data_lines = self.read_data_lines
+        
+    def _read_new_lines(self, max_lines: int=None) -> io.BytesIO: 
+        """Reads the complete lines which were appended since the last read.
+        
+        Args: 
+            max_lines (int): Maximal number of lines to read. Reads all new 
+                lines if None.
+        
+        Returns: 
+            Buffer with the raw bytes of the new lines.
+        """
+        return io.BytesIO(self._tail_reader.read(max_lines=max_lines))
+    
+    def _read_header_lines(self, n: int, encoding: str="default", delimiter: str=None) -> list: 
+        """Parses the first n lines of the csv file without reading the rest.
+        
+        Args: 
+            n (int): Number of header lines.
+            encoding (str): Encoding of the header. Defaults to the encoding 
+                of the recorder, None stands for the platform default.
+            delimiter (str): Delimiter of the header. Defaults to the 
+                delimiter of the recorder.
+        
+        Returns: 
+            List with one list of fields per line.
+        """
+        encoding = self.encoding if encoding == "default" else encoding
+        with open(self.filepath, newline='', encoding=encoding) as f: 
+            reader = csv.reader(f, delimiter=delimiter or self.delimiter)
+            return list(itertools.islice(reader, n))
+    
+    def _read_csv(self, buffer: io.BytesIO, **kwargs) -> pd.DataFrame: 
+        """Parses a buffer of csv lines as returned by _read_new_lines().
+        
+        Args: 
+            buffer (io.BytesIO): Raw csv lines.
+            kwargs: Keyword arguments passed to pd.read_csv. The delimiter 
+                and the encoding default to the ones of the recorder.
+                
+        Note: 
+            Lines which the pyarrow engine cannot parse are parsed with the C 
+            engine instead, see csv_engine.read_csv().
+        
+        Returns: 
+            Pandas dataframe. Empty (with the given names as columns) if the 
+            buffer does not contain any lines.
+        """
+        if buffer.getbuffer().nbytes == 0: 
+            return pd.DataFrame(columns=kwargs.get("names", self._data_columns))
+        kwargs.setdefault("delimiter", self.delimiter)
+        kwargs.setdefault("encoding", self.encoding)
+        if self.schema or self.schema_default is not None: 
+            kwargs.setdefault("dtype", self._get_dtypes())
+        return read_csv(buffer, engine=self.parse_engine, **kwargs)
     
     def _timestamp_to_datetimes(self, df: pd.DataFrame): 
         """Takes a dataframe with a timestamp column (int) and adds datetime.
@@ -158,8 +1064,7 @@ class Recorder(object):
         Args: 
             df (pd.DataFrame): Datarame which should be manipulated.
         """
-        conversion_to_datetime = lambda x: datetime.datetime.fromtimestamp(x/1000000000).strftime('%Y-%m-%d %H:%M:%S')
-        df["datetime"] = df["timestamp"].apply(conversion_to_datetime)
+        df["datetime"] = timestamps_to_datetimes(df["timestamp"])
     
     @abstractmethod
     def _load_initial_data(self) -> pd.DataFrame: 
@@ -168,11 +1073,7 @@ class Recorder(object):
         Returns: 
             Pandas dataframe.
         """
-        return pd.read_csv(
-            filepath_or_buffer=self.filepath, 
-            delimiter=self.delimiter,
-            encoding=self.encoding
-            )
+        return self._read_csv(self._read_new_lines())
     
     @abstractmethod
     def _load_new_data(self) -> pd.DataFrame: 
@@ -181,12 +1082,10 @@ class Recorder(object):
         Returns: 
             Pandas dataframe.
         """
-        return pd.read_csv(
-            filepath_or_buffer=self.filepath, 
-            skiprows=self.read_data_lines,
-            header=0,
-            names=self._data_columns,
-            encoding=self.encoding
+        return self._read_csv(
+            self._read_new_lines(),
+            header=None,
+            names=self._data_columns
             )
     
     @abstractmethod
@@ -199,7 +1098,17 @@ class Recorder(object):
         pass
     
     @abstractmethod
-    def _harmonize_time(self): 
+    def _harmonize_time(self, df: pd.DataFrame): 
         """Converts the time format of the csv file to a standard time format.
+        
+        Note: 
+            Subclasses which implement _harmonize_time(self) without argument,
+            as before the table was kept in a ColumnStore, are still 
+            supported: They modify self._table_df, which then holds the rows
+            which are harmonized. 
+        
+        Args: 
+            df (pd.DataFrame): Table rows to which the columns timestamp and 
+                datetime are added in place.
         """
         pass
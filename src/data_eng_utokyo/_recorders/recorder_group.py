@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""Refreshes several recorders concurrently.
+
+A session typically has one recorder per data source. Refreshing them one after the other costs the sum of their
+update times, although most of the time is spent in file I/O and in the csv parser of pandas, which both release the
+GIL. The RecorderGroup refreshes all recorders on a thread pool instead, such that a cycle costs about as much as the
+slowest recorder.
+
+Example:
+    .. code:: python
+
+        with RecorderGroup([ssd_recorder, heater_recorder, coil_recorder]) as group:
+            changed_recorders = group.refresh()
+
+        # In a coroutine
+        changed_recorders = await group.refresh_async()
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+class RecorderGroup(object):
+    """Refreshes a set of recorders on a thread pool.
+
+    Args:
+        recorders (list): Recorders, e.g. SSDRecorder or HeaterRecorder.
+        max_workers (int): Number of threads. One per recorder if None.
+
+    Attributes:
+        recorders (list): Recorders of the group, each one appears once.
+        max_workers (int): Number of threads. One per recorder if None.
+    """
+
+    def __init__(self, recorders: list=(), max_workers: int=None):
+        self.recorders = []
+        self.max_workers = max_workers
+        self._executor = None
+        self._executor_size = 0
+        for recorder in recorders:
+            self.add(recorder)
+
+    def add(self, recorder):
+        """Adds a recorder to the group. Adding the same recorder again has no effect.
+
+        Args:
+            recorder (Recorder): Recorder to refresh with the group.
+        """
+        if not any(r is recorder for r in self.recorders):
+            self.recorders.append(recorder)
+
+    def remove(self, recorder):
+        """Removes a recorder from the group.
+
+        Args:
+            recorder (Recorder): Recorder which was added before.
+        """
+        self.recorders = [r for r in self.recorders if r is not recorder]
+
+    def refresh(self) -> list:
+        """Refreshes all recorders concurrently and blocks until they are done.
+
+        Note:
+            A recorder which fails does not stop the others. The first error
+            is raised after all recorders finished.
+
+        Returns:
+            List with the recorders whose csv file changed since the last
+            refresh.
+        """
+        recorders = list(self.recorders)
+        last_updated = [recorder.last_updated for recorder in recorders]
+        executor = self._get_executor()
+        futures = [executor.submit(recorder.refresh) for recorder in recorders]
+        errors = [future.exception() for future in futures]
+        return self._get_changed_recorders(recorders, last_updated, errors)
+
+    async def refresh_async(self) -> list:
+        """Same as refresh(), but waits without blocking the event loop.
+
+        Returns:
+            List with the recorders whose csv file changed since the last
+            refresh.
+        """
+        recorders = list(self.recorders)
+        last_updated = [recorder.last_updated for recorder in recorders]
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        results = await asyncio.gather(
+            *[loop.run_in_executor(executor, recorder.refresh) for recorder in recorders],
+            return_exceptions=True
+            )
+        errors = [result if isinstance(result, BaseException) else None for result in results]
+        return self._get_changed_recorders(recorders, last_updated, errors)
+
+    def close(self):
+        """Shuts the thread pool down.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Returns the thread pool, recreated if recorders were added since it was created.
+        """
+        size = self.max_workers or max(len(self.recorders), 1)
+        if self._executor is None or self._executor_size != size:
+            self.close()
+            self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="RecorderGroup")
+            self._executor_size = size
+        return self._executor
+
+    @staticmethod
+    def _get_changed_recorders(recorders: list, last_updated: list, errors: list) -> list:
+        for error in errors:
+            if error is not None:
+                raise error
+        return [
+            recorder for recorder, old_fingerprint in zip(recorders, last_updated)
+            if recorder.last_updated != old_fingerprint
+            ]
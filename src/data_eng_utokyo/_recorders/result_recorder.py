@@ -3,10 +3,10 @@
 """
 
 
-import numpy as np
 import pandas as pd
 
 from .recorder import Recorder
+from .._utilities.time_conversion import parse_timestamps, add_time_columns
 
 
 class SSDResultsRecorder(Recorder):
@@ -19,9 +19,9 @@ class SSDResultsRecorder(Recorder):
             always_update=always_update
             )
         
-    def _harmonize_time(self):
-        self._table_df["timestamp"] = self._table_df["timestamp_ns"]
-        self._timestamp_to_datetimes(self._table_df)
+    def _harmonize_time(self, df: pd.DataFrame):
+        df["timestamp"] = df["timestamp_ns"]
+        self._timestamp_to_datetimes(df)
         
 
 class ImageResultsRecorder(Recorder): 
@@ -35,8 +35,8 @@ class ImageResultsRecorder(Recorder):
             always_update=always_update
             )
     
-    def _harmonize_time(self): 
-        self._table_df["timestamp"] = self._table_df["datetime"].apply(pd.Timestamp).values.astype(np.int64)
+    def _harmonize_time(self, df: pd.DataFrame): 
+        add_time_columns(df, parse_timestamps(df["datetime"], self.time_format))
 
 
 class ParameterRecorder(Recorder): 
@@ -50,6 +50,5 @@ class ParameterRecorder(Recorder):
             always_update=always_update
             )
         
-    def _harmonize_time(self):
-        self._table_df["datetime"] = pd.to_datetime(self._table_df["Time"])
-        self._table_df["timestamp"] = self._table_df["datetime"].values.astype(np.int64)
+    def _harmonize_time(self, df: pd.DataFrame):
+        add_time_columns(df, parse_timestamps(df["Time"], self.time_format))
@@ -5,11 +5,20 @@ Applicable for data from the WE7000 DAQ for the SSD2. The PMT current from the M
 next experiment.
 """
 
-import csv
+import functools
+import io
+
 import numpy as np
 import pandas as pd
 
 from .recorder import Recorder
+from .._utilities.column_store import ColumnStore
+from .._utilities.line_index import LineIndex
+from .._utilities.parallel_loader import parse_csv_lines
+from .._utilities.we7000_parser import parse_list_mode
+from .._utilities.time_conversion import (
+    parse_timestamp, parse_seconds_to_ns, ticks_to_ns, add_time_columns, to_timestamp
+    )
 
 
 class SSDRecorder(Recorder): 
@@ -18,93 +27,163 @@ class SSDRecorder(Recorder):
     Note:
         * In most cases, there is too much data incoming at once. In this case, we recommend to use the SSDParser, which
             reads the data in chunks.
+        * read_rows() and read_rows_at() jump to any row or time with a sparse index of the line offsets, see
+            LineIndex. The index is saved in the cache folder if enable_cache() was called.
     """
+    
+    column_names = ["TraceName", "Time_x", "PulseHeight"]
 
-    def __init__(self, filepath: str, always_update: bool=False, lines_per_update: int=1e5):
+    def __init__(self, filepath: str, always_update: bool=False, lines_per_update: int=1e5, 
+                 broadcast_metadata: bool=True):
         super(SSDRecorder, self).__init__(
             filepath=filepath, 
             has_metadata=True, 
             always_update=always_update,
+            broadcast_metadata=broadcast_metadata
             )
         self.nr_meta_data_rows = 37
+        self.time_format = "%Y/%m/%d %H:%M:%S"  # //StartDate + //StartTime: 2022/03/14 10:07:54
+        self.schema = {"TraceName": "int64", "Time_x": "int64", "PulseHeight": "int16"}
         self.lines_per_update = lines_per_update
         self.loaded_everything = False
+        self._line_index = None
+        self._nr_new_rows = 0   # Rows read by the last update
+        self._time_conversion = None   # (metadata, start in ns, ns per tick)
+        
+    def get_line_index(self, every: int=1024) -> LineIndex: 
+        """ Returns the index of the byte offset and Time_x of every n-th row, extended with the rows which were 
+            appended since the last call. 
+        """
+        if self._line_index is None or self._line_index.every != every: 
+            self._line_index = LineIndex(self.filepath, header_lines=self.nr_meta_data_rows + 1, key_column=1, 
+                                         every=every, sidecar_path=self._get_sidecar_path("line_index"))
+        self._line_index.update()
+        return self._line_index
+    
+    def read_rows(self, start: int, nrows: int) -> pd.DataFrame: 
+        """ Reads nrows rows starting at row start, without parsing the rows in front of them. The rows are not added 
+            to the table. 
+        """
+        return self._parse_rows(self.get_line_index().read_rows(start, nrows))
+    
+    def read_rows_at(self, time, nrows: int) -> pd.DataFrame: 
+        """ Reads nrows rows starting at the first pulse at or after time (anything which to_timestamp accepts). """
+        self.get_metadata()
+        start_ns, ns_per_tick = self._get_time_conversion()
+        line_index = self.get_line_index()
+        start = line_index.find_row(float((to_timestamp(time) - start_ns) / ns_per_tick))
+        return self._parse_rows(line_index.read_rows(start, nrows))
         
     def is_up_to_date(self) -> bool:
         return all((
-            self.last_updated == self._get_mod_time(),
+            self.last_updated == self._get_fingerprint(),
             self.loaded_everything
             ))
             
+    def _reset(self): 
+        super(SSDRecorder, self)._reset()
+        self.loaded_everything = False
+            
     def _load_initial_data(self) -> pd.DataFrame: 
+        """ Skip the metadata lines and load the first part. """
+        self._read_new_lines(max_lines=self.nr_meta_data_rows + 1)
         return self._load_new_data()
 
     def _load_new_data(self) -> pd.DataFrame: 
         """ Just load the new part. """
-        df = pd.read_csv(
-            filepath_or_buffer=self.filepath, 
-            skiprows=self.nr_meta_data_rows + self.read_data_lines, 
-            header=0, 
-            nrows=self.lines_per_update, 
-            names=["TraceName", "Time_x", "PulseHeight"]
-            )     
+        df = self._parse_lines(self._read_new_lines(max_lines=self.lines_per_update))
         nrows = len(df.index)
         self.loaded_everything = nrows < self.lines_per_update
+        self._nr_new_rows += nrows
         return df
 
+    def _parse_lines(self, buffer: io.BytesIO) -> pd.DataFrame: 
+        """ Parses data lines with the numpy parser for the WE7000 list mode. Falls back to pandas if the lines do not 
+            match the format or if a parse engine was chosen explicitly. 
+        """
+        df = parse_list_mode(buffer.getbuffer()) if self.parse_engine == "auto" else None
+        if df is None: 
+            df = self._read_csv(buffer, header=None, names=self.column_names)
+        return df
+    
+    def _get_range_parser(self): 
+        """ Pulses are independent lines, such that the initial load can be parsed in parallel. """
+        return functools.partial(
+            _parse_pulse_lines, 
+            fast=self.parse_engine == "auto", 
+            engine=self.parse_engine, 
+            names=self.column_names, 
+            delimiter=self.delimiter, 
+            dtype=self._get_dtypes()
+            )
+    
     def _load_metadata(self): 
-        """ Overwrite the metadata with the new version. """
-        with open(self.filepath, newline='') as f:
-            reader = csv.reader(f)
-            metadata = []
-            for i in range(self.nr_meta_data_rows + 1):
-                metadata.append(next(reader))
-            metadata =  metadata[:3] +  metadata[4:]
-            columns = [line[0] for line in metadata]
-            row = [line[1] for line in metadata]
-            return pd.DataFrame(data=[row], columns=columns)
+        """ Parses the header lines, the data lines are not read. """
+        metadata = self._read_header_lines(self.nr_meta_data_rows + 1, encoding=None)
+        metadata =  metadata[:3] +  metadata[4:]
+        columns = [line[0] for line in metadata]
+        row = [line[1] for line in metadata]
+        return pd.DataFrame(data=[row], columns=columns)
                 
-    def _harmonize_time(self): 
+    def _harmonize_time(self, df: pd.DataFrame): 
         """ Convert the relative time and start time to the real time. """
         
-        def harmonize_table(df: pd.DataFrame) -> pd.DataFrame: 
-            # Start time
-            helper_df = pd.DataFrame()
-            helper_df["start_datetime_str"] = df["//StartDate"].apply(lambda s: s.replace("/", "-")) + " " + df["//StartTime"]
-            helper_df["start_datetime"] = pd.to_datetime(helper_df["start_datetime_str"]) 
-
-            # Conversion parameter: Time_x * rel_time_to_ns = rel. time in ns
-            time_resolution = df['//TimeResolution'][0]
-            rel_time_to_ns = {
-                '1.000000e-009': 1e-0,
-                '1.000000e-006': 1e+3,
-                '1.000000e-003': 1e+6
-            }[time_resolution]
-
-            # Real time
-            helper_df["relative_time_ns"] = df["Time_x"] * rel_time_to_ns
-            helper_df["start_ns"] = helper_df.start_datetime.values.astype(np.int64)
-            helper_df["timestamp"] = helper_df["start_ns"] + helper_df["relative_time_ns"]
-
-            # Add datetimes
-            df["timestamp"] = helper_df["timestamp"]
-            self._timestamp_to_datetimes(df)
-            return df
+        # Start time (the same for all rows of the file)
+        if len(df.index) == 0: 
+            add_time_columns(df, [])
+            return
+        start_ns, ns_per_tick = self._get_time_conversion()
+        add_time_columns(df, start_ns + ticks_to_ns(df["Time_x"].to_numpy(), ns_per_tick))
         
-        self._table_df = harmonize_table(self._table_df)
+    def _get_time_conversion(self) -> tuple: 
+        """ Returns the start time in ns and the duration of one Time_x tick in ns (exact Fraction), both parsed once 
+            per file from the metadata, e.g. //TimeResolution 1.000000e-006 -> 1000 ns. 
+        """
+        metadata = self._metadata_df.iloc[0]
+        if self._time_conversion is None or self._time_conversion[0] is not self._metadata_df: 
+            start_ns = parse_timestamp(metadata["//StartDate"] + " " + metadata["//StartTime"], self.time_format)
+            ns_per_tick = parse_seconds_to_ns(metadata['//TimeResolution'])
+            self._time_conversion = (self._metadata_df, start_ns, ns_per_tick)
+        return self._time_conversion[1:]
+    
+    def _parse_rows(self, data: bytes) -> pd.DataFrame: 
+        """ Parses raw data lines and merges them with the metadata like the rows of the table. """
+        self.get_metadata()
+        df = self._apply_schema(self._parse_lines(io.BytesIO(data)))
+        return self._build_table(df)
         
         
+def _parse_pulse_lines(data: bytes, fast: bool=True, **kwargs) -> pd.DataFrame: 
+    """ Parses pulse lines in a worker process, with the numpy parser if possible. """
+    df = parse_list_mode(data) if fast else None
+    return parse_csv_lines(data, **kwargs) if df is None else df
+
+
 class SSDParser(SSDRecorder): 
     """Records the SSD data in chunks.
 
     Acts as a parser in the sense that it forgets about the old data upon reloading. This keeps the table size small.
     """
     
-    def _update_data(self):
-        new_data_df = self._load_new_data()
-        self.read_data_lines += len(new_data_df.index)
-        if len(new_data_df.index) > 0: 
-            self._data_df = new_data_df
+    def iter_chunks(self): 
+        """ Yields the chunks of at most lines_per_update pulses which were not read yet, with the same columns as the 
+            table. One file handle is kept open while iterating, such that a whole file is read in one linear pass. 
+            Calling it again after the file grew continues after the last chunk. 
+        """
+        with self._tail_reader: 
+            while True: 
+                with self._update_lock: 
+                    self._nr_new_rows = 0
+                    self.refresh()
+                    if self._nr_new_rows == 0: 
+                        return
+                    chunk_df = self._table_df
+                yield chunk_df
+    
+    def _append_to_table(self, new_table_df: pd.DataFrame): 
+        """ Replace the table by the new chunk, keep the last chunk if there is nothing new. """
+        if len(new_table_df.index) > 0: 
+            self._table_store = ColumnStore.from_frame(new_table_df)
     
         
         
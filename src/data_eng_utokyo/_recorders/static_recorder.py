@@ -8,6 +8,8 @@ room, then we use this static recorder.
 
 import pandas as pd
 
+from .._utilities.time_conversion import to_timestamp
+
 
 class StaticRecorder:
     """ Represents a static pandas dataframe as a recorder. 
@@ -25,14 +27,30 @@ class StaticRecorder:
         self.read_data_lines = len(df.index)
         self.last_updated = 0
         
-    def get_table(self) -> pd.DataFrame: 
-        return self.df
+    def get_table(self, start=None, end=None, copy: bool=True) -> pd.DataFrame: 
+        if start is None and end is None: 
+            return self.df.copy() if copy else self.df
+        mask = pd.Series(True, index=self.df.index)
+        if start is not None: 
+            mask &= self.df["timestamp"] >= to_timestamp(start)
+        if end is not None: 
+            mask &= self.df["timestamp"] <= to_timestamp(end)
+        return self.df[mask]
+    
+    def get_data(self, start=None, end=None, copy: bool=True) -> pd.DataFrame: 
+        return self.get_table(start=start, end=end, copy=copy)
     
-    def get_data(self) -> pd.DataFrame: 
-        return self.df
+    def refresh(self): 
+        pass
     
     def get_metadata(self) -> pd.DataFrame:
         return pd.DataFrame()
     
     def is_up_to_date(self) -> bool:
         return True
+    
+    def get_state(self) -> dict: 
+        return {}
+    
+    def set_state(self, state: dict): 
+        pass
@@ -0,0 +1,361 @@
+# -*- coding: utf-8 -*-
+"""Append-optimized columnar storage for tables which grow over time.
+
+Each column is kept in a typed numpy buffer with spare capacity. The capacity is doubled when the buffer is full, such
+that appending k rows costs O(k) amortized instead of copying the full history like pd.concat does. A pandas view of the
+table is only built when it is requested and then cached until the next change. The view shares the memory of the
+buffers and is read-only: Copy it before modifying values in place.
+
+Old rows can be dropped from the head in O(1) by moving the start of the live rows. The memory of dropped rows is
+released when the buffers are compacted, which happens at the next reallocation, such that a store with a bounded
+number of rows also needs bounded memory.
+
+Categorical columns are stored as int32 codes together with their categories. New categories are appended to the
+existing ones, such that the codes of old rows never change.
+
+Columns are matched by name. Duplicate names are allowed, the n-th column with a given name is matched with the n-th
+column of the same name.
+"""
+
+import inspect
+
+import numpy as np
+import pandas as pd
+
+# The codes are valid by construction. Skipping their validation requires pandas 2.1
+_from_codes_kwargs = {"validate": False} if "validate" in inspect.signature(pd.Categorical.from_codes).parameters \
+    else {}
+
+
+class ColumnStore(object):
+    """Table with one growable numpy buffer per column.
+
+    Args:
+        capacity (int): Number of rows for which memory is reserved initially.
+
+    Example:
+        .. code:: python
+
+            store = ColumnStore()
+            store.append(pd.DataFrame({"timestamp": [1, 2], "value": [0.5, 0.7]}))
+            store.append(pd.DataFrame({"timestamp": [3], "value": [0.9]}))
+            df = store.to_frame()   # 3 rows, index 0, 1, 2
+    """
+
+    def __init__(self, capacity: int=1024):
+        self._capacity = max(int(capacity), 1)
+        self._start = 0   # Position of the first live row
+        self._size = 0    # Position after the last live row
+        self._buffers = {}
+        self._categories = {}   # Categories of the categorical columns
+        self._index = np.empty(self._capacity, dtype=np.int64)
+        self._next_label = 0
+        self._frame = None
+
+    def __len__(self) -> int:
+        return self._size - self._start
+
+    @property
+    def columns(self) -> list:
+        """Names of the columns in the order in which they were added.
+        """
+        return [name for name, _ in self._buffers]
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame):
+        """Creates a store which contains the rows of df.
+
+        Args:
+            df (pd.DataFrame): Initial rows.
+
+        Returns:
+            ColumnStore
+        """
+        store = cls(capacity=len(df.index))
+        store.append(df)
+        return store
+
+    @classmethod
+    def from_arrays(cls, columns: list, arrays: list, index: np.ndarray):
+        """Creates a store from one array per column, e.g. as returned by arrays().
+
+        Args:
+            columns (list): Names of the columns.
+            arrays (list): One numpy array or pd.Categorical per column, all with the same length.
+            index (np.ndarray): Row labels as int64.
+
+        Returns:
+            ColumnStore
+        """
+        store = cls(capacity=len(index))
+        for key, values in zip(cls._keys(columns), arrays):
+            if isinstance(values, pd.Categorical):
+                store._categories[key] = values.categories
+                values = values.codes.astype(np.int32)
+            store._buffers[key] = store._grow_to_capacity(np.asarray(values))
+        store._index = store._grow_to_capacity(np.asarray(index, dtype=np.int64))
+        store._size = len(index)
+        store._next_label = int(index.max()) + 1 if len(index) > 0 else 0
+        return store
+
+    @property
+    def index(self) -> np.ndarray:
+        """Read-only numpy view of the row labels.
+        """
+        return self._read_only(self._index)
+
+    def arrays(self) -> list:
+        """Returns a read-only numpy view (pd.Categorical for categorical columns) of each column, in the order of
+        columns.
+        """
+        return [self._get_values(key) for key in self._buffers]
+
+    def append(self, df: pd.DataFrame):
+        """Appends the rows of df at the end of the table.
+
+        Note:
+            The index of df is ignored. The rows are labeled with consecutive integers in the order of arrival. Columns
+            which are missing on one side are filled with missing values.
+
+        Args:
+            df (pd.DataFrame): New rows.
+        """
+        k = len(df.index)
+        self._reserve(self._size + k)
+
+        # Copy the new values into the buffers
+        keys = self._keys(df.columns)
+        for i, key in enumerate(keys):
+            column = df.iloc[:, i]
+            if key in self._categories or (key not in self._buffers and isinstance(column.dtype, pd.CategoricalDtype)):
+                self._append_categorical(key, column)
+                continue
+            values = self._to_numpy(column)
+            if key not in self._buffers:
+                self._add_column(key, values.dtype)
+            self._ensure_dtype(key, values.dtype)
+            self._buffers[key][self._size:self._size + k] = values
+
+        # Fill columns which are not part of df
+        for key in self._buffers:
+            if key not in keys and k > 0 and key in self._categories:
+                self._buffers[key][self._size:self._size + k] = -1
+            elif key not in keys and k > 0:
+                self._ensure_dtype(key, self._missing_dtype(self._buffers[key].dtype))
+                buffer = self._buffers[key]
+                buffer[self._size:self._size + k] = self._missing_value(buffer.dtype)
+
+        self._index[self._size:self._size + k] = np.arange(self._next_label, self._next_label + k)
+        self._next_label += k
+        self._size += k
+        if k > 0 or len(df.columns) > 0:
+            self._frame = None
+
+    def drop_head(self, n: int):
+        """Drops the first n rows in O(1).
+
+        Args:
+            n (int): Number of rows to drop.
+        """
+        n = min(max(int(n), 0), len(self))
+        if n == 0:
+            return
+        self._start += n
+        self._frame = None
+
+    def drop_tail(self, n: int):
+        """Drops the last n rows.
+
+        Note:
+            The remaining rows are copied into new buffers, such that the values seen by existing views do not change
+            when rows are appended afterwards. This costs O(rows) and is meant for rare corrections.
+
+        Args:
+            n (int): Number of rows to drop.
+        """
+        n = min(max(int(n), 0), len(self))
+        if n == 0:
+            return
+        self._take(np.arange(len(self) - n))
+
+    def to_frame(self) -> pd.DataFrame:
+        """Returns the table as pandas dataframe.
+
+        Note:
+            The dataframe shares memory with the store and its values are read-only.
+
+        Returns:
+            Pandas dataframe.
+        """
+        if self._frame is None:
+            index = pd.Index(self._read_only(self._index), copy=False)
+            data = {
+                i: pd.Series(self._get_values(key), index=index, copy=False)
+                for i, key in enumerate(self._buffers)
+                }
+            frame = pd.DataFrame(data, index=index, copy=False)
+            frame.columns = pd.Index(self.columns)
+            self._frame = frame
+        return self._frame
+
+    def column(self, name: str) -> np.ndarray:
+        """Returns a read-only numpy view of one column.
+
+        Args:
+            name (str): Name of the column. The first one is returned if the name is not unique.
+
+        Returns:
+            Numpy array with one entry per row. For categorical columns, these are the codes.
+        """
+        return self._read_only(self._buffers[(name, 0)])
+
+    def sort(self, by: str):
+        """Sorts the rows by the values of one column (stable).
+
+        Args:
+            by (str): Name of the column.
+        """
+        order = np.argsort(self._buffers[(by, 0)][self._start:self._size], kind="stable")
+        self._take(order)
+
+    def _take(self, positions: np.ndarray):
+        """Replaces the table by the rows at the given positions (relative to the first live row). Builds new buffers,
+        such that views stay valid.
+        """
+        n = len(positions)
+        capacity = max(self._capacity, n, 1)
+        for key, buffer in self._buffers.items():
+            new_buffer = np.empty(capacity, dtype=buffer.dtype)
+            new_buffer[:n] = buffer[self._start:self._size][positions]
+            self._buffers[key] = new_buffer
+        new_index = np.empty(capacity, dtype=np.int64)
+        new_index[:n] = self._index[self._start:self._size][positions]
+        self._index = new_index
+        self._capacity = capacity
+        self._start = 0
+        self._size = n
+        self._frame = None
+
+    def _reserve(self, size: int):
+        """Reallocates the buffers if the position size does not fit. Dropped rows are removed at the same time.
+
+        Note:
+            The new capacity is at least twice the number of live rows, such that the copy is amortized over the
+            following appends.
+        """
+        if size <= self._capacity:
+            return
+        live = self._size - self._start
+        capacity = self._capacity
+        while capacity < size - self._start or capacity < 2 * live:
+            capacity *= 2
+        for key, buffer in self._buffers.items():
+            self._buffers[key] = self._grow(buffer, capacity)
+        self._index = self._grow(self._index, capacity)
+        self._capacity = capacity
+        self._size = live
+        self._start = 0
+
+    def _grow_to_capacity(self, values: np.ndarray) -> np.ndarray:
+        buffer = np.empty(self._capacity, dtype=values.dtype)
+        buffer[:len(values)] = values
+        return buffer
+
+    def _grow(self, buffer: np.ndarray, capacity: int) -> np.ndarray:
+        new_buffer = np.empty(capacity, dtype=buffer.dtype)
+        new_buffer[:self._size - self._start] = buffer[self._start:self._size]
+        return new_buffer
+
+    def _get_values(self, key: tuple):
+        """Read-only view of a column, as pd.Categorical for categorical columns.
+        """
+        if key in self._categories:
+            return pd.Categorical.from_codes(self._read_only(self._buffers[key]), categories=self._categories[key],
+                                             **_from_codes_kwargs)
+        return self._read_only(self._buffers[key])
+
+    def _append_categorical(self, key: tuple, column: pd.Series):
+        """Appends a column as codes. Categories which are new are added after the existing ones.
+        """
+        values = column.array if isinstance(column.dtype, pd.CategoricalDtype) else pd.Categorical(column)
+        if key not in self._buffers:
+            buffer = np.empty(self._capacity, dtype=np.int32)
+            buffer[:self._size] = -1
+            self._buffers[key] = buffer
+            self._categories[key] = values.categories[:0]
+        categories = self._categories[key]
+        new_categories = values.categories.difference(categories, sort=False)
+        if len(new_categories) > 0:
+            categories = categories.append(new_categories)
+            self._categories[key] = categories
+            self._frame = None
+        codes = pd.Categorical(values, categories=categories).codes
+        self._buffers[key][self._size:self._size + len(codes)] = codes
+
+    @staticmethod
+    def _keys(columns) -> list:
+        """Numbers duplicate column names: ["a", "b", "a"] -> [("a", 0), ("b", 0), ("a", 1)].
+        """
+        counts = {}
+        keys = []
+        for name in columns:
+            keys.append((name, counts.get(name, 0)))
+            counts[name] = counts.get(name, 0) + 1
+        return keys
+
+    def _add_column(self, key: tuple, dtype: np.dtype):
+        """Adds a column. Rows which existed before get missing values.
+        """
+        buffer = np.empty(self._capacity, dtype=dtype)
+        if self._size > 0:
+            buffer = np.empty(self._capacity, dtype=self._missing_dtype(dtype))
+            buffer[:self._size] = self._missing_value(buffer.dtype)
+        self._buffers[key] = buffer
+
+    def _ensure_dtype(self, key: tuple, dtype: np.dtype):
+        """Promotes the buffer of a column such that it can hold values of dtype.
+        """
+        buffer = self._buffers[key]
+        if buffer.dtype == dtype:
+            return
+        try:
+            # The dtype of a column without rows, e.g. object for an empty csv file, is replaced
+            new_dtype = dtype if self._size == self._start else np.result_type(buffer.dtype, dtype)
+        except TypeError:
+            new_dtype = np.dtype(object)
+        if new_dtype != buffer.dtype:
+            new_buffer = np.empty(self._capacity, dtype=new_dtype)
+            new_buffer[self._start:self._size] = buffer[self._start:self._size]
+            self._buffers[key] = new_buffer
+            self._frame = None
+
+    @staticmethod
+    def _to_numpy(series: pd.Series) -> np.ndarray:
+        """Numeric, boolean and datetime columns keep their numpy dtype. Everything else is stored as object.
+        """
+        if isinstance(series.dtype, np.dtype) and series.dtype.kind in "biufcmM":
+            return series.to_numpy()
+        return series.to_numpy(dtype=object)
+
+    @staticmethod
+    def _missing_dtype(dtype: np.dtype) -> np.dtype:
+        """Returns the dtype which is needed to represent missing values next to values of dtype.
+        """
+        if dtype.kind in "iu":
+            return np.dtype(np.float64)
+        if dtype.kind == "b":
+            return np.dtype(object)
+        return dtype
+
+    @staticmethod
+    def _missing_value(dtype: np.dtype):
+        if dtype.kind in "fc":
+            return np.nan
+        if dtype.kind in "mM":
+            return np.datetime64("NaT") if dtype.kind == "M" else np.timedelta64("NaT")
+        return None
+
+    def _read_only(self, buffer: np.ndarray) -> np.ndarray:
+        view = buffer[self._start:self._size]
+        view.flags.writeable = False
+        return view
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""Parses csv data with the C engine of pandas or, opt-in, with pyarrow.
+
+pandas parses csv files either with its own single-threaded C engine or with pyarrow, which splits the data into blocks
+and parses them on multiple threads. The engine "auto" uses the C engine, pyarrow is opt-in with the engine "pyarrow",
+because the engines do not return the same table: pyarrow infers dtypes on its own, e.g. a column with times like
+"2022-03-14 10:07:41" becomes datetime64 instead of str, and columns without an explicit dtype would depend on whether
+pyarrow happens to be installed. Small buffers, e.g. the few lines which were appended since the last update, are parsed
+faster by the C engine anyway because they cannot be split.
+
+pyarrow is an optional dependency: Without it, "pyarrow" resolves to the C engine as well. Data or options which pyarrow
+cannot handle (e.g. rows with a varying number of fields) fall back to the C engine, such that the result does not
+depend on which packages are installed.
+
+Example:
+    .. code:: python
+
+        df = read_csv(io.BytesIO(data), engine="auto", header=None, names=["Time", "Value"])
+"""
+
+import functools
+import importlib.util
+import io
+
+import pandas as pd
+
+
+PARSE_ENGINES = ("auto", "pyarrow", "c", "python")
+
+
+@functools.lru_cache(maxsize=None)
+def is_pyarrow_available() -> bool:
+    """Returns whether the pyarrow engine of pandas can be used.
+    """
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def resolve_engine(engine: str="auto") -> str:
+    """Translates an engine setting to the engine which is used.
+
+    Note:
+        "auto" does not pick pyarrow even if it is installed: pyarrow infers other dtypes than the C engine (e.g.
+        datetime64 for times), such that the tables of the recorders would depend on the installed packages.
+
+    Args:
+        engine (str): One of PARSE_ENGINES. "auto" resolves to "c", "pyarrow" resolves to "c" if pyarrow is not
+            installed.
+
+    Returns:
+        Name of the engine as understood by pd.read_csv.
+    """
+    if engine not in PARSE_ENGINES:
+        raise ValueError(f"Unknown parse engine {engine}, choose one of {PARSE_ENGINES}.")
+    if engine == "auto":
+        return "c"
+    if engine == "pyarrow":
+        return "pyarrow" if is_pyarrow_available() else "c"
+    return engine
+
+
+def read_csv(buffer: io.BytesIO, engine: str="auto", **kwargs) -> pd.DataFrame:
+    """Parses a buffer with csv data.
+
+    Note:
+        For pyarrow, an integer skiprows and a header line which is replaced by names are cut from the buffer before
+        the data is parsed, because pyarrow counts skipped rows differently than the C engine.
+
+    Args:
+        buffer (io.BytesIO): Raw csv data.
+        engine (str): One of PARSE_ENGINES.
+        kwargs: Keyword arguments passed to pd.read_csv.
+
+    Returns:
+        Pandas dataframe.
+    """
+    engine = resolve_engine(engine)
+    if engine == "pyarrow":
+        try:
+            return _read_csv_with_pyarrow(buffer.getvalue(), **kwargs)
+        except (ValueError, TypeError, NotImplementedError):
+            # Unsupported option or data, e.g. a ragged row: Parse it with the C engine instead
+            engine = "c"
+    buffer.seek(0)
+    return pd.read_csv(buffer, engine=engine, **kwargs)
+
+
+def _read_csv_with_pyarrow(data: bytes, skiprows=None, **kwargs) -> pd.DataFrame:
+    if skiprows is not None and not isinstance(skiprows, int):
+        raise TypeError("pyarrow only supports an integer skiprows.")
+    skiprows = skiprows or 0
+    if kwargs.get("names") is not None and isinstance(kwargs.get("header"), int):
+        # The header line is replaced by names anyway, skipping it keeps pyarrow from matching dtypes to its names
+        skiprows += kwargs["header"] + 1
+        kwargs["header"] = None
+    if skiprows > 0:
+        data = _skip_lines(data, skiprows)
+    return pd.read_csv(io.BytesIO(data), engine="pyarrow", **kwargs)
+
+
+def _skip_lines(data: bytes, n: int) -> bytes:
+    """Removes the first n lines of data.
+    """
+    position = 0
+    for _ in range(n):
+        position = data.find(b"\n", position) + 1
+        if position == 0:
+            return b""
+    return data[position:]
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Detects how a file changed between two polls.
+
+A fingerprint consists of the modification time in nanoseconds, the size and the inode of a file. Comparing two
+fingerprints tells whether the file is unchanged, whether data was appended, or whether it was truncated or replaced.
+Only the last two cases require to read the file from the beginning again.
+"""
+
+import os
+from collections import namedtuple
+
+
+class FileChange(object):
+    """Possible results of compare_fingerprints().
+    """
+    unchanged = "unchanged"
+    appended = "appended"
+    truncated = "truncated"
+    replaced = "replaced"
+
+
+class FileFingerprint(namedtuple("FileFingerprint", ["mtime_ns", "size", "inode"])):
+    """State of a file at one point in time.
+
+    Attributes:
+        mtime_ns (int): Modification time in nanoseconds since the epoch.
+        size (int): Size in bytes.
+        inode (int): Inode number (file index on Windows). Changes when the file is replaced by a new one.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def of_file(cls, filepath: str):
+        """Takes the fingerprint of a file or folder.
+
+        Args:
+            filepath (str): Path to the file.
+
+        Returns:
+            FileFingerprint
+        """
+        stat = os.stat(filepath)
+        return cls(mtime_ns=stat.st_mtime_ns, size=stat.st_size, inode=stat.st_ino)
+
+
+def compare_fingerprints(old, new: FileFingerprint) -> str:
+    """Classifies the change of a file between two fingerprints.
+
+    Note:
+        If old is not a fingerprint, e.g. because the file was not read yet, the change is classified as appended,
+        such that the reader continues where it stopped.
+
+    Args:
+        old (FileFingerprint): Fingerprint at the last read.
+        new (FileFingerprint): Current fingerprint.
+
+    Returns:
+        One of the attributes of FileChange.
+    """
+    if not isinstance(old, FileFingerprint):
+        return FileChange.appended
+    if old == new:
+        return FileChange.unchanged
+    if old.inode != new.inode:
+        return FileChange.replaced
+    if new.size < old.size:
+        return FileChange.truncated
+    if new.size == old.size:
+        # Same size but newer content: The file was rewritten in place
+        return FileChange.replaced
+    return FileChange.appended
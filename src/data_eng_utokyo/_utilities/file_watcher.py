@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+"""Wakes up as soon as a watched file or folder changes.
+
+On Linux, the InotifyWatcher lets the kernel report writes to the watched files, such that an analysis can react within
+milliseconds instead of waiting for the next period of the Runner. On other platforms, the PollingWatcher compares the
+fingerprints of the files periodically. Both implement the same interface, use create_file_watcher() to get the best
+one which is available.
+
+Example:
+    .. code:: python
+
+        watcher = create_file_watcher()
+        heater_recorder.subscribe(watcher)
+        while True:
+            changed_paths = watcher.wait(timeout=60)
+            if changed_paths:
+                df = heater_recorder.get_table()
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from abc import abstractmethod
+
+from .file_fingerprint import FileFingerprint
+
+
+class FileWatcher(object):
+    """Base class for watching files and folders.
+
+    Note:
+        A file is reported when it is written, replaced or deleted. A folder is reported when a file in it or in one of
+        its subfolders (including subfolders which are created later) is created, written, moved or deleted, like the
+        files which PathHelper.get_filepaths() finds.
+    """
+
+    def __init__(self):
+        self._callbacks = {}
+
+    def subscribe(self, path: str, callback: callable=None):
+        """Starts watching a path. Subscribing the same path again is allowed.
+
+        Args:
+            path (str): Path to a file or a folder.
+            callback (callable): Called with the path as argument when the path changes.
+        """
+        path = os.path.abspath(path)
+        callbacks = self._callbacks.setdefault(path, [])
+        if callback is not None and callback not in callbacks:
+            callbacks.append(callback)
+        self._watch(path)
+
+    def unsubscribe(self, path: str):
+        """Stops watching a path.
+
+        Args:
+            path (str): Path to a file or a folder.
+        """
+        path = os.path.abspath(path)
+        if self._callbacks.pop(path, None) is not None:
+            self._unwatch(path)
+
+    @property
+    def paths(self) -> list:
+        """Absolute paths which are watched.
+        """
+        return list(self._callbacks)
+
+    def wait(self, timeout: float=None) -> set:
+        """Blocks until at least one of the watched paths changed or the timeout expired.
+
+        Args:
+            timeout (float): Maximal waiting time in seconds. Waits forever if None.
+
+        Note:
+            Changes of other files in the folder of a watched file, e.g. sidecar files written by the recorders, do not
+            end the wait.
+
+        Returns:
+            Set with the absolute paths which changed. Empty if the timeout expired.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining_s = None if deadline is None else max(deadline - time.monotonic(), 0)
+            changed_paths = self._wait(remaining_s) & set(self._callbacks)
+            if changed_paths or (deadline is not None and time.monotonic() >= deadline):
+                break
+        for path in changed_paths:
+            for callback in self._callbacks.get(path, []):
+                callback(path)
+        return changed_paths
+
+    def close(self):
+        """Releases the resources of the watcher.
+        """
+        for path in self.paths:
+            self.unsubscribe(path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @abstractmethod
+    def _watch(self, path: str):
+        pass
+
+    @abstractmethod
+    def _unwatch(self, path: str):
+        pass
+
+    @abstractmethod
+    def _wait(self, timeout: float) -> set:
+        """Returns the paths which changed, possibly including paths which are not watched.
+        """
+        pass
+
+
+class PollingWatcher(FileWatcher):
+    """Detects changes by comparing the fingerprints of the watched paths periodically.
+
+    Args:
+        poll_interval_s (float): Time between two comparisons in seconds.
+    """
+
+    def __init__(self, poll_interval_s: float=0.5):
+        super(PollingWatcher, self).__init__()
+        self.poll_interval_s = poll_interval_s
+        self._fingerprints = {}
+
+    def _watch(self, path: str):
+        if path not in self._fingerprints:
+            self._fingerprints[path] = self._get_fingerprint(path)
+
+    def _unwatch(self, path: str):
+        self._fingerprints.pop(path, None)
+
+    def _wait(self, timeout: float) -> set:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed_paths = set()
+            for path, old_fingerprint in list(self._fingerprints.items()):
+                fingerprint = self._get_fingerprint(path)
+                if fingerprint != old_fingerprint:
+                    self._fingerprints[path] = fingerprint
+                    changed_paths.add(path)
+            if changed_paths:
+                return changed_paths
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            sleep_s = self.poll_interval_s
+            if deadline is not None:
+                sleep_s = min(sleep_s, deadline - time.monotonic())
+            time.sleep(max(sleep_s, 0))
+
+    @staticmethod
+    def _get_fingerprint(path: str):
+        """Fingerprint of a file. For a folder, the fingerprints of all files and subfolders in it.
+        """
+        try:
+            fingerprint = FileFingerprint.of_file(path)
+        except OSError:
+            return None
+        if not os.path.isdir(path):
+            return fingerprint
+        fingerprints = [fingerprint]
+        for folder, subfolders, filenames in os.walk(path):
+            for name in sorted(subfolders) + sorted(filenames):
+                subpath = os.path.join(folder, name)
+                try:
+                    fingerprints.append((subpath, FileFingerprint.of_file(subpath)))
+                except OSError:
+                    continue
+        return fingerprints
+
+
+class InotifyWatcher(FileWatcher):
+    """Lets the Linux kernel report changes via inotify.
+
+    Note:
+        Files are watched through their folder, such that a file which is replaced (e.g. by log rotation) or created
+        later is still reported. Subscribed folders are watched together with all their subfolders, new subfolders
+        are added when they are created.
+    """
+
+    # Flags from <sys/inotify.h>
+    _IN_MODIFY = 0x00000002
+    _IN_ATTRIB = 0x00000004
+    _IN_CLOSE_WRITE = 0x00000008
+    _IN_MOVED_FROM = 0x00000040
+    _IN_MOVED_TO = 0x00000080
+    _IN_CREATE = 0x00000100
+    _IN_DELETE = 0x00000200
+    _IN_Q_OVERFLOW = 0x00004000
+    _IN_IGNORED = 0x00008000
+    _IN_ISDIR = 0x40000000
+    _MASK = _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self):
+        super(InotifyWatcher, self).__init__()
+        self._libc = self._load_libc()
+        if self._libc is None:
+            raise OSError("inotify is not available on this platform.")
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed.")
+        self._folder_by_wd = {}
+        self._wd_by_folder = {}
+        self._recursive_folders = set()   # Subscribed folders, watched with their subfolders
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Returns whether inotify can be used on this platform.
+        """
+        return cls._load_libc() is not None
+
+    def close(self):
+        super(InotifyWatcher, self).close()
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def _watch(self, path: str):
+        if not os.path.isdir(path):
+            self._add_watch(os.path.dirname(path))
+            return
+        self._recursive_folders.add(path)
+        self._add_tree_watches(path)
+
+    def _unwatch(self, path: str):
+        self._recursive_folders.discard(path)
+        folders = [folder for folder in self._wd_by_folder if folder == path or self._is_below(folder, path)]
+        folders.append(os.path.dirname(path))
+        for folder in folders:
+            if folder in self._wd_by_folder and not self._is_needed(folder):
+                wd = self._wd_by_folder.pop(folder)
+                del self._folder_by_wd[wd]
+                self._libc.inotify_rm_watch(self._fd, wd)
+
+    def _add_watch(self, folder: str):
+        if folder in self._wd_by_folder:
+            return
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(folder), self._MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"Cannot watch {folder}.")
+        self._folder_by_wd[wd] = folder
+        self._wd_by_folder[folder] = wd
+
+    def _add_tree_watches(self, folder: str):
+        """Watches a folder and all its subfolders.
+        """
+        self._add_watch(folder)
+        for parent, subfolders, _ in os.walk(folder):
+            for name in subfolders:
+                try:
+                    self._add_watch(os.path.join(parent, name))
+                except OSError:
+                    # Removed in the meantime
+                    continue
+
+    def _is_needed(self, folder: str) -> bool:
+        """Whether a folder is watched with its subfolders or contains a subscribed file.
+        """
+        return self._is_recursive(folder) or any(os.path.dirname(p) == folder for p in self._callbacks)
+
+    def _is_recursive(self, folder: str) -> bool:
+        """Whether a folder is subscribed or below a subscribed folder.
+        """
+        return folder in self._recursive_folders or any(self._is_below(folder, p) for p in self._recursive_folders)
+
+    @staticmethod
+    def _is_below(path: str, folder: str) -> bool:
+        return path.startswith(folder.rstrip(os.sep) + os.sep)
+
+    def _wait(self, timeout: float) -> set:
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        changed_paths = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            changed_paths |= self._parse_events(data)
+        return changed_paths
+
+    def _parse_events(self, data: bytes) -> set:
+        """Translates the raw inotify events to the changed folders and files.
+        """
+        changed_paths = set()
+        offset = 0
+        while offset + self._EVENT.size <= len(data):
+            wd, mask, _, length = self._EVENT.unpack_from(data, offset)
+            name = data[offset + self._EVENT.size:offset + self._EVENT.size + length].rstrip(b"\0")
+            offset += self._EVENT.size + length
+            if mask & self._IN_Q_OVERFLOW:
+                return set(self._callbacks)
+            folder = self._folder_by_wd.get(wd)
+            if folder is None:
+                continue
+            if mask & self._IN_IGNORED:
+                # The folder was removed
+                del self._folder_by_wd[wd]
+                self._wd_by_folder.pop(folder, None)
+                continue
+            path = os.path.join(folder, os.fsdecode(name)) if name else folder
+            if mask & self._IN_ISDIR and mask & (self._IN_CREATE | self._IN_MOVED_TO) and self._is_recursive(folder):
+                # Files which were written before the watch was added are reported with the new folder
+                self._add_tree_watches(path)
+            changed_paths.add(path)
+            # A change in a subfolder is a change of all folders above it
+            while folder not in changed_paths:
+                changed_paths.add(folder)
+                folder = os.path.dirname(folder)
+        return changed_paths
+
+    @staticmethod
+    def _load_libc():
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            libc.inotify_init1, libc.inotify_add_watch, libc.inotify_rm_watch
+        except (OSError, AttributeError):
+            return None
+        return libc
+
+
+def create_file_watcher(poll_interval_s: float=0.5) -> FileWatcher:
+    """Creates an InotifyWatcher if inotify is available and a PollingWatcher otherwise.
+
+    Args:
+        poll_interval_s (float): Time between two comparisons in seconds, only used by the PollingWatcher.
+
+    Returns:
+        FileWatcher
+    """
+    if InotifyWatcher.is_available():
+        try:
+            return InotifyWatcher()
+        except OSError:
+            pass
+    return PollingWatcher(poll_interval_s=poll_interval_s)
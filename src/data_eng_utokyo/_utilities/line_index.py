@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""Sparse index of the line offsets of a large text file.
+
+The index stores the byte offset of every n-th data line together with the key of that line, e.g. Time_x of the SSD
+or the time in ms of the laser. Reading row k or the first row with a key >= t then costs a binary search in the index
+plus reading one block of n lines, instead of parsing the file from the beginning. The index is kept in memory and can
+be saved in a sidecar file, e.g. in the cache folder of a recorder, from which it is extended with the lines which were
+appended since it was saved.
+
+Example:
+    .. code:: python
+
+        index = LineIndex("ssd-Slot1-In2.csv", header_lines=38, key_column=1)
+        index.update()
+        data = index.read_rows(index.find_row(5 * 10**9), nrows=1000)
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from .file_fingerprint import FileFingerprint
+from .tail_reader import TailReader
+
+
+class LineIndex(object):
+    """Byte offsets and keys of every n-th data line of a file.
+
+    Note:
+        The keys have to be sorted in the file, as it is the case for relative times. Only complete lines are indexed.
+
+    Args:
+        filepath (str): Path to the data file.
+        header_lines (int): Number of lines before the first data line.
+        key_column (int): Position of the key in a data line.
+        delimiter (str): Delimiter of the columns.
+        every (int): Number of data lines per block.
+        sidecar_path (str): File in which the index is saved. The index is only kept in memory if None. Keep the
+            sidecar out of the folder of the data file, where it could be matched like a data file.
+
+    Attributes:
+        filepath (str): Path to the data file.
+        header_lines (int): Number of lines before the first data line.
+        key_column (int): Position of the key in a data line.
+        delimiter (str): Delimiter of the columns.
+        every (int): Number of data lines per block.
+        sidecar_path (str): File in which the index is saved, None if it is only kept in memory.
+        nr_of_rows (int): Number of data lines which were indexed.
+    """
+
+    def __init__(self, filepath: str, header_lines: int=0, key_column: int=0, delimiter: str=",",
+                 every: int=1024, sidecar_path: str=None):
+        self.filepath = filepath
+        self.header_lines = int(header_lines)
+        self.key_column = key_column
+        self.delimiter = delimiter
+        self.every = int(every)
+        self.sidecar_path = sidecar_path
+        self._reset()
+        self._load()
+
+    @property
+    def nr_of_rows(self) -> int:
+        return max(self._reader.lines - self.header_lines, 0)
+
+    def update(self, lines_per_read: int=1 << 16) -> int:
+        """Indexes the lines which were appended since the last update. Starts from scratch if the file was replaced
+        or truncated.
+
+        Args:
+            lines_per_read (int): Number of lines which are read at once.
+
+        Returns:
+            Number of data lines which were added to the index.
+        """
+        if not self._is_valid():
+            self._reset()
+        nr_of_rows = self.nr_of_rows
+        while True:
+            start_line = self._reader.lines
+            data = self._reader.read(max_lines=lines_per_read)
+            if not data:
+                break
+            self._add_block(data, start_line)
+        self._tail_digest = self._get_tail_digest(self._reader.offset)
+        added_rows = self.nr_of_rows - nr_of_rows
+        if added_rows > 0:
+            self.save()
+        return added_rows
+
+    def locate_row(self, row: int) -> tuple:
+        """Returns the start of the block which contains a data line.
+
+        Args:
+            row (int): Index of the data line, counted from zero.
+
+        Returns:
+            Tuple (byte offset, row) of the first line of the block.
+        """
+        if row < 0 or row >= self.nr_of_rows:
+            raise IndexError(f"Row {row} is not indexed, the index has {self.nr_of_rows} rows.")
+        block = row // self.every
+        return int(self._offsets[block]), block * self.every
+
+    def find_row(self, key: float) -> int:
+        """Returns the first data line with a key >= key, or nr_of_rows if there is none.
+
+        Note:
+            Only the block which contains the line is read.
+        """
+        block = int(np.searchsorted(self._keys, key, side="left")) - 1
+        if block < 0:
+            return 0
+        offset, row = int(self._offsets[block]), block * self.every
+        keys = self._parse_keys(self._read_lines(offset, min(self.every, self.nr_of_rows - row)))
+        return row + int(np.searchsorted(keys, key, side="left"))
+
+    def read_rows(self, start: int, nrows: int) -> bytes:
+        """Reads complete data lines.
+
+        Args:
+            start (int): Index of the first data line.
+            nrows (int): Maximal number of lines.
+
+        Returns:
+            The raw bytes of the lines, including their line breaks.
+        """
+        nrows = min(nrows, self.nr_of_rows - start)
+        if nrows <= 0:
+            return b""
+        offset, row = self.locate_row(start)
+        data = self._read_lines(offset, start - row + nrows)
+        skip = start - row
+        if skip > 0:
+            breaks = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == ord("\n"))
+            data = data[breaks[skip - 1] + 1:]
+        return data
+
+    def save(self):
+        """Writes the index to the sidecar file. A sidecar which cannot be written is skipped silently, the index is
+        then rebuilt on the next start.
+        """
+        if self.sidecar_path is None:
+            return
+        state = {
+            "settings": self._get_settings(),
+            "offset": self._reader.offset,
+            "lines": self._reader.lines,
+            "inode": self._inode,
+            "tail_digest": self._tail_digest,
+            }
+        tmp_path = self.sidecar_path + ".tmp.npz"
+        try:
+            np.savez(tmp_path, offsets=self._offsets, keys=self._keys, state=np.array(json.dumps(state)))
+            os.replace(tmp_path, self.sidecar_path)
+        except OSError:
+            pass
+
+    def _reset(self):
+        self._reader = TailReader(self.filepath)
+        self._offsets = np.empty(0, dtype=np.int64)
+        self._keys = np.empty(0, dtype=np.float64)
+        self._inode = None
+        self._tail_digest = None   # Hash of the bytes in front of the read offset
+
+    def _load(self):
+        """Restores the index from the sidecar file if it belongs to the current file.
+        """
+        if self.sidecar_path is None or not os.path.exists(self.sidecar_path):
+            return
+        try:
+            with np.load(self.sidecar_path) as npz:
+                state = json.loads(str(npz["state"]))
+                offsets, keys = npz["offsets"], npz["keys"]
+        except (OSError, ValueError, KeyError):
+            return
+        if state["settings"] != self._get_settings():
+            return
+        self._reader.offset, self._reader.lines = state["offset"], state["lines"]
+        self._offsets, self._keys = offsets, keys
+        self._inode, self._tail_digest = state["inode"], state["tail_digest"]
+        if not self._is_valid():
+            self._reset()
+
+    def _is_valid(self) -> bool:
+        """Checks that the file still starts with the indexed bytes.
+        """
+        fingerprint = FileFingerprint.of_file(self.filepath)
+        if self._inode is None:
+            self._inode = fingerprint.inode
+        if fingerprint.inode != self._inode or fingerprint.size < self._reader.offset:
+            return False
+        return self._tail_digest is None or self._get_tail_digest(self._reader.offset) == self._tail_digest
+
+    def _get_settings(self) -> dict:
+        return {"header_lines": self.header_lines, "key_column": self.key_column, "delimiter": self.delimiter,
+                "every": self.every}
+
+    def _add_block(self, data: bytes, start_line: int):
+        """Adds the offsets and keys of the block starts among the lines of data.
+        """
+        breaks = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == ord("\n"))
+        line_starts = np.concatenate([[0], breaks[:-1] + 1])
+        rows = np.arange(start_line, start_line + len(line_starts)) - self.header_lines
+        selected = np.flatnonzero((rows >= 0) & (rows % self.every == 0))
+        if len(selected) == 0:
+            return
+        base_offset = self._reader.offset - len(data)
+        keys = [self._parse_keys(data[line_starts[i]:breaks[i] + 1])[0] for i in selected]
+        self._offsets = np.concatenate([self._offsets, base_offset + line_starts[selected]])
+        self._keys = np.concatenate([self._keys, np.array(keys, dtype=np.float64)])
+
+    def _parse_keys(self, data: bytes) -> np.ndarray:
+        delimiter = self.delimiter.encode()
+        return np.array([float(line.split(delimiter)[self.key_column]) for line in data.splitlines()])
+
+    def _read_lines(self, offset: int, nrows: int) -> bytes:
+        reader = TailReader(self.filepath, block_size=1 << 16)
+        reader.offset = offset
+        return reader.read(max_lines=nrows)
+
+    def _get_tail_digest(self, offset: int, nbytes: int=4096) -> str:
+        with open(self.filepath, "rb") as f:
+            f.seek(max(offset - nbytes, 0))
+            return hashlib.sha1(f.read(min(offset, nbytes))).hexdigest()
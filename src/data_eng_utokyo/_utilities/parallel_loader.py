@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""Parses the lines of one large file in parallel processes.
+
+The file is split into byte ranges whose boundaries are moved to the next line break, such that every range consists
+of complete lines. Each worker process reads its range from the file itself, parses it with a picklable parser and
+returns a dataframe. The dataframes are returned in the order of the ranges, such that concatenating them gives the
+rows in the order of the file. Only files whose lines can be parsed independently of each other qualify, e.g. the
+list-mode data of the SSD or the heater log.
+
+Example:
+    .. code:: python
+
+        ranges = split_line_ranges(filepath, nr_of_ranges=8, start=header_end)
+        dfs = parse_line_ranges(filepath, ranges, functools.partial(parse_csv_lines, names=names))
+"""
+
+import io
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .csv_engine import read_csv
+
+
+def split_line_ranges(filepath: str, nr_of_ranges: int, start: int=0, end: int=None,
+                      block_bytes: int=1 << 16) -> list:
+    """Splits a part of a file into byte ranges of complete lines with about the same size.
+
+    Args:
+        filepath (str): Path to the file.
+        nr_of_ranges (int): Maximal number of ranges. Fewer ranges are returned for files with few lines.
+        start (int): Byte offset at which the first range starts, e.g. behind the header.
+        end (int): Byte offset up to which the file is split. The end of the file if None. A trailing line without
+            line break is not part of any range.
+        block_bytes (int): Number of bytes read at once while searching a line break.
+
+    Returns:
+        List of tuples (start, end) of byte offsets.
+    """
+    with open(filepath, "rb") as f:
+        end = _find_last_line_end(f, start, f.seek(0, 2) if end is None else end, block_bytes)
+        boundaries = [start]
+        for i in range(1, nr_of_ranges):
+            boundary = _find_next_line_start(f, start + (end - start) * i // nr_of_ranges - 1, end, block_bytes)
+            if boundary > boundaries[-1]:
+                boundaries.append(boundary)
+    if end > boundaries[-1]:
+        boundaries.append(end)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def parse_line_ranges(filepath: str, ranges: list, parser: callable, max_workers: int=None) -> list:
+    """Parses byte ranges of a file in a process pool.
+
+    Args:
+        filepath (str): Path to the file.
+        ranges (list): Tuples (start, end) as returned by split_line_ranges().
+        parser (callable): Picklable function which turns the bytes of a range into a dataframe, e.g. a
+            functools.partial of parse_csv_lines().
+        max_workers (int): Number of processes. One per CPU core if None.
+
+    Returns:
+        List with one dataframe per range, in the order of the ranges.
+    """
+    if len(ranges) == 0:
+        return []
+    if len(ranges) == 1 or max_workers == 1:
+        return [_parse_range(filepath, start, end, parser) for start, end in ranges]
+    with ProcessPoolExecutor(max_workers=min(max_workers or len(ranges), len(ranges))) as executor:
+        starts, ends = zip(*ranges)
+        return list(executor.map(
+            _parse_range, [filepath] * len(ranges), starts, ends, [parser] * len(ranges)))
+
+
+def parse_csv_lines(data: bytes, engine: str="auto", **kwargs) -> pd.DataFrame:
+    """Parses csv lines without header, see csv_engine.read_csv().
+
+    Args:
+        data (bytes): Complete csv lines.
+        engine (str): Parse engine.
+        kwargs: Keyword arguments passed to pd.read_csv, e.g. names and dtype.
+
+    Returns:
+        Pandas dataframe.
+    """
+    if len(data) == 0:
+        return pd.DataFrame(columns=kwargs.get("names"))
+    return read_csv(io.BytesIO(data), engine=engine, header=None, **kwargs)
+
+
+def _parse_range(filepath: str, start: int, end: int, parser: callable) -> pd.DataFrame:
+    with open(filepath, "rb") as f:
+        f.seek(start)
+        return parser(f.read(end - start))
+
+
+def _find_next_line_start(f, position: int, end: int, block_bytes: int) -> int:
+    """Returns the offset behind the first line break at or after position, at most end.
+    """
+    while position < end:
+        f.seek(position)
+        block = f.read(min(block_bytes, end - position))
+        breaks = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == ord("\n"))
+        if len(breaks) > 0:
+            return position + int(breaks[0]) + 1
+        position += len(block)
+    return end
+
+
+def _find_last_line_end(f, start: int, end: int, block_bytes: int) -> int:
+    """Returns the offset behind the last line break before end, at least start.
+    """
+    position = end
+    while position > start:
+        block_start = max(position - block_bytes, start)
+        f.seek(block_start)
+        breaks = np.flatnonzero(np.frombuffer(f.read(position - block_start), dtype=np.uint8) == ord("\n"))
+        if len(breaks) > 0:
+            return block_start + int(breaks[-1]) + 1
+        position = block_start
+    return start
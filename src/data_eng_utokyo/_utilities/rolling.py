@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""Rolling statistics which are updated row by row.
+
+A RollingAggregate keeps the values of the current window together with the running count, sum and sum of squares of
+the window, and two monotonic deques for the minimum and the maximum. Adding a row and evicting the rows which left the
+window costs O(1) amortized, such that the statistics of n new rows cost O(n), independent of the length of the table.
+The window is either a number of rows or a duration, like in pd.DataFrame.rolling(). Missing values are part of the
+window but do not contribute to the statistics.
+"""
+
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from .column_store import ColumnStore
+
+
+class RollingAggregate(object):
+    """Rolling statistics of one column.
+
+    Args:
+        column (str): Name of the column.
+        window: Number of rows (int) or duration (str or pd.Timedelta, e.g. "60s") of the window. A time window ending
+            at a row contains the rows within the duration before it, the row itself included.
+        stats (list): Statistics, any of count, sum, sumsq, mean, std, var, min and max.
+
+    Attributes:
+        column (str): Name of the column.
+        window: Number of rows or duration of the window.
+        stats (list): Statistics which are calculated.
+    """
+
+    available_stats = ("count", "sum", "sumsq", "mean", "std", "var", "min", "max")
+
+    def __init__(self, column: str, window, stats: list=("mean", "std")):
+        unknown_stats = [stat for stat in stats if stat not in self.available_stats]
+        if unknown_stats:
+            raise ValueError(f"Unknown stats {unknown_stats}, choose from {self.available_stats}.")
+        self.column = column
+        self.window = window
+        self.stats = list(stats)
+        self._window_ns = None if isinstance(window, (int, np.integer)) else pd.Timedelta(window).value
+        self._results = ColumnStore()
+        self.reset()
+
+    def reset(self):
+        """Forgets all rows.
+        """
+        self._results = ColumnStore()
+        self._rows = deque()          # (seq, timestamp, value) of the rows in the window
+        self._min_deque = deque()     # (seq, value) with increasing values
+        self._max_deque = deque()     # (seq, value) with decreasing values
+        self._seq = 0                 # Number of rows added so far
+        self._count = 0
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._shift = None            # Subtracted from the values before summing, against cancellation
+        self.last_timestamp = None
+
+    def add(self, timestamps: np.ndarray, values: np.ndarray):
+        """Adds rows in the order of their timestamps and stores their statistics.
+
+        Args:
+            timestamps (np.ndarray): Timestamps in ns.
+            values (np.ndarray): Values of the column, NaN for missing values.
+        """
+        if len(timestamps) == 0:
+            return
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        results = {stat: np.empty(len(values)) for stat in self._get_running_stats()}
+        for i, (timestamp, value) in enumerate(zip(timestamps.tolist(), values.tolist())):
+            self._push(timestamp, value)
+            self._evict(timestamp)
+            results["count"][i] = self._count
+            results["sum"][i] = self._sum
+            results["sumsq"][i] = self._sumsq
+            if "min" in results:
+                results["min"][i] = self._min_deque[0][1] if self._min_deque else np.nan
+            if "max" in results:
+                results["max"][i] = self._max_deque[0][1] if self._max_deque else np.nan
+        self._results.append(self._to_frame(timestamps, results))
+        self.last_timestamp = int(timestamps[-1])
+
+    def drop_head(self, n: int):
+        """Drops the statistics of the n oldest rows, e.g. when the recorder evicts them.
+        """
+        self._results.drop_head(n)
+
+    def get_frame(self) -> pd.DataFrame:
+        """Returns the statistics of the window ending at each row.
+
+        Returns:
+            Pandas dataframe with the column timestamp and one column <column>_<stat> per statistic.
+        """
+        return self._results.to_frame()
+
+    def _get_running_stats(self) -> list:
+        stats = ["count", "sum", "sumsq"]
+        return stats + [stat for stat in ("min", "max") if stat in self.stats]
+
+    def _push(self, timestamp: int, value: float):
+        self._rows.append((self._seq, timestamp, value))
+        if value == value:   # Not NaN
+            if self._shift is None:
+                self._shift = value
+            self._count += 1
+            self._sum += value - self._shift
+            self._sumsq += (value - self._shift) ** 2
+            while self._min_deque and self._min_deque[-1][1] >= value:
+                self._min_deque.pop()
+            self._min_deque.append((self._seq, value))
+            while self._max_deque and self._max_deque[-1][1] <= value:
+                self._max_deque.pop()
+            self._max_deque.append((self._seq, value))
+        self._seq += 1
+
+    def _evict(self, timestamp: int):
+        """Removes the rows which are not part of the window ending at timestamp anymore.
+        """
+        while self._rows and self._is_outside(self._rows[0], timestamp):
+            seq, _, value = self._rows.popleft()
+            if value == value:
+                self._count -= 1
+                self._sum -= value - self._shift
+                self._sumsq -= (value - self._shift) ** 2
+            if self._min_deque and self._min_deque[0][0] == seq:
+                self._min_deque.popleft()
+            if self._max_deque and self._max_deque[0][0] == seq:
+                self._max_deque.popleft()
+        if self._count == 0:
+            # Reset the sums, such that rounding errors do not accumulate
+            self._sum = self._sumsq = 0.0
+
+    def _is_outside(self, row: tuple, timestamp: int) -> bool:
+        if self._window_ns is None:
+            return row[0] <= self._seq - 1 - self.window
+        return row[1] <= timestamp - self._window_ns
+
+    def _to_frame(self, timestamps: np.ndarray, results: dict) -> pd.DataFrame:
+        count, shifted_sum, shifted_sumsq = results["count"], results["sum"], results["sumsq"]
+        shift = 0.0 if self._shift is None else self._shift
+        with np.errstate(invalid="ignore", divide="ignore"):
+            shifted_mean = shifted_sum / count
+            var = np.maximum(shifted_sumsq - count * shifted_mean ** 2, 0) / (count - 1)
+        var[count < 2] = np.nan
+        columns = {
+            "count": count.astype(np.int64),
+            "sum": shifted_sum + count * shift,
+            "sumsq": shifted_sumsq + 2 * shift * shifted_sum + count * shift ** 2,
+            "mean": shifted_mean + shift,
+            "std": np.sqrt(var),
+            "var": var,
+            "min": results.get("min"),
+            "max": results.get("max"),
+            }
+        data = {"timestamp": timestamps}
+        data.update({f"{self.column}_{stat}": columns[stat] for stat in self.stats})
+        return pd.DataFrame(data)
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""Aggregates time series in buckets of fixed duration.
+
+A rollup stores the count, sum, minimum and maximum of each numeric column per bucket, e.g. per 10 s. Rows are added
+as they arrive: Only the last bucket is open, all earlier buckets are final and stored in a ColumnStore. A pyramid
+keeps one rollup per resolution, such that a plot of several days reads a few thousand buckets instead of millions of
+rows. Missing values are ignored, the count is the number of values which are not missing.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .column_store import ColumnStore
+from .time_conversion import timestamps_to_datetimes
+
+
+class Rollup(object):
+    """Aggregates of the numeric columns in buckets of one resolution.
+
+    Args:
+        resolution_s (float): Duration of a bucket in seconds.
+        columns (list): Names of the numeric columns.
+
+    Attributes:
+        resolution_s (float): Duration of a bucket in seconds.
+        columns (list): Names of the numeric columns.
+    """
+
+    stats = ("count", "sum", "min", "max")
+
+    def __init__(self, resolution_s: float, columns: list):
+        self.resolution_s = resolution_s
+        self.columns = list(columns)
+        self._resolution_ns = int(resolution_s * 1e9)
+        self._closed = ColumnStore()
+        self._open_id = None       # Bucket number of the open bucket
+        self._open_stats = None    # Array with shape (4, nr_of_columns)
+        self._frame = None
+
+    def __len__(self) -> int:
+        return len(self._closed) + (self._open_id is not None)
+
+    def is_in_order(self, timestamps: np.ndarray) -> bool:
+        """Returns whether rows with these timestamps can be added, i.e. none of them belongs to a final bucket.
+        """
+        return self._open_id is None or len(timestamps) == 0 or timestamps.min() // self._resolution_ns >= self._open_id
+
+    def add(self, timestamps: np.ndarray, values: np.ndarray):
+        """Adds rows which are sorted by timestamp and not older than the open bucket.
+
+        Args:
+            timestamps (np.ndarray): Timestamps in ns, sorted.
+            values (np.ndarray): Values with shape (nr_of_rows, nr_of_columns).
+        """
+        if len(timestamps) == 0:
+            return
+        bucket_ids = timestamps // self._resolution_ns
+        starts = np.flatnonzero(np.concatenate([[True], bucket_ids[1:] != bucket_ids[:-1]]))
+        bucket_ids = bucket_ids[starts]
+        stats = self._aggregate(values, starts)
+
+        # Merge the first bucket with the open bucket
+        if self._open_id is not None and bucket_ids[0] == self._open_id:
+            stats[:, 0] = self._merge(self._open_stats, stats[:, 0])
+        elif self._open_id is not None:
+            bucket_ids = np.concatenate([[self._open_id], bucket_ids])
+            stats = np.concatenate([self._open_stats[:, None], stats], axis=1)
+
+        # All buckets but the last one are final
+        self._closed.append(self._to_frame(bucket_ids[:-1], stats[:, :-1]))
+        self._open_id = bucket_ids[-1]
+        self._open_stats = stats[:, -1]
+        self._frame = None
+
+    def get_frame(self) -> pd.DataFrame:
+        """Returns one row per bucket with the columns timestamp (start of the bucket), datetime and for each column
+        the min, max, mean and count.
+
+        Returns:
+            Pandas dataframe.
+        """
+        if self._frame is None:
+            closed_df = self._closed.to_frame()
+            if self._open_id is not None:
+                open_df = self._to_frame(np.array([self._open_id]), self._open_stats[:, None])
+                closed_df = open_df if len(closed_df.index) == 0 else pd.concat([closed_df, open_df], ignore_index=True)
+            self._frame = self._summarize(closed_df)
+        return self._frame
+
+    def _aggregate(self, values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+        """Returns the statistics of each bucket with shape (4, nr_of_buckets, nr_of_columns).
+        """
+        values = np.asarray(values, dtype=np.float64)
+        is_valid = ~np.isnan(values)
+        with np.errstate(invalid="ignore"):
+            return np.stack([
+                np.add.reduceat(is_valid.astype(np.float64), starts, axis=0),
+                np.add.reduceat(np.where(is_valid, values, 0), starts, axis=0),
+                np.fmin.reduceat(values, starts, axis=0),
+                np.fmax.reduceat(values, starts, axis=0),
+                ])
+
+    @staticmethod
+    def _merge(stats: np.ndarray, other_stats: np.ndarray) -> np.ndarray:
+        return np.stack([
+            stats[0] + other_stats[0],
+            stats[1] + other_stats[1],
+            np.fmin(stats[2], other_stats[2]),
+            np.fmax(stats[3], other_stats[3]),
+            ])
+
+    def _to_frame(self, bucket_ids: np.ndarray, stats: np.ndarray) -> pd.DataFrame:
+        data = {"timestamp": bucket_ids * self._resolution_ns}
+        for i, stat in enumerate(self.stats):
+            for j, column in enumerate(self.columns):
+                data[f"{column}_{stat}"] = stats[i, :, j]
+        return pd.DataFrame(data)
+
+    def _summarize(self, df: pd.DataFrame) -> pd.DataFrame:
+        timestamps = df["timestamp"].to_numpy()
+        data = {"timestamp": timestamps, "datetime": timestamps_to_datetimes(timestamps)}
+        for column in self.columns:
+            count = df[f"{column}_count"].to_numpy()
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean = df[f"{column}_sum"].to_numpy() / count
+            data[f"{column}_min"] = df[f"{column}_min"].to_numpy()
+            data[f"{column}_max"] = df[f"{column}_max"].to_numpy()
+            data[f"{column}_mean"] = mean
+            data[f"{column}_count"] = count.astype(np.int64)
+        return pd.DataFrame(data)
+
+
+class RollupPyramid(object):
+    """Rollups of the same columns at several resolutions.
+
+    Args:
+        resolutions_s (list): Durations of the buckets in seconds.
+        columns (list): Names of the numeric columns.
+
+    Example:
+        .. code:: python
+
+            pyramid = RollupPyramid([1, 10, 60, 600], columns=["MeasuredPercentage"])
+            pyramid.add(df)
+            minutes_df = pyramid.get_frame(60)
+    """
+
+    def __init__(self, resolutions_s: list, columns: list):
+        self.resolutions_s = list(resolutions_s)
+        self.columns = list(columns)
+        self._rollups = {resolution_s: Rollup(resolution_s, columns) for resolution_s in resolutions_s}
+
+    def is_in_order(self, df: pd.DataFrame) -> bool:
+        """Returns whether the rows of df can be added, i.e. whether they are not older than the open buckets.
+        """
+        timestamps = df["timestamp"].to_numpy()
+        return all(rollup.is_in_order(timestamps) for rollup in self._rollups.values())
+
+    def add(self, df: pd.DataFrame):
+        """Adds the rows of df to all rollups.
+
+        Args:
+            df (pd.DataFrame): Rows with a timestamp column and the numeric columns.
+        """
+        if len(df.index) == 0:
+            return
+        if not df["timestamp"].is_monotonic_increasing:
+            df = df.sort_values(by="timestamp", kind="stable")
+        timestamps = df["timestamp"].to_numpy()
+        values = np.empty((len(timestamps), len(self.columns)))
+        for j, column in enumerate(self.columns):
+            values[:, j] = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+        for rollup in self._rollups.values():
+            rollup.add(timestamps, values)
+
+    def get_frame(self, resolution_s: float) -> pd.DataFrame:
+        """Returns the buckets of one resolution, see Rollup.get_frame().
+
+        Args:
+            resolution_s (float): One of resolutions_s.
+
+        Returns:
+            Pandas dataframe.
+        """
+        if resolution_s not in self._rollups:
+            raise ValueError(f"No rollup with resolution {resolution_s} s, choose one of {self.resolutions_s}.")
+        return self._rollups[resolution_s].get_frame()
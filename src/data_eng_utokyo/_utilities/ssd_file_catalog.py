@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""Catalog of the SSD csv files in a folder, indexed by the time span which each file covers.
+
+The WE7000 writes the start and stop time of the measurement and the number of pulses (BlockSize) into the header of
+each csv file. The catalog reads only these header lines, never the data lines. With a catalog_path, it saves them
+together with the fingerprint of the file in a json file, such that after a restart only the headers of new or changed
+files are read again. Unlike the creation time of the file, the header times stay correct when the files are copied.
+
+Example:
+    .. code:: python
+
+        catalog = SSDFileCatalog("data/sample/")
+        catalog.update()
+        df = catalog.query(start=dt.datetime(2022, 3, 14, 11), end=dt.datetime(2022, 3, 14, 12))
+"""
+
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from .file_fingerprint import FileFingerprint
+from .path_helper import PathHelper
+from .time_conversion import parse_timestamp, to_timestamp
+
+_second_ns = 10**9
+
+
+class SSDFileCatalog(object):
+    """Start time, stop time and number of pulses of the SSD files in a folder.
+
+    Note:
+        The stop time has a resolution of one second, so a file is taken to cover the second after its stop time too.
+        Files whose header has no valid stop time yet, e.g. because the measurement is still running, cover all times
+        after their start.
+
+    Args:
+        folder (str): Folder in which the csv files are stored. Subfolders are searched too.
+        match (str): Regex which the full filepaths have to match.
+        catalog_path (str): Json file in which the catalog is saved, e.g. in a cache folder. The catalog is only kept
+            in memory if None. Keep it out of the folder, where its writes would wake up a FileWatcher of the folder.
+        time_format (str): Format of //StartDate //StartTime and //StopDate //StopTime.
+        max_header_lines (int): Maximal number of lines which are read per file. The header ends earlier at the first
+            data line.
+
+    Attributes:
+        folder (str): Folder in which the csv files are stored.
+        match (str): Regex which the full filepaths have to match.
+        catalog_path (str): Json file in which the catalog is saved, None if it is only kept in memory.
+        time_format (str): Format of the start and stop time.
+        max_header_lines (int): Maximal number of lines which are read per file.
+    """
+
+    columns = ["filepath", "start", "stop", "nr_of_rows"]
+
+    def __init__(self, folder: str, match: str=".*Slot.*.csv", catalog_path: str=None,
+                 time_format: str="%Y/%m/%d %H:%M:%S", max_header_lines: int=64):
+        self.folder = folder
+        self.match = match
+        self.catalog_path = catalog_path
+        self.time_format = time_format
+        self.max_header_lines = max_header_lines
+        self._entries = {}   # Path relative to the folder -> fingerprint, start_ns, stop_ns, nr_of_rows
+        self._load()
+
+    def update(self) -> int:
+        """Reads the headers of the files which are new or changed since the last update and forgets the removed files.
+
+        Returns:
+            Number of files whose header was read.
+        """
+        entries, nr_of_read_files = {}, 0
+        pattern = re.compile(self.match)
+        # Unlike PathHelper.get_filepaths(), the full filepath has to match, e.g. "x.csv.bak" is skipped
+        filepaths = [fp for fp in PathHelper.get_all_filepaths_in_folder(self.folder) if pattern.fullmatch(fp)]
+        for filepath in filepaths:
+            key = os.path.relpath(filepath, self.folder)
+            try:
+                fingerprint = list(FileFingerprint.of_file(filepath))
+            except OSError:
+                continue
+            entry = self._entries.get(key)
+            if entry is None or entry["fingerprint"] != fingerprint:
+                entry = dict(self._read_header(filepath), fingerprint=fingerprint)
+                nr_of_read_files += 1
+            entries[key] = entry
+        is_changed = nr_of_read_files > 0 or len(entries) != len(self._entries)
+        self._entries = entries
+        if is_changed:
+            self.save()
+        return nr_of_read_files
+
+    def query(self, start=None, end=None) -> pd.DataFrame:
+        """Returns the files whose time span overlaps with [start, end]. Call update() before to include new files.
+
+        Args:
+            start: Start of the interval. Accepts timestamps (int) and everything pd.Timestamp accepts.
+            end: End of the interval.
+
+        Returns:
+            Pandas dataframe with the columns filepath, start, stop (datetime64, NaT if unknown) and nr_of_rows (pulses
+            according to BlockSize, -1 if unknown), sorted by the start time.
+        """
+        df = self.get_table()
+        if len(df.index) == 0:
+            return df
+        starts = df["start"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        stops = df["stop"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        mask = starts != np.iinfo(np.int64).min   # Files without a valid start time are skipped
+        if end is not None:
+            mask &= starts <= to_timestamp(end)
+        if start is not None:
+            mask &= df["stop"].isna().to_numpy() | (stops + _second_ns > to_timestamp(start))
+        return df[mask].reset_index(drop=True)
+
+    def get_table(self) -> pd.DataFrame:
+        """Returns all files of the catalog, sorted by the start time, see query().
+        """
+        rows = [
+            [os.path.join(self.folder, key), entry["start_ns"], entry["stop_ns"], entry["nr_of_rows"]]
+            for key, entry in self._entries.items()
+            ]
+        df = pd.DataFrame(rows, columns=self.columns)
+        for column in ["start", "stop"]:
+            df[column] = pd.to_datetime(df[column].astype("Int64"), unit="ns")
+        df["nr_of_rows"] = df["nr_of_rows"].astype(np.int64)
+        return df.sort_values(["start", "filepath"], kind="stable").reset_index(drop=True)
+
+    def save(self):
+        """Writes the catalog to the json file. A catalog which cannot be written is skipped silently, the headers are
+        then read again on the next start.
+        """
+        if self.catalog_path is None:
+            return
+        state = {"settings": self._get_settings(), "entries": self._entries}
+        tmp_path = self.catalog_path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.catalog_path)
+        except OSError:
+            pass
+
+    def _load(self):
+        """Restores the catalog from the json file if it was created with the same settings.
+        """
+        if self.catalog_path is None or not os.path.exists(self.catalog_path):
+            return
+        try:
+            with open(self.catalog_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        if state.get("settings") == self._get_settings():
+            self._entries = state["entries"]
+
+    def _get_settings(self) -> dict:
+        return {"folder": os.path.abspath(self.folder), "match": self.match, "time_format": self.time_format,
+                "max_header_lines": self.max_header_lines}
+
+    def _read_header(self, filepath: str) -> dict:
+        """Parses the start time, stop time and block size from the header lines. Unknown values are None and -1.
+        """
+        header = {}
+        with open(filepath, "rb") as f:
+            for _ in range(self.max_header_lines):
+                line = f.readline()
+                if not line or line[:1].isdigit():
+                    break
+                key, _, value = line.decode("latin-1").partition(",")
+                header[key.strip().strip('"')] = value.strip().strip('"')
+        try:
+            nr_of_rows = int(header.get("BlockSize", ""))
+        except ValueError:
+            nr_of_rows = -1
+        return {
+            "start_ns": self._parse_time(header, "//StartDate", "//StartTime"),
+            "stop_ns": self._parse_time(header, "//StopDate", "//StopTime"),
+            "nr_of_rows": nr_of_rows,
+            }
+
+    def _parse_time(self, header: dict, date_key: str, time_key: str):
+        try:
+            return parse_timestamp(header[date_key] + " " + header[time_key], self.time_format)
+        except (KeyError, ValueError):
+            return None
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""Stores parsed tables on disk, such that they do not have to be parsed again after a restart.
+
+Each table is saved together with a small state dictionary (e.g. the read cursor of a recorder) in one npz file. Columns
+are stored as binary numpy arrays, categorical columns as codes and categories. Object columns of strings are stored
+like categorical columns, with separate codes for None and NaN, and their categories as fixed-width unicode array.
+Nothing is pickled, and the files are loaded with allow_pickle=False, such that a manipulated cache file cannot execute
+code. Tables with other objects are not cached. Files are written to a temporary file first and then renamed, such that
+a crash during saving never leaves a broken cache behind.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .column_store import ColumnStore
+
+
+class TableCache(object):
+    """Saves and loads ColumnStores with a state dictionary in a folder.
+
+    Args:
+        cache_dir (str): Folder in which the cache files are stored. Created if it does not exist.
+
+    Attributes:
+        cache_dir (str): Folder in which the cache files are stored.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def get_filepath(self, key: str) -> str:
+        """Returns the path of the cache file for a key.
+
+        Args:
+            key (str): Identifies the table, e.g. the class of the recorder and the path of its csv file.
+
+        Returns:
+            Path to an npz file.
+        """
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        name = "".join(c if c.isalnum() else "_" for c in os.path.basename(key))[-40:]
+        return os.path.join(self.cache_dir, f"{name}_{digest}.npz")
+
+    def save(self, key: str, store: ColumnStore, state: dict) -> bool:
+        """Saves a table and its state.
+
+        Args:
+            key (str): Identifies the table.
+            store (ColumnStore): Table to save.
+            state (dict): JSON serializable state which belongs to the table.
+
+        Returns:
+            Whether the table was saved. Tables with objects other than strings, None and NaN are skipped.
+        """
+        arrays = {"index": store.index, "state": np.array(json.dumps(state))}
+        kinds = []
+        try:
+            for i, values in enumerate(store.arrays()):
+                if isinstance(values, pd.Categorical):
+                    arrays[f"categories_{i}"] = self._to_storable(values.categories.to_numpy())
+                    arrays[f"column_{i}"] = values.codes
+                    kinds.append("categorical")
+                elif values.dtype == object:
+                    arrays[f"column_{i}"], arrays[f"categories_{i}"] = self._encode_objects(values)
+                    kinds.append("object")
+                else:
+                    arrays[f"column_{i}"] = values
+                    kinds.append("values")
+        except TypeError:
+            return False
+        arrays["columns"] = np.array(json.dumps({"names": store.columns, "kinds": kinds}))
+
+        filepath = self.get_filepath(key)
+        tmp_filepath = filepath + ".tmp.npz"
+        np.savez(tmp_filepath, **arrays)
+        os.replace(tmp_filepath, filepath)
+        return True
+
+    def load(self, key: str):
+        """Loads a table and its state.
+
+        Args:
+            key (str): Identifies the table.
+
+        Returns:
+            Tuple (store, state) or None if there is no valid cache for the key.
+        """
+        filepath = self.get_filepath(key)
+        if not os.path.exists(filepath):
+            return None
+        try:
+            with np.load(filepath, allow_pickle=False) as npz:
+                columns = json.loads(str(npz["columns"]))
+                arrays = []
+                for i, kind in enumerate(columns["kinds"]):
+                    values = npz[f"column_{i}"]
+                    if kind == "categorical":
+                        categories = pd.Index(self._from_storable(npz[f"categories_{i}"]))
+                        values = pd.Categorical.from_codes(values, categories=categories)
+                    elif kind == "object":
+                        values = self._decode_objects(values, npz[f"categories_{i}"])
+                    arrays.append(values)
+                store = ColumnStore.from_arrays(columns["names"], arrays, npz["index"])
+                state = json.loads(str(npz["state"]))
+        except (OSError, ValueError, KeyError, TypeError):
+            # Broken, outdated or pickled cache file
+            return None
+        return store, state
+
+    def delete(self, key: str):
+        """Removes the cache file of a key if it exists.
+
+        Args:
+            key (str): Identifies the table.
+        """
+        filepath = self.get_filepath(key)
+        if os.path.exists(filepath):
+            os.remove(filepath)
+
+    @staticmethod
+    def _to_storable(values: np.ndarray) -> np.ndarray:
+        """Converts an object array of strings to a unicode array. Raises a TypeError for other objects.
+        """
+        if values.dtype != object:
+            return values
+        if not all(type(v) is str for v in values):
+            raise TypeError("Only strings can be stored without pickle.")
+        return values.astype(str)
+
+    @staticmethod
+    def _from_storable(values: np.ndarray) -> np.ndarray:
+        if values.dtype.kind == "U":
+            return values.astype(object)
+        return values
+
+    @classmethod
+    def _encode_objects(cls, values: np.ndarray) -> tuple:
+        """Encodes an object column as int32 codes and unicode categories. None has the code -2 and NaN -1.
+        """
+        is_none = np.fromiter((v is None for v in values), dtype=bool, count=len(values))
+        is_nan = pd.isna(values) & ~is_none
+        is_valid = ~(is_none | is_nan)
+        valid_codes, categories = pd.factorize(values[is_valid])
+        codes = np.full(len(values), -1, dtype=np.int32)
+        codes[is_none] = -2
+        codes[is_valid] = valid_codes
+        return codes, cls._to_storable(np.asarray(categories, dtype=object))
+
+    @staticmethod
+    def _decode_objects(codes: np.ndarray, categories: np.ndarray) -> np.ndarray:
+        values = np.empty(len(codes), dtype=object)
+        is_valid = codes >= 0
+        values[is_valid] = categories.astype(object)[codes[is_valid]]
+        values[codes == -1] = np.nan
+        values[codes == -2] = None
+        return values
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""Reads the lines which were appended to a file since the last read.
+
+The reader remembers the byte offset right after the last complete line. Each read only touches the bytes which were
+appended since then, such that following a growing csv file costs O(new data) per refresh instead of O(file size).
+"""
+
+import numpy as np
+
+
+class TailReader(object):
+    """Follows a growing text file by byte offset.
+
+    Note:
+        A trailing line without line break is usually still being written. By default it is held back and returned
+        by a later read, as soon as the writer has finished it. read_partial_line() returns it without consuming it.
+
+        Each read opens the file again, unless the reader was opened with open() or as context manager. It then keeps
+        one file handle until close(), which saves the open call per read when a large file is read in many chunks.
+
+    Args:
+        filepath (str): Path to the file.
+        hold_partial_line (bool): Whether a trailing line without line break should be held back.
+        block_size (int): Number of bytes read at once when only a limited number of lines is requested.
+
+    Attributes:
+        filepath (str): Path to the file.
+        hold_partial_line (bool): Whether a trailing line without line break should be held back.
+        block_size (int): Number of bytes read at once when only a limited number of lines is requested.
+        offset (int): Byte offset right after the data which was read so far.
+        lines (int): Number of line breaks which were read so far.
+        stop_offset (int): Reads do not go beyond this byte offset. Unlimited if None.
+        last_read (bytes): The data which was returned by the last read.
+    """
+
+    def __init__(self, filepath: str, hold_partial_line: bool=True, block_size: int=1 << 20):
+        self.filepath = filepath
+        self.hold_partial_line = hold_partial_line
+        self.block_size = block_size
+        self.offset = 0
+        self.lines = 0
+        self.stop_offset = None
+        self._last_read = b""
+        self._file = None
+        self._keep_open = False
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def open(self):
+        """Keeps the file open between reads until close() is called.
+        """
+        self._keep_open = True
+
+    def close(self):
+        """Closes the file handle which was kept open.
+        """
+        self._keep_open = False
+        self._close_file()
+
+    def read(self, max_lines: int=None) -> bytes:
+        """Returns the complete lines which were appended since the last read and moves the offset behind them.
+
+        Args:
+            max_lines (int): Maximal number of lines to return. All available lines are returned if None.
+
+        Returns:
+            The raw bytes of the new lines, including their line breaks.
+        """
+        f = self._get_file()
+        try:
+            f.seek(self.offset)
+            limit = -1 if self.stop_offset is None else max(self.stop_offset - self.offset, 0)
+            data = f.read(limit) if max_lines is None else self._read_blocks(f, int(max_lines))
+            if limit >= 0:
+                data = data[:limit]
+        finally:
+            if not self._keep_open:
+                self._close_file()
+
+        # Cut after the last complete line (or after max_lines lines)
+        breaks = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == ord("\n"))
+        if max_lines is not None and len(breaks) >= max_lines:
+            breaks = breaks[:int(max_lines)]
+            data = data[:breaks[-1] + 1] if len(breaks) > 0 else b""
+        elif self.hold_partial_line:
+            data = data[:breaks[-1] + 1] if len(breaks) > 0 else b""
+
+        self.offset += len(data)
+        self.lines += len(breaks)
+        self._last_read = data
+        return data
+
+    @property
+    def last_read(self) -> bytes:
+        return self._last_read
+
+    def read_partial_line(self) -> bytes:
+        """Returns the line behind the offset if it has no line break yet, without moving the offset.
+
+        Returns:
+            The raw bytes of the unfinished line, cut at stop_offset. Empty if there is none, if complete lines
+            follow the offset or if the line is longer than block_size.
+        """
+        f = self._get_file()
+        try:
+            f.seek(self.offset)
+            data = f.read(self.block_size)
+        finally:
+            if not self._keep_open:
+                self._close_file()
+        if self.stop_offset is not None:
+            data = data[:max(self.stop_offset - self.offset, 0)]
+        if b"\n" in data or len(data) >= self.block_size:
+            return b""
+        return data
+
+    def unread_lines(self, n: int):
+        """Moves the offset back by the last n lines of the previous read, such that the next read returns them again.
+
+        Args:
+            n (int): Number of complete lines to give back.
+        """
+        if n <= 0:
+            return
+        breaks = np.flatnonzero(np.frombuffer(self._last_read, dtype=np.uint8) == ord("\n"))
+        assert n <= len(breaks), f"Cannot give back {n} lines, the last read only contained {len(breaks)}."
+        keep = breaks[-n - 1] + 1 if n < len(breaks) else 0
+        self.offset -= len(self._last_read) - keep
+        self.lines -= n
+        self._last_read = self._last_read[:keep]
+
+    def seek_line(self, n: int):
+        """Moves the offset to the beginning of line n (counted from zero).
+
+        Note:
+            This scans the file from the beginning. It is only meant for rare events like a reset of the counters.
+
+        Args:
+            n (int): Index of the line at which the next read should start.
+        """
+        self.reset()
+        if n <= 0:
+            return
+        with open(self.filepath, "rb") as f:
+            while self.lines < n:
+                block = f.read(self.block_size)
+                if not block:
+                    break
+                breaks = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == ord("\n"))
+                if self.lines + len(breaks) >= n:
+                    self.offset += int(breaks[n - self.lines - 1]) + 1
+                    self.lines = n
+                    return
+                self.offset += len(block)
+                self.lines += len(breaks)
+
+    def reset(self):
+        """Starts reading from the beginning of the file again.
+        """
+        self.offset = 0
+        self.lines = 0
+        self._last_read = b""
+        # The file may have been replaced, the handle is opened again on the next read
+        self._close_file()
+
+    def _get_file(self):
+        if self._file is None:
+            self._file = open(self.filepath, "rb")
+        return self._file
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _read_blocks(self, f, max_lines: int) -> bytes:
+        """Reads blocks from the current position of f until max_lines line breaks or the end of the file are reached.
+        """
+        blocks = []
+        nr_breaks = 0
+        while nr_breaks < max_lines:
+            block = f.read(self.block_size)
+            if not block:
+                break
+            blocks.append(block)
+            nr_breaks += block.count(b"\n")
+        return b"".join(blocks)
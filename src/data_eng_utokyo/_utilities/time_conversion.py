@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""Converts the time formats of the different data sources to one standard format.
+
+Every recorder provides two time columns:
+
+- timestamp: Nanoseconds since the epoch as int64.
+- datetime: The same point in time as numpy datetime64[ns].
+
+Both are calculated vectorized from the time columns of the csv files. Each recorder declares the format of its time
+column explicitly in the attribute time_format, such that pandas does not have to infer it. Timestamps are wall-clock
+times of the laboratory, without timezone.
+"""
+
+from fractions import Fraction
+
+import numpy as np
+import pandas as pd
+from dateutil import tz
+
+_nat_timestamp = np.iinfo(np.int64).min   # NaT as int64
+
+
+def parse_datetimes(values, time_format: str=None) -> np.ndarray:
+    """Parses strings to datetimes.
+
+    Args:
+        values (pd.Series or list): Strings representing points in time.
+        time_format (str): Format of the strings as used by strptime. Inferred by pandas if None.
+
+    Returns:
+        Numpy array with dtype datetime64[ns].
+    """
+    datetimes = pd.to_datetime(pd.Series(values), format=time_format)
+    return datetimes.to_numpy(dtype="datetime64[ns]")
+
+
+def parse_timestamps(values, time_format: str=None) -> np.ndarray:
+    """Parses strings to timestamps.
+
+    Args:
+        values (pd.Series or list): Strings representing points in time.
+        time_format (str): Format of the strings as used by strptime. Inferred by pandas if None.
+
+    Returns:
+        Numpy array of nanoseconds since the epoch with dtype int64.
+    """
+    return datetimes_to_timestamps(parse_datetimes(values, time_format=time_format))
+
+
+def parse_timestamp(value: str, time_format: str=None) -> int:
+    """Parses a single string to a timestamp.
+
+    Args:
+        value (str): String representing a point in time.
+        time_format (str): Format of the string as used by strptime. Inferred by pandas if None.
+
+    Returns:
+        Nanoseconds since the epoch as int.
+
+    Raises:
+        ValueError: If the string does not represent a point in time, e.g. if it is empty.
+    """
+    timestamp = int(parse_timestamps([value], time_format=time_format)[0])
+    if timestamp == _nat_timestamp:
+        raise ValueError(f"Cannot parse {value!r} as a point in time.")
+    return timestamp
+
+
+def to_timestamp(value) -> int:
+    """Converts a single point in time of any common type to a timestamp.
+
+    Args:
+        value: Nanoseconds since the epoch (int), datetime, pd.Timestamp, np.datetime64 or string. Timezone aware
+            values are converted to the local wall-clock time.
+
+    Returns:
+        Nanoseconds since the epoch as int.
+    """
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert(tz.tzlocal()).tz_localize(None)
+    # Timestamp.value is in nanoseconds for every resolution of the timestamp
+    return int(timestamp.value)
+
+
+def datetimes_to_timestamps(datetimes) -> np.ndarray:
+    """Converts datetimes to int64 nanoseconds since the epoch without loss of precision.
+
+    Args:
+        datetimes (np.ndarray or pd.Series): Datetimes of any resolution.
+
+    Returns:
+        Numpy array with dtype int64.
+    """
+    return np.asarray(datetimes, dtype="datetime64[ns]").view(np.int64)
+
+
+def timestamps_to_datetimes(timestamps) -> np.ndarray:
+    """Converts int64 nanoseconds since the epoch to datetimes.
+
+    Args:
+        timestamps (np.ndarray or pd.Series): Nanoseconds since the epoch.
+
+    Returns:
+        Numpy array with dtype datetime64[ns].
+    """
+    return np.asarray(timestamps, dtype=np.int64).view("datetime64[ns]")
+
+
+def epoch_seconds_to_timestamps(seconds) -> np.ndarray:
+    """Converts seconds since the epoch, like file creation times, to local wall-clock timestamps.
+
+    Args:
+        seconds (np.ndarray or pd.Series): Seconds since the epoch as float.
+
+    Returns:
+        Numpy array with dtype int64.
+    """
+    utc = pd.to_datetime(pd.Series(seconds, dtype=np.float64), unit="s", utc=True)
+    local = utc.dt.tz_convert(tz.tzlocal()).dt.tz_localize(None)
+    return datetimes_to_timestamps(local)
+
+
+def parse_seconds_to_ns(value: str) -> Fraction:
+    """Parses a duration in seconds, e.g. a time resolution like "1.000000e-006", to nanoseconds without rounding.
+
+    Args:
+        value (str): Decimal number of seconds, also in scientific notation.
+
+    Returns:
+        Exact number of nanoseconds as Fraction.
+    """
+    return Fraction(str(value).strip()) * 10**9
+
+
+def ticks_to_ns(ticks, ns_per_tick: Fraction) -> np.ndarray:
+    """Converts integer clock ticks, e.g. the relative times of a DAQ, to nanoseconds with int64 arithmetic only.
+
+    Note:
+        float64 only resolves about 256 ns around 1.6e18 ns. The ticks are therefore split into a multiple of the
+        denominator and a remainder, such that the result is exact up to the rounding to the nearest nanosecond.
+
+    Args:
+        ticks (np.ndarray or pd.Series): Integer ticks.
+        ns_per_tick (Fraction): Duration of one tick in nanoseconds, see parse_seconds_to_ns().
+
+    Returns:
+        Numpy array of nanoseconds with dtype int64.
+    """
+    ticks = np.asarray(ticks, dtype=np.int64)
+    numerator, denominator = ns_per_tick.numerator, ns_per_tick.denominator
+    if denominator == 1:
+        return ticks * numerator
+    quotients, remainders = np.divmod(ticks, denominator)
+    return quotients * numerator + (2 * remainders * numerator + denominator) // (2 * denominator)
+
+
+def add_time_columns(df: pd.DataFrame, timestamps):
+    """Adds the standard time columns timestamp and datetime to a dataframe in place.
+
+    Args:
+        df (pd.DataFrame): Table to which the columns are added.
+        timestamps (np.ndarray or pd.Series): Nanoseconds since the epoch, one per row of df.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    df["timestamp"] = timestamps
+    df["datetime"] = timestamps_to_datetimes(timestamps)
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""Parses the list-mode data of the WE7000 DAQ straight into numpy arrays.
+
+In list mode, the DAQ writes one line TraceName,Time,PulseHeight of integers per pulse. The general csv parsers
+tokenize every line into fields and convert each column separately. Since all fields are integers, this parser instead
+replaces the line breaks by commas and converts the whole block with numpy in one call into a flat int64 array, whose
+rows are the pulses. The buffer can be bytes, a memoryview or an mmap of the whole file. Large buffers are parsed in
+blocks of complete lines into arrays which are allocated once. Lines which do not match the format are not guessed:
+The parser returns None and the caller falls back to pandas.
+
+Example:
+    .. code:: python
+
+        df = parse_list_mode_file("-20220314-100806-Slot1-In2.csv", header_lines=38)
+"""
+
+import mmap
+
+import numpy as np
+import pandas as pd
+
+columns = ("TraceName", "Time_x", "PulseHeight")
+dtypes = (np.int64, np.int64, np.int16)
+
+_newline = ord("\n")
+_newline_to_comma = bytes.maketrans(b"\n", b",")
+
+
+def parse_list_mode(buffer, header_lines: int=0, block_bytes: int=1 << 22) -> pd.DataFrame:
+    """Parses list-mode lines.
+
+    Args:
+        buffer: bytes, memoryview or mmap with the lines.
+        header_lines (int): Number of lines before the data, e.g. the 38 lines of the header block which
+            SSDRecorder._load_metadata() parses.
+        block_bytes (int): Approximate number of bytes which are parsed at once. Limits the memory of the temporary
+            arrays.
+
+    Returns:
+        Pandas dataframe with the columns TraceName, Time_x (int64) and PulseHeight (int16). None if the lines do
+        not match the format.
+    """
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    data = data[_skip_lines(data, header_lines):]
+
+    # Allocate the columns once and fill them block by block
+    nr_of_lines = _count_lines(data, block_bytes) + (len(data) > 0 and data[-1] != _newline)
+    arrays = [np.empty(nr_of_lines, dtype=dtype) for dtype in dtypes]
+    line, position = 0, 0
+    while position < len(data):
+        end = _get_block_end(data, position, block_bytes)
+        block = data[position:end]
+        if block[-1] != _newline:
+            # The last line is not terminated
+            block = np.append(block, np.uint8(_newline))
+        values = _parse_block(block)
+        if values is None or not _fits(values[2], dtypes[2]):
+            return None
+        for array, column_values in zip(arrays, values):
+            array[line:line + len(column_values)] = column_values
+        line += len(values[0])
+        position = end
+    return pd.DataFrame(dict(zip(columns, arrays)), copy=False)
+
+
+def parse_list_mode_file(filepath: str, header_lines: int=0) -> pd.DataFrame:
+    """Parses a list-mode file through an mmap, such that the file is not copied into memory first.
+
+    Args:
+        filepath (str): Path to the csv file.
+        header_lines (int): Number of lines before the data.
+
+    Returns:
+        Pandas dataframe as returned by parse_list_mode(), None if the lines do not match the format.
+    """
+    with open(filepath, "rb") as f:
+        if f.seek(0, 2) == 0:
+            return parse_list_mode(b"", header_lines)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return parse_list_mode(mapped, header_lines)
+
+
+def _parse_block(data: np.ndarray) -> tuple:
+    """Parses complete lines into one int64 array per column, None if they do not match the format.
+    """
+    text = data.tobytes()
+    nr_of_lines = text.count(b"\n")
+    if text.count(b",") != 2 * nr_of_lines:
+        return None
+    try:
+        values = np.fromstring(text.translate(_newline_to_comma), dtype=np.int64, sep=",")
+    except ValueError:
+        return None
+    if len(values) != 3 * nr_of_lines:
+        return None
+    values = values.reshape(-1, 3)
+    return values[:, 0], values[:, 1], values[:, 2]
+
+
+def _fits(values: np.ndarray, dtype) -> bool:
+    return len(values) == 0 or (np.iinfo(dtype).min <= values.min() and values.max() <= np.iinfo(dtype).max)
+
+
+def _count_lines(data: np.ndarray, block_bytes: int) -> int:
+    return sum(int(np.count_nonzero(data[i:i + block_bytes] == _newline)) for i in range(0, len(data), block_bytes))
+
+
+def _get_block_end(data: np.ndarray, position: int, block_bytes: int, window_bytes: int=1 << 16) -> int:
+    """Returns the position after the last line break of the block starting at position. Only the end of the block
+    is searched.
+    """
+    end = position + block_bytes
+    while end < len(data):
+        breaks = np.flatnonzero(data[max(end - window_bytes, position):end] == _newline)
+        if len(breaks) > 0:
+            return max(end - window_bytes, position) + int(breaks[-1]) + 1
+        end += window_bytes
+    return len(data)
+
+
+def _skip_lines(data: np.ndarray, n: int, block_bytes: int=1 << 16) -> int:
+    """Returns the position after the n-th line break, or the length of data if it has fewer lines.
+    """
+    position = 0
+    while n > 0 and position < len(data):
+        breaks = np.flatnonzero(data[position:position + block_bytes] == _newline)
+        if len(breaks) >= n:
+            return position + int(breaks[n - 1]) + 1
+        n -= len(breaks)
+        position += block_bytes
+    return position if n == 0 else len(data)
@@ -1,3 +1,4 @@
 from ._algorithms.fit_mot_number import MOTMLE
 from ._algorithms.peak import Peak
 from ._algorithms.peak_finder import PeakFinder
+from ._algorithms.coil_state_index import CoilStateIndex
@@ -1,4 +1,5 @@
 from ._recorders.recorder import Recorder
+from ._recorders.recorder_group import RecorderGroup
 from ._recorders.ssd_recorder import SSDRecorder, SSDParser
 from ._recorders.pmt_recorder import PMTRecorder
 from ._recorders.file_recorder import FileRecorder, FileParser
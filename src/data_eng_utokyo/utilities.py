@@ -1,2 +1,4 @@
 from ._analyses.runner import Runner
 from ._analyses.mkdir import create_folders, mkdir_if_not_exist
+from ._utilities.file_watcher import FileWatcher, InotifyWatcher, PollingWatcher, create_file_watcher
+from ._utilities.ssd_file_catalog import SSDFileCatalog
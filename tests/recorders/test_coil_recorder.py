@@ -0,0 +1,26 @@
+from src.data_eng_utokyo.recorders import CoilRecorder
+
+
+def test_coil_recorder_reads_the_unfinished_last_entry(tmp_path):
+    filepath = tmp_path / "coil.txt"
+    # The relay log writes the line break before each entry
+    filepath.write_bytes(b"Time\tCoilOperation\n2022/03/14 12:09:23\tON\n2022/03/14 12:09:31\tOFF")
+    recorder = CoilRecorder(filepath=str(filepath))
+    assert recorder.get_table()["CoilOperation"].tolist() == ["ON", "OFF"]
+    assert recorder.read_data_lines == 1
+
+    with open(filepath, "ab") as f:
+        f.write(b"\n2022/03/14 12:10:53\tON")
+    assert recorder.get_table()["CoilOperation"].tolist() == ["ON", "OFF", "ON"]
+
+    # Half-written entries are skipped until they name a full state
+    for part in [b"\n2022/03/1", b"4 12:12:57", b"\tO", b"F"]:
+        with open(filepath, "ab") as f:
+            f.write(part)
+        assert recorder.get_table()["CoilOperation"].tolist() == ["ON", "OFF", "ON"]
+    with open(filepath, "ab") as f:
+        f.write(b"F\n")
+    df = recorder.get_table()
+    assert df["CoilOperation"].tolist() == ["ON", "OFF", "ON", "OFF"]
+    assert df["timestamp"].is_monotonic_increasing
+    assert recorder.read_data_lines == 4
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_eng_utokyo.recorders import CycleRecorder, SSDResultsRecorder
+
+
+def write_rows(filepath, timestamps, values, header=False):
+    df = pd.DataFrame({"timestamp_ns": timestamps, "value": values})
+    df.to_csv(filepath, mode="w" if header else "a", header=header, index=False)
+
+
+def expected_join(left_df, right_df, name, direction, tolerance_s):
+    right_df = right_df.add_prefix(f"{name}_")
+    return pd.merge_asof(
+        left_df.reset_index(drop=True), right_df.reset_index(drop=True),
+        left_on="timestamp", right_on=f"{name}_timestamp",
+        direction=direction, tolerance=None if tolerance_s is None else int(tolerance_s * 1e9)
+        )
+
+
+@pytest.mark.parametrize("direction, tolerance_s", [("backward", None), ("forward", 2), ("nearest", 1.5)])
+def test_cycle_recorder_streaming_join_equals_full_join(tmp_path, direction, tolerance_s):
+    rng = np.random.default_rng(0)
+    left_path, right_path = tmp_path / "cycles.csv", tmp_path / "results.csv"
+    left_ts = np.cumsum(rng.integers(1, 4, size=60)) * 10**9
+    right_ts = np.sort(rng.integers(0, left_ts[-1] + 3 * 10**9, size=80))
+    write_rows(left_path, left_ts[:1], [0], header=True)
+    write_rows(right_path, right_ts[:1], [0.0], header=True)
+
+    left = SSDResultsRecorder(str(left_path))
+    right = SSDResultsRecorder(str(right_path))
+    cycle_recorder = CycleRecorder(left, {"ssd": right}, tolerance_s=tolerance_s, direction=direction)
+    nr_left, nr_right = 1, 1
+    while nr_left < len(left_ts) or nr_right < len(right_ts):
+        cycle_recorder.get_table()
+        new_left, new_right = nr_left + int(rng.integers(0, 6)), nr_right + int(rng.integers(0, 8))
+        write_rows(left_path, left_ts[nr_left:new_left], np.arange(nr_left, min(new_left, len(left_ts))))
+        write_rows(right_path, right_ts[nr_right:new_right], np.arange(nr_right, min(new_right, len(right_ts))) / 2)
+        nr_left, nr_right = min(new_left, len(left_ts)), min(new_right, len(right_ts))
+
+        df = cycle_recorder.get_table()
+        expected_df = expected_join(left.get_table(), right.get_table(), "ssd", direction, tolerance_s)
+        pd.testing.assert_frame_equal(df.astype(object), expected_df.astype(object), check_index_type=False)
+    assert len(cycle_recorder._final_store) > len(left_ts) // 2
+
+
+def test_cycle_recorder_time_range_and_direction(tmp_path):
+    left_path, right_path = tmp_path / "cycles.csv", tmp_path / "results.csv"
+    write_rows(left_path, [10, 20, 30], [1, 2, 3], header=True)
+    write_rows(right_path, [5, 25], [0.5, 2.5], header=True)
+    cycle_recorder = CycleRecorder(SSDResultsRecorder(str(left_path)), {"ssd": SSDResultsRecorder(str(right_path))})
+    assert cycle_recorder.get_table()["ssd_value"].tolist() == [0.5, 0.5, 2.5]
+    assert cycle_recorder.get_table(start=15, end=25)["value"].tolist() == [2]
+    with pytest.raises(ValueError):
+        CycleRecorder(None, {}, direction="sideways")
+
+
+@pytest.mark.parametrize("right_timestamps", [[], [5]])
+def test_cycle_recorder_finalizes_cycles_of_empty_or_stalled_recorders(tmp_path, right_timestamps):
+    left_path, right_path = tmp_path / "cycles.csv", tmp_path / "results.csv"
+    write_rows(left_path, np.arange(1, 6) * 10**9, np.arange(1, 6), header=True)
+    write_rows(right_path, right_timestamps, [0.5] * len(right_timestamps), header=True)
+    left, right = SSDResultsRecorder(str(left_path)), SSDResultsRecorder(str(right_path))
+    cycle_recorder = CycleRecorder(left, {"ssd": right}, max_delay_s=2)
+    assert len(cycle_recorder.get_table().index) == 5
+    assert len(cycle_recorder._final_store) == 3
+
+    # Late rows of the right recorder only change the cycles which are not final
+    write_rows(right_path, [1 * 10**9 + 1, 4 * 10**9 + 1], [1.5, 4.5])
+    df = cycle_recorder.get_table()
+    expected_ssd_value = [np.nan if not right_timestamps else 0.5] * 3 + [1.5, 4.5]
+    assert df["ssd_value"].tolist() == pytest.approx(expected_ssd_value, nan_ok=True)
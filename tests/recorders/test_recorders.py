@@ -1,8 +1,12 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
 import os
+import tempfile
+import threading
 
 import unittest
+import numpy as np
 import pandas as pd
 from shutil import copy
 
@@ -15,6 +19,8 @@ from src.data_eng_utokyo.recorders import (
     LaserRecorder,
     IonRecorder,
     HeaterRecorder,
+    FileRecorder,
+    RecorderGroup,
 )
 
 
@@ -60,6 +66,22 @@ names = [
     "heater"
     ][n:m]
 
+# The tests of the incremental loading run for all recorders, independent of 
+# the slice above. Those which need a long file skip the recorders without one.
+all_recorders = [
+    (SSDRecorder, unittest_short_loc.ssd, unittest_long_loc.ssd),
+    (PMTRecorder, unittest_short_loc.pmt, unittest_long_loc.pmt),
+    (CoilRecorder, unittest_short_loc.coil, unittest_long_loc.coil),
+    (GaugeRecorder, unittest_short_loc.gauge, unittest_long_loc.gauge),
+    (LaserRecorder, unittest_short_loc.laser, unittest_long_loc.laser),
+    (IonRecorder, unittest_short_loc.ion, unittest_long_loc.ion),
+    (HeaterRecorder, unittest_short_loc.heater, unittest_long_loc.heater),
+    ]
+recorders_with_long_file = [
+    (SpecialRecorder, short_fp, long_fp) for SpecialRecorder, short_fp, long_fp in all_recorders 
+    if os.path.exists(long_fp)
+    ]
+
 
 class Helper(): 
     
@@ -160,6 +182,50 @@ class TestRecorders(unittest.TestCase):
             n = Helper.get_nr_of_rows(df)
             assert n in [0,1], "test_get_metadata_nr() failed with n={n}."
             
+    def test_metadata_is_cached(self):
+        """ Test that the header is only parsed again when the file was 
+            truncated or replaced, not when rows were appended. 
+        """
+        
+        for SpecialRecorder, short_fp, long_fp in recorders_with_long_file:
+            with self.subTest(recorder=SpecialRecorder.__name__): 
+                copy_filepath = Helper.generate_a_filepath_for_copy(short_fp)
+                copy(short_fp, copy_filepath)
+                recorder = SpecialRecorder(filepath=copy_filepath)
+                if not recorder.has_metadata: 
+                    os.remove(copy_filepath)
+                    continue
+                metadata_df = recorder.get_metadata()
+                copy(long_fp, copy_filepath)
+                assert recorder.get_metadata() is metadata_df, \
+                    f"test_metadata_is_cached() with {SpecialRecorder} failed."
+                copy(short_fp, copy_filepath)
+                assert recorder.get_metadata() is not metadata_df, \
+                    f"test_metadata_is_cached() with {SpecialRecorder} failed."
+                os.remove(copy_filepath)
+            
+    def test_metadata_without_broadcast(self):
+        """ Test that the metadata can be stored once instead of in every
+            row and joined to the rows later. 
+        """
+        
+        for SpecialRecorder, filepath, _ in all_recorders:
+            with self.subTest(recorder=SpecialRecorder.__name__): 
+                if not SpecialRecorder(filepath=filepath).has_metadata: 
+                    continue
+                broadcast_df = SpecialRecorder(filepath=filepath).get_table()
+                recorder = SpecialRecorder(filepath=filepath, broadcast_metadata=False)
+                df = recorder.get_table()
+                metadata_columns = list(recorder.get_metadata().columns)
+                assert not set(metadata_columns) & set(df.columns), \
+                    f"test_metadata_without_broadcast() with {SpecialRecorder} failed."
+                pd.testing.assert_series_equal(df["timestamp"], broadcast_df["timestamp"])
+                joined_df = recorder.join_metadata(df)
+                pd.testing.assert_frame_equal(
+                    joined_df[metadata_columns].astype(object), 
+                    broadcast_df[metadata_columns].astype(object)
+                    )
+            
     def test_mock_refresh(self):
         """ Test the case when the csv is modified and we load the new data.
             In this version, we do not modify the csv file, but we just reset
@@ -199,6 +265,283 @@ class TestRecorders(unittest.TestCase):
              # Sanity check
              assert m > n, f"test_refresh() with {SpecialRecorder} failed: n={n}, m={m}."
              
+    def test_incremental_table_equals_full_table(self):
+         """ Test that appending the new rows to the table gives the same
+             table as loading the full csv file at once. 
+         """
+         
+         for SpecialRecorder, short_fp, long_fp in recorders_with_long_file:
+             with self.subTest(recorder=SpecialRecorder.__name__): 
+                 # Setup copy and load incrementally
+                 copy_filepath = Helper.generate_a_filepath_for_copy(short_fp)
+                 copy(short_fp, copy_filepath)
+                 recorder = SpecialRecorder(filepath=copy_filepath, always_update=True) 
+                 recorder.get_table()
+                 copy(long_fp, copy_filepath)
+                 incremental_df = recorder.get_table()
+                 os.remove(copy_filepath)
+             
+                 # Load at once and compare
+                 full_df = SpecialRecorder(filepath=long_fp).get_table()
+                 pd.testing.assert_frame_equal(incremental_df, full_df)
+             
+    def test_truncated_file_is_reloaded(self):
+         """ Test that a csv file which is replaced by a shorter version is
+             read from the beginning again instead of being followed. 
+         """
+         
+         for SpecialRecorder, short_fp, long_fp in recorders_with_long_file:
+             with self.subTest(recorder=SpecialRecorder.__name__): 
+                 copy_filepath = Helper.generate_a_filepath_for_copy(short_fp)
+                 copy(long_fp, copy_filepath)
+                 recorder = SpecialRecorder(filepath=copy_filepath) 
+                 recorder.get_table()
+                 copy(short_fp, copy_filepath)
+                 truncated_df = recorder.get_table()
+                 os.remove(copy_filepath)
+             
+                 full_df = SpecialRecorder(filepath=short_fp).get_table()
+                 pd.testing.assert_frame_equal(truncated_df, full_df)
+             
+    def test_restart_from_cache(self):
+         """ Test that a restarted recorder restores the table from the cache
+             and just parses the rows which were appended since then. 
+         """
+         
+         for SpecialRecorder, short_fp, long_fp in recorders_with_long_file:
+             with self.subTest(recorder=SpecialRecorder.__name__): 
+                 with tempfile.TemporaryDirectory() as cache_dir: 
+                     # Record the short file with cache
+                     copy_filepath = Helper.generate_a_filepath_for_copy(short_fp)
+                     copy(short_fp, copy_filepath)
+                     recorder = SpecialRecorder(filepath=copy_filepath) 
+                     recorder.enable_cache(cache_dir)
+                     recorder.get_table()
+                     n = recorder.read_data_lines
+                 
+                     # Restart after rows were appended
+                     copy(long_fp, copy_filepath)
+                     recorder = SpecialRecorder(filepath=copy_filepath) 
+                     recorder.enable_cache(cache_dir)
+                     recorder._load_cache()
+                     assert recorder.read_data_lines == n, f"test_restart_from_cache() with {SpecialRecorder} failed."
+                     cached_df = recorder.get_table()
+                     os.remove(copy_filepath)
+             
+                 full_df = SpecialRecorder(filepath=long_fp).get_table()
+                 pd.testing.assert_frame_equal(cached_df, full_df)
+             
+    def test_get_table_time_range(self):
+         """ Test that the time range query returns the same rows as a
+             boolean mask on the datetime column. 
+         """
+         
+         for SpecialRecorder, _, filepath in recorders_with_long_file:
+             with self.subTest(recorder=SpecialRecorder.__name__): 
+                 recorder = SpecialRecorder(filepath=filepath) 
+                 df = recorder.get_table()
+                 start = df["datetime"].iloc[len(df.index) // 4]
+                 end = df["datetime"].iloc[len(df.index) // 2]
+                 expected_df = df[(start <= df.datetime) & (df.datetime <= end)]
+                 pd.testing.assert_frame_equal(recorder.get_table(start=start, end=end), expected_df)
+                 pd.testing.assert_frame_equal(recorder.get_table(start=str(start)), df[start <= df.datetime])
+                 assert len(recorder.get_data(end=df["timestamp"].iloc[0] - 1).index) == 0
+             
+    def test_retention(self):
+         """ Test that a recorder with retention keeps just the newest rows 
+             and spills the evicted rows to a csv file. 
+         """
+         
+         for SpecialRecorder, short_fp, long_fp in recorders_with_long_file:
+             with self.subTest(recorder=SpecialRecorder.__name__): 
+                 with tempfile.TemporaryDirectory() as tmp_dir: 
+                     copy_filepath = Helper.generate_a_filepath_for_copy(short_fp)
+                     spill_path = os.path.join(tmp_dir, "spill.csv")
+                     copy(short_fp, copy_filepath)
+                     recorder = SpecialRecorder(filepath=copy_filepath) 
+                     recorder.set_retention(max_rows=10, spill_path=spill_path)
+                     recorder.get_table()
+                     copy(long_fp, copy_filepath)
+                     df = recorder.get_table()
+                     spilled_df = pd.read_csv(spill_path)
+                     os.remove(copy_filepath)
+             
+                 full_df = SpecialRecorder(filepath=long_fp).get_table()
+                 pd.testing.assert_frame_equal(df, full_df.iloc[-10:])
+                 assert len(spilled_df.index) == len(full_df.index) - 10
+                 assert (spilled_df["timestamp"].to_numpy() == full_df["timestamp"].to_numpy()[:-10]).all()
+             
+                 recorder = SpecialRecorder(filepath=long_fp) 
+                 recorder.set_retention(max_age_s=60)
+                 df = recorder.get_table()
+                 assert (df["timestamp"] >= full_df["timestamp"].iloc[-1] - 60 * 10**9).all()
+                 assert len(df.index) == (full_df["timestamp"] >= full_df["timestamp"].iloc[-1] - 60 * 10**9).sum()
+             
+    def test_schema(self):
+         """ Test that the columns are parsed with the dtypes of the schema 
+             and that the measured values can be downcast to float32. 
+         """
+         
+         for SpecialRecorder, filepath, _ in all_recorders:
+             with self.subTest(recorder=SpecialRecorder.__name__): 
+                 recorder = SpecialRecorder(filepath=filepath) 
+                 recorder.downcast_floats = True
+                 df = recorder.get_data()
+                 dtypes = recorder._get_dtypes()
+                 for column in df.columns: 
+                     if column in dtypes: 
+                         expected_dtype = pd.api.types.pandas_dtype(dtypes[column])
+                         assert df[column].dtype.name == expected_dtype.name, \
+                             f"test_schema() with {SpecialRecorder} failed for {column}."
+                     if recorder.schema.get(column, recorder.schema_default) == "float": 
+                         assert df[column].dtype == "float32", \
+                             f"test_schema() with {SpecialRecorder} failed for {column}."
+             
+    def test_get_table_slices_under_the_update_lock(self):
+         """ Test that get_table() keeps the update lock while slicing, so that 
+             a concurrent refresh cannot change the table in between. 
+         """
+         
+         SpecialRecorder, short_fp, _ = recorders_with_long_file[0]
+         recorder = SpecialRecorder(filepath=short_fp)
+         slice_rows = recorder._slice_rows
+         acquired = []
+         
+         def try_to_acquire(): 
+             acquired.append(recorder._update_lock.acquire(blocking=False))
+             if acquired[-1]: 
+                 recorder._update_lock.release()
+         
+         def checked_slice_rows(*args, **kwargs): 
+             other_thread = threading.Thread(target=try_to_acquire)
+             other_thread.start()
+             other_thread.join()
+             return slice_rows(*args, **kwargs)
+         
+         recorder._slice_rows = checked_slice_rows
+         recorder.get_table()
+         recorder.get_data()
+         assert acquired == [False, False], "Another thread could take the update lock during the slicing."
+             
+    def test_file_recorder_tracks_all_files_by_default(self):
+         """ Test that the default match of the FileRecorder, an empty regex, 
+             tracks every file in the folder and its subfolders. 
+         """
+         
+         with tempfile.TemporaryDirectory() as folder: 
+             os.makedirs(os.path.join(folder, "sub"))
+             filepaths = [os.path.join(folder, "ccd_0.xlsx"), os.path.join(folder, "sub", "ccd_1.xlsx")]
+             for filepath in filepaths: 
+                 with open(filepath, "wb") as f: 
+                     f.write(b"image")
+             df = FileRecorder(folder).get_table()
+             assert sorted(df["filepath"]) == sorted(filepaths)
+             
+    def test_recorder_group(self):
+         """ Test that a RecorderGroup refreshes its recorders concurrently, 
+             both blocking and from a coroutine, and reports which changed. 
+         """
+         
+         group_classes, short_fps, long_fps = zip(*recorders_with_long_file)
+         copy_filepaths = [Helper.generate_a_filepath_for_copy(fp) for fp in short_fps]
+         for short_fp, copy_filepath in zip(short_fps, copy_filepaths): 
+             copy(short_fp, copy_filepath)
+         group_recorders = [SpecialRecorder(filepath=fp) for SpecialRecorder, fp in zip(group_classes, copy_filepaths)]
+         
+         with RecorderGroup(group_recorders) as group: 
+             assert group.refresh() == group_recorders
+             assert group.refresh() == []
+             for long_fp, copy_filepath in zip(long_fps, copy_filepaths): 
+                 copy(long_fp, copy_filepath)
+             assert asyncio.run(group.refresh_async()) == group_recorders
+             
+         for recorder, SpecialRecorder, long_fp, copy_filepath in zip(group_recorders, group_classes, 
+                                                                      long_fps, copy_filepaths): 
+             os.remove(copy_filepath)
+             full_df = SpecialRecorder(filepath=long_fp).get_table()
+             pd.testing.assert_frame_equal(recorder._table_df, full_df)
+             
+    def test_rollups(self):
+         """ Test that the rollups which are updated with the new rows equal
+             the rollups of the full table. 
+         """
+         
+         for SpecialRecorder, short_fp, long_fp in recorders_with_long_file:
+             with self.subTest(recorder=SpecialRecorder.__name__): 
+                 copy_filepath = Helper.generate_a_filepath_for_copy(short_fp)
+                 copy(short_fp, copy_filepath)
+                 recorder = SpecialRecorder(filepath=copy_filepath) 
+                 assert recorder.rollup_resolutions_s is None
+                 recorder.enable_rollups([10, 60])
+                 recorder.get_table()
+                 copy(long_fp, copy_filepath)
+                 incremental_df = recorder.get_rollup(60)
+                 start = incremental_df["timestamp"].iloc[-1]
+                 rollup_df = recorder.get_rollup(10, start=start)
+                 assert len(rollup_df.index) > 0 and (rollup_df["timestamp"] >= start).all()
+                 os.remove(copy_filepath)
+             
+                 full_df = SpecialRecorder(filepath=long_fp).get_table()
+                 grouped = full_df.groupby(full_df["timestamp"] // (60 * 10**9))
+                 for column in recorder._rollups.columns: 
+                     assert (incremental_df[f"{column}_count"].to_numpy() == grouped[column].count().to_numpy()).all()
+                     mean_diff = incremental_df[f"{column}_mean"].to_numpy() - grouped[column].mean().to_numpy()
+                     assert (abs(mean_diff) < 1e-9).all()
+             
+    def test_rolling(self):
+         """ Test that the rolling statistics which are updated with the new 
+             rows equal the rolling statistics of the full table. 
+         """
+         
+         for SpecialRecorder, short_fp, long_fp in recorders_with_long_file:
+             with self.subTest(recorder=SpecialRecorder.__name__): 
+                 full_df = SpecialRecorder(filepath=long_fp).get_table()
+                 columns = [column for column in full_df.columns 
+                            if column != "timestamp" and full_df[column].dtype.kind in "iuf"]
+                 if len(columns) == 0: 
+                     continue
+                 copy_filepath = Helper.generate_a_filepath_for_copy(short_fp)
+                 copy(short_fp, copy_filepath)
+                 recorder = SpecialRecorder(filepath=copy_filepath) 
+                 recorder.rolling(columns[0], "60s", ["mean", "max"])
+                 copy(long_fp, copy_filepath)
+                 rolling_df = recorder.rolling(columns[0], "60s", ["mean", "max"])
+                 os.remove(copy_filepath)
+             
+                 expected = full_df.set_index(pd.to_datetime(full_df["timestamp"]))[columns[0]] \
+                     .rolling("60s", min_periods=0)
+                 assert len(rolling_df.index) == len(full_df.index)
+                 assert np.allclose(rolling_df[f"{columns[0]}_mean"], expected.mean(), equal_nan=True)
+                 assert np.allclose(rolling_df[f"{columns[0]}_max"], expected.max(), equal_nan=True)
+             
+    def test_get_table_returns_a_copy(self):
+         """ Test that modifying the returned table does not change the 
+             recorder, unless the shared view is requested with copy=False. 
+         """
+         
+         for SpecialRecorder, filepath, _ in all_recorders:
+             with self.subTest(recorder=SpecialRecorder.__name__): 
+                 recorder = SpecialRecorder(filepath=filepath) 
+                 df = recorder.get_table()
+                 df["new_column"] = 1
+                 assert "new_column" not in recorder.get_table().columns
+                 assert recorder.get_table(copy=False) is recorder.get_table(copy=False)
+             
+    def test_harmonize_time_without_argument(self):
+         """ Test that subclasses which harmonize self._table_df like before
+             the ColumnStore still work. 
+         """
+         
+         class LegacyHeaterRecorder(HeaterRecorder): 
+             def _harmonize_time(self): 
+                 HeaterRecorder._harmonize_time(self, self._table_df)
+         
+         for filepath in [unittest_short_loc.heater, unittest_long_loc.heater]: 
+             pd.testing.assert_frame_equal(
+                 LegacyHeaterRecorder(filepath=filepath).get_table(), 
+                 HeaterRecorder(filepath=filepath).get_table()
+                 )
+             
     def test_10x_get_table(self):
         for SpecialRecorder, path in zip(recorders, short_paths):
             recorder = SpecialRecorder(filepath=path)
@@ -0,0 +1,26 @@
+import shutil
+
+import pandas as pd
+
+from src.data_eng_utokyo._utilities.general_constants import unittest_long_loc
+from src.data_eng_utokyo.recorders import SSDParser, SSDRecorder
+
+
+def test_ssd_parser_iter_chunks_resumes_when_the_file_grows(tmp_path):
+    filepath = str(tmp_path / "ssd.csv")
+    with open(unittest_long_loc.ssd, "rb") as f:
+        lines = f.readlines()
+    with open(filepath, "wb") as f:
+        f.writelines(lines[:5038])
+    parser = SSDParser(filepath, lines_per_update=1000)
+
+    chunks = list(parser.iter_chunks())
+    assert [len(chunk.index) for chunk in chunks] == [1000] * 5
+    with open(filepath, "ab") as f:
+        f.writelines(lines[5038:])
+    chunks += list(parser.iter_chunks())
+    assert list(parser.iter_chunks()) == []
+    assert parser._tail_reader._file is None
+
+    full_df = SSDRecorder(unittest_long_loc.ssd).get_table()
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), full_df.reset_index(drop=True))
@@ -0,0 +1,79 @@
+from shutil import copy
+
+import numpy as np
+import pandas as pd
+
+from src.data_eng_utokyo._utilities.general_constants import unittest_short_loc, unittest_long_loc
+from src.data_eng_utokyo.algorithms import CoilStateIndex
+from src.data_eng_utokyo.recorders import CoilRecorder
+
+
+def expected_states(coil_df, timestamps):
+    """Reference: state of the last operation at or before each timestamp."""
+    states = []
+    for timestamp in timestamps:
+        before_df = coil_df[coil_df["timestamp"] <= timestamp]
+        states.append(CoilStateIndex.unknown if len(before_df.index) == 0
+                      else int(before_df["CoilOperation"].iloc[-1] == "ON"))
+    return np.array(states, dtype=np.int8)
+
+
+def test_coil_state_index_matches_log(tmp_path):
+    filepath = str(tmp_path / "coil.txt")
+    copy(unittest_short_loc.coil, filepath)
+    coil_index = CoilStateIndex(CoilRecorder(filepath=filepath))
+    coil_index.refresh()
+    copy(unittest_long_loc.coil, filepath)
+
+    coil_df = CoilRecorder(filepath=unittest_long_loc.coil).get_table()
+    timestamps = np.linspace(coil_df["timestamp"].iloc[0] - 10**9, coil_df["timestamp"].iloc[-1] + 10**9, 200)
+    timestamps = np.concatenate([timestamps.astype(np.int64), coil_df["timestamp"].to_numpy()])
+    assert (coil_index.get_states(timestamps) == expected_states(coil_df, timestamps)).all()
+
+
+def test_coil_state_index_time_since_switch(tmp_path):
+    filepath = str(tmp_path / "coil.txt")
+    with open(filepath, "w") as f:
+        f.write("Time\tCoilOperation\n2022/03/14 12:00:00\tON\n2022/03/14 12:00:10\tON\n2022/03/14 12:00:20\tOFF\n")
+    coil_index = CoilStateIndex(CoilRecorder(filepath=filepath))
+    t0 = CoilRecorder(filepath=filepath).get_table()["timestamp"].iloc[0]
+    df = coil_index.tag(pd.DataFrame({"timestamp": t0 + np.array([-1, 5, 15, 25]) * 10**9}))
+    assert df["coil_state"].tolist() == [CoilStateIndex.unknown, CoilStateIndex.on,
+                                         CoilStateIndex.on, CoilStateIndex.off]
+    assert np.isnan(df["time_since_coil_switch_s"].iloc[0])
+    assert df["time_since_coil_switch_s"].iloc[1:].tolist() == [5.0, 15.0, 5.0]
+
+
+class TableRecorder(object):
+    """Stands in for a CoilRecorder whose table is set by the test."""
+
+    def __init__(self, coil_df):
+        self.coil_df = coil_df
+
+    def get_table(self, copy=True):
+        return self.coil_df
+
+
+def test_coil_state_index_follows_replaced_and_dropped_rows():
+    t0 = 1647227520 * 10**9
+    coil_df = pd.DataFrame({"timestamp": t0 + np.arange(5) * 10**10,
+                            "CoilOperation": ["ON", "OFF", "ON", "OFF", "ON"]})
+    timestamps = t0 + np.arange(-1, 50) * 10**9
+    recorder = TableRecorder(coil_df.iloc[:3])
+    coil_index = CoilStateIndex(recorder)
+    coil_index.refresh()
+    # The provisional last row is replaced, then dropped, then completed with new rows
+    for operations in (["ON", "OFF", "OFF"], ["ON", "OFF"], ["ON", "OFF", "ON", "OFF", "ON"]):
+        recorder.coil_df = coil_df.iloc[:len(operations)].assign(CoilOperation=operations)
+        fresh_index = CoilStateIndex(TableRecorder(recorder.coil_df))
+        assert (coil_index.get_states(timestamps) == fresh_index.get_states(timestamps)).all()
+        assert (coil_index.get_states(timestamps) == expected_states(recorder.coil_df, timestamps)).all()
+        np.testing.assert_array_equal(coil_index.get_time_since_switch(timestamps),
+                                      fresh_index.get_time_since_switch(timestamps))
+
+
+def test_coil_state_index_maps_other_operations_to_unknown():
+    t0 = 1647227520 * 10**9
+    coil_df = pd.DataFrame({"timestamp": t0 + np.arange(3) * 10**9, "CoilOperation": ["ON", "ERR", "OFF"]})
+    states = CoilStateIndex(TableRecorder(coil_df)).get_states(coil_df["timestamp"].to_numpy())
+    assert states.tolist() == [CoilStateIndex.on, CoilStateIndex.unknown, CoilStateIndex.off]
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_eng_utokyo._utilities.column_store import ColumnStore
+
+
+def test_column_store_append_equals_concat():
+    parts = [pd.DataFrame({"timestamp": np.arange(i, i + 3), "value": np.random.rand(3)}) for i in range(0, 3000, 3)]
+    store = ColumnStore(capacity=1)
+    for part in parts:
+        store.append(part)
+    pd.testing.assert_frame_equal(store.to_frame(), pd.concat(parts, ignore_index=True), check_index_type=False)
+
+
+def test_column_store_fills_missing_columns():
+    store = ColumnStore.from_frame(pd.DataFrame({"a": [1, 2]}))
+    store.append(pd.DataFrame({"a": [3], "b": ["x"]}))
+    df = store.to_frame()
+    assert df["a"].tolist() == [1, 2, 3]
+    assert df["b"].tolist()[2] == "x"
+    assert df["b"].isna().tolist() == [True, True, False]
+
+
+def test_column_store_empty_columns_take_the_dtype_of_the_first_rows():
+    store = ColumnStore.from_frame(pd.DataFrame({"a": pd.Series([], dtype=object)}))
+    store.append(pd.DataFrame({"a": [1, 2]}))
+    assert store.to_frame()["a"].dtype == np.int64
+
+
+def test_column_store_view_is_read_only_and_stays_valid():
+    store = ColumnStore.from_frame(pd.DataFrame({"a": [3.0, 1.0, 2.0]}))
+    view = store.to_frame()
+    with pytest.raises(ValueError):
+        store.column("a")[0] = 0.0
+    store.append(pd.DataFrame({"a": [0.0]}))
+    store.sort(by="a")
+    assert view["a"].tolist() == [3.0, 1.0, 2.0]
+    assert store.to_frame()["a"].tolist() == [0.0, 1.0, 2.0, 3.0]
+    assert store.to_frame().index.tolist() == [3, 1, 2, 0]
+
+
+def test_column_store_duplicate_column_names():
+    df = pd.DataFrame([[1, "x", 2]], columns=["a", "b", "a"])
+    store = ColumnStore.from_frame(df)
+    store.append(df)
+    assert store.columns == ["a", "b", "a"]
+    assert store.to_frame().iloc[:, 2].tolist() == [2, 2]
+
+
+def test_column_store_drop_head_bounds_memory():
+    store = ColumnStore(capacity=4)
+    for i in range(1000):
+        store.append(pd.DataFrame({"a": [i, i]}))
+        store.drop_head(len(store) - 10)
+    assert len(store) == 10
+    assert store.column("a").tolist() == [995, 995, 996, 996, 997, 997, 998, 998, 999, 999]
+    assert store.to_frame().index[0] == 1990
+    assert store._capacity <= 32
+
+
+def test_column_store_categorical_codes_are_stable():
+    store = ColumnStore.from_frame(pd.DataFrame({"state": pd.Categorical(["ON", "OFF"])}))
+    store.append(pd.DataFrame({"state": pd.Categorical(["STANDBY", "ON"])}))
+    df = store.to_frame()
+    assert isinstance(df["state"].dtype, pd.CategoricalDtype)
+    assert df["state"].tolist() == ["ON", "OFF", "STANDBY", "ON"]
+    assert store.column("state").tolist() == [1, 0, 2, 1]
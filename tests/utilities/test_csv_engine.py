@@ -0,0 +1,55 @@
+import io
+
+import pandas as pd
+import pytest
+
+from src.data_eng_utokyo._utilities import csv_engine
+from src.data_eng_utokyo._utilities.csv_engine import read_csv, resolve_engine
+
+
+HEADER_AND_ROWS = b"Title:,test\nItem:,,1\nDate,Time,Value\n2022/03/14,10:07:41,1\n2022/03/14,10:07:42,2\n"
+
+
+def test_resolve_engine_without_pyarrow(monkeypatch):
+    monkeypatch.setattr(csv_engine, "is_pyarrow_available", lambda: False)
+    assert resolve_engine("auto") == "c"
+    assert resolve_engine("pyarrow") == "c"
+    assert resolve_engine("python") == "python"
+    with pytest.raises(ValueError):
+        resolve_engine("fast")
+
+
+def test_resolve_engine_pyarrow_is_opt_in(monkeypatch):
+    monkeypatch.setattr(csv_engine, "is_pyarrow_available", lambda: True)
+    assert resolve_engine("auto") == "c"
+    assert resolve_engine("pyarrow") == "pyarrow"
+
+
+@pytest.mark.parametrize("engine", ["auto", "pyarrow", "c", "python"])
+def test_read_csv_engines_agree(engine):
+    kwargs = dict(skiprows=2, header=0, names=["Date", "Time", "Value"], dtype={"Time": "str", "Value": "float64"})
+    df = read_csv(io.BytesIO(HEADER_AND_ROWS), engine=engine, **kwargs)
+    expected_df = pd.read_csv(io.BytesIO(HEADER_AND_ROWS), **kwargs)
+    pd.testing.assert_frame_equal(df, expected_df)
+
+
+def test_read_csv_falls_back_on_ragged_rows(monkeypatch):
+    pytest.importorskip("pyarrow")
+    engines = []
+    read_csv_with_pandas = pd.read_csv
+    def spy(*args, **kwargs):
+        engines.append(kwargs.get("engine"))
+        return read_csv_with_pandas(*args, **kwargs)
+    monkeypatch.setattr(csv_engine.pd, "read_csv", spy)
+
+    data = b"a,b,c\n1,2\n3,4\n"
+    df = read_csv(io.BytesIO(data), engine="pyarrow")
+    assert engines == ["pyarrow", "c"]
+    assert df["a"].tolist() == [1, 3]
+    assert df["c"].isna().all()
+
+
+def test_read_csv_auto_keeps_the_dtypes_of_the_c_engine():
+    data = b"Time,Value\n2022-03-14 10:07:41,1\n2022-03-14 10:07:42,2\n"
+    df = read_csv(io.BytesIO(data), engine="auto")
+    pd.testing.assert_frame_equal(df, pd.read_csv(io.BytesIO(data), engine="c"))
@@ -0,0 +1,30 @@
+import os
+
+from src.data_eng_utokyo._utilities.file_fingerprint import FileChange, FileFingerprint, compare_fingerprints
+
+
+def test_compare_fingerprints(tmp_path):
+    filepath = tmp_path / "log.csv"
+    filepath.write_bytes(b"a,b\n1,2\n")
+    first = FileFingerprint.of_file(str(filepath))
+    assert compare_fingerprints(None, first) == FileChange.appended
+    assert compare_fingerprints(first, FileFingerprint.of_file(str(filepath))) == FileChange.unchanged
+
+    with open(filepath, "ab") as f:
+        f.write(b"3,4\n")
+    appended = FileFingerprint.of_file(str(filepath))
+    assert compare_fingerprints(first, appended) == FileChange.appended
+
+    filepath.write_bytes(b"a,b\n")
+    assert compare_fingerprints(appended, FileFingerprint.of_file(str(filepath))) == FileChange.truncated
+
+    replacement = tmp_path / "new.csv"
+    replacement.write_bytes(b"a,b\n1,2\n3,4\n5,6\n")
+    before = FileFingerprint.of_file(str(filepath))
+    os.replace(replacement, filepath)
+    assert compare_fingerprints(before, FileFingerprint.of_file(str(filepath))) == FileChange.replaced
+
+
+def test_compare_fingerprints_same_size_rewrite():
+    old = FileFingerprint(mtime_ns=1, size=10, inode=5)
+    assert compare_fingerprints(old, FileFingerprint(mtime_ns=2, size=10, inode=5)) == FileChange.replaced
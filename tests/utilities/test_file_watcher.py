@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pytest
+
+from src.data_eng_utokyo._utilities.file_watcher import InotifyWatcher, PollingWatcher
+
+
+def create_watchers():
+    watchers = [PollingWatcher(poll_interval_s=0.01)]
+    if InotifyWatcher.is_available():
+        watchers.append(InotifyWatcher())
+    return watchers
+
+
+@pytest.mark.parametrize("watcher", create_watchers(), ids=lambda w: type(w).__name__)
+def test_file_watcher_reports_append(tmp_path, watcher):
+    filepath = tmp_path / "log.csv"
+    filepath.write_bytes(b"a,b\n")
+    other = tmp_path / "other.csv"
+    other.write_bytes(b"a,b\n")
+    calls = []
+    with watcher:
+        watcher.subscribe(str(filepath), callback=calls.append)
+        assert watcher.wait(timeout=0.05) == set()
+
+        other.write_bytes(b"a,b\n1,2\n")
+        assert watcher.wait(timeout=0.05) == set()
+
+        writer = threading.Timer(0.05, lambda: filepath.write_bytes(b"a,b\n1,2\n"))
+        writer.start()
+        start = time.monotonic()
+        changed_paths = watcher.wait(timeout=5)
+        writer.join()
+        assert changed_paths == {str(filepath)}
+        assert calls == [str(filepath)]
+        assert time.monotonic() - start < 1
+
+
+@pytest.mark.parametrize("watcher", create_watchers(), ids=lambda w: type(w).__name__)
+def test_file_watcher_reports_new_file_in_folder(tmp_path, watcher):
+    with watcher:
+        watcher.subscribe(str(tmp_path))
+        (tmp_path / "new.csv").write_bytes(b"a,b\n")
+        assert watcher.wait(timeout=5) == {str(tmp_path)}
+
+
+@pytest.mark.parametrize("watcher", create_watchers(), ids=lambda w: type(w).__name__)
+def test_file_watcher_keeps_waiting_on_unrelated_files(tmp_path, watcher):
+    filepath = tmp_path / "log.csv"
+    filepath.write_bytes(b"a,b\n")
+    with watcher:
+        watcher.subscribe(str(filepath))
+        writers = [
+            threading.Timer(0.02, lambda: (tmp_path / "log.csv.lidx.npz").write_bytes(b"index")),
+            threading.Timer(0.2, lambda: filepath.write_bytes(b"a,b\n1,2\n")),
+            ]
+        for writer in writers:
+            writer.start()
+        start = time.monotonic()
+        changed_paths = watcher.wait(timeout=5)
+        for writer in writers:
+            writer.join()
+        assert changed_paths == {str(filepath)}
+        assert time.monotonic() - start >= 0.15
+
+        (tmp_path / "other.csv").write_bytes(b"a,b\n")
+        start = time.monotonic()
+        assert watcher.wait(timeout=0.3) == set()
+        assert time.monotonic() - start >= 0.25
+
+
+@pytest.mark.parametrize("watcher", create_watchers(), ids=lambda w: type(w).__name__)
+def test_file_watcher_reports_changes_in_subfolders(tmp_path, watcher):
+    (tmp_path / "20220314").mkdir()
+    with watcher:
+        watcher.subscribe(str(tmp_path))
+        (tmp_path / "20220314" / "ssd-Slot1-In2.csv").write_bytes(b"a,b\n")
+        assert watcher.wait(timeout=5) == {str(tmp_path)}
+
+        # A new subfolder is watched too
+        (tmp_path / "20220315").mkdir()
+        assert watcher.wait(timeout=5) == {str(tmp_path)}
+        time.sleep(0.05)
+        (tmp_path / "20220315" / "ssd-Slot1-In2.csv").write_bytes(b"a,b\n")
+        assert watcher.wait(timeout=5) == {str(tmp_path)}
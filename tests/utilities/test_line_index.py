@@ -0,0 +1,62 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from src.data_eng_utokyo._utilities.general_constants import unittest_long_loc
+from src.data_eng_utokyo._utilities.line_index import LineIndex
+from src.data_eng_utokyo.recorders import SSDRecorder
+
+
+def write_lines(filepath, keys, mode="a"):
+    with open(filepath, mode) as f:
+        f.writelines(f"{i},{key}\n" for i, key in keys)
+
+
+def test_line_index_reads_rows_and_finds_keys(tmp_path):
+    filepath = str(tmp_path / "data.csv")
+    with open(filepath, "w") as f:
+        f.write("header\nname,key\n")
+    keys = np.cumsum(np.random.default_rng(0).integers(0, 3, size=1000))
+    write_lines(filepath, enumerate(keys[:600]))
+    sidecar_path = str(tmp_path / "cache" / "data.lidx.npz")
+    os.makedirs(os.path.dirname(sidecar_path))
+    index = LineIndex(filepath, header_lines=2, key_column=1, every=64, sidecar_path=sidecar_path)
+    assert index.update() == 600
+
+    write_lines(filepath, enumerate(keys[600:], start=600))
+    assert index.update() == 400
+    assert index.read_rows(130, 3) == b"130,%d\n131,%d\n132,%d\n" % tuple(keys[130:133])
+    assert index.read_rows(995, 10).count(b"\n") == 5
+    for key in [-1, keys[0], keys[500], keys[500] + 0.5, keys[-1], keys[-1] + 1]:
+        assert index.find_row(key) == np.searchsorted(keys, key, side="left")
+
+    # The sidecar is reused, a replaced file is indexed again
+    assert LineIndex(filepath, header_lines=2, key_column=1, every=64, sidecar_path=sidecar_path).nr_of_rows == 1000
+    assert LineIndex(filepath, header_lines=2, key_column=1, every=64).nr_of_rows == 0
+    os.remove(filepath)
+    write_lines(filepath, enumerate(keys[:10]), mode="w")
+    index = LineIndex(filepath, header_lines=0, key_column=1, every=64, sidecar_path=sidecar_path)
+    index.update()
+    assert index.nr_of_rows == 10
+
+
+def test_ssd_recorder_reads_rows_at_time(tmp_path):
+    filepath = str(tmp_path / "ssd.csv")
+    shutil.copy(unittest_long_loc.ssd, filepath)
+    full_df = SSDRecorder(filepath).get_table()
+    recorder = SSDRecorder(filepath)
+    recorder.get_line_index(every=100)
+
+    df = recorder.read_rows(250, 20)
+    pd.testing.assert_frame_equal(df.reset_index(drop=True), full_df.iloc[250:270].reset_index(drop=True))
+    df = recorder.read_rows_at(full_df["timestamp"].iloc[777], 5)
+    assert df["timestamp"].iloc[0] == full_df["timestamp"].iloc[777]
+    assert os.listdir(tmp_path) == ["ssd.csv"]
+
+    # With a cache, the index is saved in the cache folder
+    recorder = SSDRecorder(filepath)
+    recorder.enable_cache(str(tmp_path / "cache"))
+    recorder.get_line_index(every=100)
+    assert os.listdir(tmp_path / "cache") == [os.path.basename(recorder._get_sidecar_path("line_index"))]
@@ -0,0 +1,46 @@
+import functools
+import shutil
+
+import pandas as pd
+import pytest
+
+from src.data_eng_utokyo._utilities.general_constants import unittest_long_loc
+from src.data_eng_utokyo._utilities.parallel_loader import parse_csv_lines, parse_line_ranges, split_line_ranges
+from src.data_eng_utokyo.recorders import HeaterRecorder, SSDRecorder
+
+
+@pytest.mark.parametrize("nr_of_ranges", [1, 3, 1000])
+def test_split_line_ranges_covers_complete_lines(tmp_path, nr_of_ranges):
+    filepath = tmp_path / "lines.csv"
+    filepath.write_bytes(b"header\n" + b"".join(b"%d,%d\n" % (i, i * i) for i in range(500)) + b"7,")
+    start = len(b"header\n")
+    ranges = split_line_ranges(str(filepath), nr_of_ranges, start=start)
+    assert ranges[0][0] == start and ranges[-1][1] == filepath.stat().st_size - 2
+    assert all(end == next_start for (_, end), (next_start, _) in zip(ranges[:-1], ranges[1:]))
+
+    data = filepath.read_bytes()
+    assert all(data[end - 1:end] == b"\n" for _, end in ranges)
+    parser = functools.partial(parse_csv_lines, names=["i", "square"])
+    df = pd.concat(parse_line_ranges(str(filepath), ranges, parser, max_workers=2), ignore_index=True)
+    assert df["i"].tolist() == list(range(500))
+
+
+@pytest.mark.parametrize("SpecialRecorder, filepath", [
+    (HeaterRecorder, unittest_long_loc.heater),
+    (SSDRecorder, unittest_long_loc.ssd),
+])
+def test_parallel_initial_load_equals_serial_load(tmp_path, SpecialRecorder, filepath):
+    copy_filepath = str(tmp_path / "copy.csv")
+    shutil.copy(filepath, copy_filepath)
+    recorder = SpecialRecorder(copy_filepath)
+    recorder.enable_parallel_load(max_workers=3, min_bytes=0)
+    df = recorder.get_table()
+    expected_df = SpecialRecorder(filepath).get_table()
+    pd.testing.assert_frame_equal(df.reset_index(drop=True), expected_df.reset_index(drop=True))
+    assert recorder.read_data_lines == len(expected_df.index)
+
+    with open(filepath, "rb") as f:
+        last_line = f.read().splitlines()[-1] + b"\n"
+    with open(copy_filepath, "ab") as f:
+        f.write(last_line)
+    assert len(recorder.get_table().index) == len(expected_df.index) + 1
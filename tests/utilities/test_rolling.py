@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_eng_utokyo._utilities.rolling import RollingAggregate
+
+
+def make_frame(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    timestamps = 1_600_000_000 * 10**9 + np.cumsum(rng.integers(1, 3, size=n)) * 10**9
+    values = 1000 + rng.normal(size=n)
+    values[rng.random(n) < 0.05] = np.nan
+    return pd.DataFrame({"timestamp": timestamps, "value": values})
+
+
+@pytest.mark.parametrize("window", [10, "30s"])
+def test_rolling_aggregate_in_chunks_equals_pandas(window):
+    df = make_frame()
+    stats = ["count", "sum", "mean", "std", "min", "max"]
+    aggregate = RollingAggregate("value", window, stats)
+    for lo in range(0, len(df.index), 37):
+        chunk_df = df.iloc[lo:lo + 37]
+        aggregate.add(chunk_df["timestamp"].to_numpy(), chunk_df["value"].to_numpy())
+    result_df = aggregate.get_frame()
+
+    indexed = df.set_index(pd.to_datetime(df["timestamp"]))["value"]
+    rolling = indexed.rolling(window, min_periods=0)
+    assert (result_df["timestamp"].to_numpy() == df["timestamp"].to_numpy()).all()
+    for stat in stats:
+        expected = getattr(rolling, stat)().to_numpy()
+        np.testing.assert_allclose(result_df[f"value_{stat}"].to_numpy(), expected, rtol=1e-9, atol=1e-9)
+
+
+def test_rolling_aggregate_rejects_unknown_stats():
+    with pytest.raises(ValueError):
+        RollingAggregate("value", 10, ["median"])
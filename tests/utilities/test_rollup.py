@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+from src.data_eng_utokyo._utilities.rollup import RollupPyramid
+
+
+def test_rollup_pyramid_incremental_equals_groupby():
+    rng = np.random.default_rng(1)
+    timestamps = np.sort(rng.integers(0, 3600 * 10**9, size=5000))
+    values = rng.normal(size=5000)
+    values[rng.random(5000) < 0.1] = np.nan
+    df = pd.DataFrame({"timestamp": timestamps, "value": values})
+
+    pyramid = RollupPyramid([1, 60], columns=["value"])
+    for chunk in np.array_split(np.arange(len(df.index)), 37):
+        pyramid.add(df.iloc[chunk])
+
+    for resolution_s in [1, 60]:
+        grouped = df.groupby(df["timestamp"] // int(resolution_s * 1e9))["value"]
+        rollup_df = pyramid.get_frame(resolution_s)
+        assert rollup_df["timestamp"].tolist() == (grouped.size().index * int(resolution_s * 1e9)).tolist()
+        np.testing.assert_allclose(rollup_df["value_mean"], grouped.mean())
+        np.testing.assert_allclose(rollup_df["value_min"], grouped.min())
+        np.testing.assert_allclose(rollup_df["value_max"], grouped.max())
+        assert rollup_df["value_count"].tolist() == grouped.count().tolist()
+
+
+def test_rollup_pyramid_rejects_rows_of_final_buckets():
+    pyramid = RollupPyramid([10], columns=["value"])
+    pyramid.add(pd.DataFrame({"timestamp": [0, 25 * 10**9], "value": [1.0, 2.0]}))
+    assert pyramid.is_in_order(pd.DataFrame({"timestamp": [21 * 10**9]}))
+    assert not pyramid.is_in_order(pd.DataFrame({"timestamp": [19 * 10**9]}))
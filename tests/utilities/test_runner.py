@@ -0,0 +1,155 @@
+import os
+import pickle
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from src.data_eng_utokyo._utilities.general_constants import unittest_long_loc, unittest_short_loc
+from src.data_eng_utokyo.analyses import Analysis, ImageAnalysis, ResultParameter
+from src.data_eng_utokyo.recorders import FileRecorder, HeaterRecorder, SSDRecorder
+from src.data_eng_utokyo.utilities import Runner
+
+
+class CountingAnalysis(Analysis):
+
+    def __init__(self, filepath):
+        super(CountingAnalysis, self).__init__(
+            recorder=HeaterRecorder(filepath),
+            name="Counting Analysis",
+            result_param=ResultParameter(image_src="", image_extension=".png", result_filepath=""),
+        )
+        self.nr_of_rows = []
+
+    def _query_df(self, df):
+        return df
+
+    def _run_analysis(self, df):
+        self.nr_of_rows.append(len(df.index))
+
+
+def test_runner_resumes_from_checkpoint(tmp_path):
+    filepath = str(tmp_path / "heater.csv")
+    shutil.copy(unittest_short_loc.heater, filepath)
+    checkpoint_path = str(tmp_path / "checkpoint.pkl")
+
+    analysis = CountingAnalysis(filepath)
+    Runner([analysis], checkpoint_path=checkpoint_path, checkpoint_every=1).run(cycles=2, period_s=0)
+    assert analysis.nr_of_rows == [18]
+
+    # Restart: The analysis is up to date and the recorder does not parse the csv file again
+    resumed_analysis = CountingAnalysis(filepath)
+    Runner([resumed_analysis], checkpoint_path=checkpoint_path).run(cycles=1, period_s=0)
+    assert resumed_analysis.nr_of_rows == []
+    assert resumed_analysis.recorder.read_data_lines == 18
+    pd.testing.assert_frame_equal(resumed_analysis.recorder.get_table(), analysis.recorder.get_table())
+
+
+def test_runner_checkpoint_contains_no_tables(tmp_path):
+    filepath = str(tmp_path / "heater.csv")
+    shutil.copy(unittest_short_loc.heater, filepath)
+    checkpoint_path = str(tmp_path / "checkpoint.pkl")
+
+    analysis = CountingAnalysis(filepath)
+    Runner([analysis], checkpoint_path=checkpoint_path).run(cycles=1, period_s=0)
+    with open(checkpoint_path, "rb") as f:
+        checkpoint = pickle.load(f)
+    state = checkpoint["states"][0]["recorder"]
+    assert set(state) == {"cursor"}
+    assert state["cursor"]["offset"] == os.path.getsize(filepath)
+
+
+def test_runner_resumes_from_checkpoint_with_new_lines(tmp_path):
+    filepath = str(tmp_path / "heater.csv")
+    shutil.copy(unittest_short_loc.heater, filepath)
+    checkpoint_path = str(tmp_path / "checkpoint.pkl")
+
+    analysis = CountingAnalysis(filepath)
+    Runner([analysis], checkpoint_path=checkpoint_path).run(cycles=1, period_s=0)
+    with open(filepath, "rb") as f:
+        last_line = f.read().splitlines(keepends=True)[-1]
+    with open(filepath, "ab") as f:
+        f.write(last_line)
+
+    # The table is parsed up to the checkpoint and the new line is appended afterwards
+    resumed_analysis = CountingAnalysis(filepath)
+    Runner([resumed_analysis], checkpoint_path=checkpoint_path).run(cycles=1, period_s=0)
+    assert resumed_analysis.nr_of_rows == [19]
+    assert resumed_analysis.recorder.read_data_lines == 19
+
+
+def test_runner_restores_tables_from_the_cache(tmp_path, monkeypatch):
+    filepath = str(tmp_path / "heater.csv")
+    shutil.copy(unittest_short_loc.heater, filepath)
+    checkpoint_path = str(tmp_path / "checkpoint.pkl")
+    cache_dir = str(tmp_path / "cache")
+
+    analysis = CountingAnalysis(filepath)
+    analysis.recorder.enable_cache(cache_dir, min_interval_s=0)
+    Runner([analysis], checkpoint_path=checkpoint_path).run(cycles=1, period_s=0)
+
+    # The csv file is not parsed again
+    def fail(*args, **kwargs):
+        raise AssertionError("The table should be restored from the cache")
+    monkeypatch.setattr(HeaterRecorder, "_reload_until", fail)
+    resumed_analysis = CountingAnalysis(filepath)
+    resumed_analysis.recorder.enable_cache(cache_dir, min_interval_s=0)
+    Runner([resumed_analysis], checkpoint_path=checkpoint_path).run(cycles=1, period_s=0)
+    assert resumed_analysis.nr_of_rows == []
+    pd.testing.assert_frame_equal(resumed_analysis.recorder.get_table(), analysis.recorder.get_table())
+
+
+def test_analysis_reads_the_table_without_copy(tmp_path):
+    filepath = str(tmp_path / "heater.csv")
+    shutil.copy(unittest_short_loc.heater, filepath)
+    analysis = CountingAnalysis(filepath)
+    df = analysis._get_table()
+    shared_df = analysis.recorder.get_table(copy=False)
+    assert np.shares_memory(df["timestamp"].to_numpy(), shared_df["timestamp"].to_numpy())
+
+
+def test_recorder_restores_checkpoint_which_was_read_in_chunks(tmp_path):
+    filepath = str(tmp_path / "ssd.csv")
+    shutil.copy(unittest_long_loc.ssd, filepath)
+    recorder = SSDRecorder(filepath, lines_per_update=1000)
+    for _ in range(6):
+        recorder.get_table()
+    state = recorder.get_state()
+    assert recorder.read_data_lines == 6000
+
+    resumed_recorder = SSDRecorder(filepath, lines_per_update=1000)
+    resumed_recorder.set_state(state)
+    assert resumed_recorder.read_data_lines == 6000
+    expected_df = SSDRecorder(filepath, lines_per_update=7000).get_table()
+    pd.testing.assert_frame_equal(resumed_recorder.get_table(), expected_df)
+
+
+def test_runner_resumes_image_analysis_from_checkpoint(tmp_path):
+    folder = tmp_path / "images"
+    folder.mkdir()
+    for i in range(3):
+        (folder / f"ccd_{i}.xlsx").write_bytes(b"image")
+    checkpoint_path = str(tmp_path / "checkpoint.pkl")
+    analyzed = []
+
+    def create_analysis():
+        def perform_analysis(source, **kwargs):
+            analyzed.append(source)
+            return {"fit_successful": False}
+        return ImageAnalysis(
+            recorder=FileRecorder(str(folder), match=".*ccd_.*.xlsx"),
+            perform_analysis=perform_analysis,
+            result_param=ResultParameter(image_src=str(tmp_path) + "/", image_extension=".png",
+                                         result_filepath=str(tmp_path / "results.csv")),
+            )
+
+    analysis = create_analysis()
+    Runner([analysis], checkpoint_path=checkpoint_path).run(cycles=1, period_s=0)
+    assert len(analyzed) == 3
+
+    # The files are not analyzed again after a restart
+    resumed_analysis = create_analysis()
+    Runner([resumed_analysis], checkpoint_path=checkpoint_path).run(cycles=1, period_s=0)
+    assert len(analyzed) == 3
+    pd.testing.assert_frame_equal(resumed_analysis.recorder.get_table().reset_index(drop=True),
+                                  analysis.recorder.get_table().reset_index(drop=True))
@@ -0,0 +1,58 @@
+import os
+
+import pandas as pd
+
+from src.data_eng_utokyo._utilities.general_constants import unittest_long_loc
+from src.data_eng_utokyo._utilities.ssd_file_catalog import SSDFileCatalog
+from src.data_eng_utokyo.analyses import SSDAnalysisWrapper
+
+
+def write_ssd_file(filepath, start, stop, nr_of_rows):
+    """Writes the header of the long SSD unittest file with other times and block size, followed by pulses."""
+    with open(unittest_long_loc.ssd, "rb") as f:
+        lines = f.readlines()
+    header = b"".join(lines[:38])
+    header = header.replace(b"BlockSize,15262", b"BlockSize,%d" % nr_of_rows)
+    header = header.replace(b"//StartTime,10:07:54", b"//StartTime," + start.encode())
+    header = header.replace(b"//StopTime,12:06:51", b"//StopTime," + stop.encode())
+    with open(filepath, "wb") as f:
+        f.write(header + b"".join(lines[38:38 + nr_of_rows]))
+
+
+def test_ssd_file_catalog_queries_header_times(tmp_path):
+    folder = str(tmp_path)
+    write_ssd_file(os.path.join(folder, "b-Slot1-In2.csv"), "11:00:00", "11:59:59", 20)
+    write_ssd_file(os.path.join(folder, "a-Slot1-In2.csv"), "10:00:00", "10:59:59", 10)
+    write_ssd_file(os.path.join(folder, "c-Slot1-In2.csv"), "12:00:00", "", 5)
+    with open(os.path.join(folder, "a-Slot1-In2.csv.lidx.npz"), "wb") as f:
+        f.write(b"not a csv file")
+    catalog_path = str(tmp_path / "cache" / "ssd_catalog.json")
+    os.makedirs(os.path.dirname(catalog_path))
+    catalog = SSDFileCatalog(folder, catalog_path=catalog_path)
+    assert catalog.update() == 3
+    assert catalog.update() == 0
+
+    df = catalog.query(start="2022-03-14 10:59:59.5", end="2022-03-14 11:30:00")
+    assert [os.path.basename(fp) for fp in df["filepath"]] == ["a-Slot1-In2.csv", "b-Slot1-In2.csv"]
+    assert df["nr_of_rows"].tolist() == [10, 20]
+    assert df["start"].iloc[1] == pd.Timestamp("2022-03-14 11:00:00")
+
+    # The measurement without stop time covers everything after its start
+    df = catalog.query(start="2022-03-15")
+    assert [os.path.basename(fp) for fp in df["filepath"]] == ["c-Slot1-In2.csv"]
+    assert df["stop"].isna().all()
+
+    # The saved catalog is reused, only the changed file is read again
+    write_ssd_file(os.path.join(folder, "c-Slot1-In2.csv"), "12:00:00", "12:30:00", 50)
+    catalog = SSDFileCatalog(folder, catalog_path=catalog_path)
+    assert catalog.update() == 1
+    assert SSDFileCatalog(folder).update() == 3
+    assert catalog.query(start="2022-03-15").empty
+
+    # The wrapper queues the overlapping files in the order of their start time
+    wrapper = SSDAnalysisWrapper(folder=folder, match=".*Slot.*.csv",
+                                 time_interval=(pd.Timestamp("2022-03-14 11:00"), pd.Timestamp("2022-03-14 13:00")))
+    wrapper._update()
+    wrapper._update()
+    assert [os.path.basename(fp) for fp in wrapper.filepath_queue.queue] == ["b-Slot1-In2.csv", "c-Slot1-In2.csv"]
+    assert not [name for name in os.listdir(folder) if name.endswith((".json", ".tmp"))]
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from src.data_eng_utokyo._utilities.column_store import ColumnStore
+from src.data_eng_utokyo._utilities.table_cache import TableCache
+
+
+def test_table_cache_roundtrip_without_pickle(tmp_path):
+    df = pd.DataFrame({
+        "timestamp": np.array([1, 2, 3], dtype=np.int64),
+        "value": [0.5, np.nan, 1.5],
+        "name": pd.Series(["a", None, np.nan], dtype=object),
+        "state": pd.Categorical(["ON", "OFF", "ON"]),
+        })
+    store = ColumnStore.from_frame(df)
+    cache = TableCache(str(tmp_path))
+    assert cache.save("table", store, {"offset": 10})
+
+    loaded_store, state = cache.load("table")
+    assert state == {"offset": 10}
+    names = loaded_store.arrays()[2]
+    assert names[0] == "a" and names[1] is None and np.isnan(names[2])
+    pd.testing.assert_frame_equal(loaded_store.to_frame(), store.to_frame())
+
+
+def test_table_cache_does_not_pickle(tmp_path):
+    cache = TableCache(str(tmp_path))
+    store = ColumnStore.from_frame(pd.DataFrame({"x": pd.Series([object()], dtype=object)}))
+    assert not cache.save("table", store, {})
+    assert cache.load("table") is None
+
+    # A cache file with a pickled array is ignored
+    np.savez(cache.get_filepath("table"), columns=np.array([{"names": ["x"]}], dtype=object))
+    assert cache.load("table") is None
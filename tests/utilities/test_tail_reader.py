@@ -0,0 +1,66 @@
+import pytest
+
+from src.data_eng_utokyo._utilities.tail_reader import TailReader
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    filepath = tmp_path / "log.csv"
+    filepath.write_bytes(b"a,b\n1,2\n3,4\n")
+    return filepath
+
+
+def test_tail_reader_reads_only_appended_lines(log_file):
+    reader = TailReader(str(log_file))
+    assert reader.read() == b"a,b\n1,2\n3,4\n"
+    assert reader.read() == b""
+
+    with open(log_file, "ab") as f:
+        f.write(b"5,6\n")
+    assert reader.read() == b"5,6\n"
+    assert reader.lines == 4
+
+
+def test_tail_reader_holds_back_partial_line(log_file):
+    reader = TailReader(str(log_file))
+    reader.read()
+
+    with open(log_file, "ab") as f:
+        f.write(b"5,")
+    assert reader.read() == b""
+
+    with open(log_file, "ab") as f:
+        f.write(b"6\n7,")
+    assert reader.read() == b"5,6\n"
+
+
+def test_tail_reader_max_lines(log_file):
+    reader = TailReader(str(log_file), block_size=2)
+    assert reader.read(max_lines=2) == b"a,b\n1,2\n"
+    assert reader.read(max_lines=2) == b"3,4\n"
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, 3])
+def test_tail_reader_unread_lines(log_file, n):
+    reader = TailReader(str(log_file))
+    data = reader.read()
+    reader.unread_lines(n)
+    assert reader.lines == 3 - n
+    assert reader.read() == b"".join(data.splitlines(keepends=True)[3 - n:])
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, 3])
+def test_tail_reader_seek_line(log_file, n):
+    reader = TailReader(str(log_file), block_size=3)
+    reader.seek_line(n)
+    assert reader.read() == b"".join(log_file.read_bytes().splitlines(keepends=True)[n:])
+
+
+def test_tail_reader_read_partial_line(log_file):
+    reader = TailReader(str(log_file))
+    with open(log_file, "ab") as f:
+        f.write(b"5,")
+    assert reader.read_partial_line() == b""
+    reader.read()
+    assert reader.read_partial_line() == b"5,"
+    assert reader.read() == b""
@@ -0,0 +1,77 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_eng_utokyo._utilities.time_conversion import (
+    parse_timestamps,
+    parse_timestamp,
+    timestamps_to_datetimes,
+    datetimes_to_timestamps,
+    add_time_columns,
+    to_timestamp,
+    parse_seconds_to_ns,
+    ticks_to_ns,
+)
+
+
+@pytest.mark.parametrize(["value", "time_format", "expected"], [
+    ("2022/03/14 10:07:41", "%Y/%m/%d %H:%M:%S", "2022-03-14 10:07:41"),
+    ("2022/03/15 08:18:00.266", "%Y/%m/%d %H:%M:%S.%f", "2022-03-15 08:18:00.266"),
+    ("15.03.2022, 08:46:39.387", "%d.%m.%Y, %H:%M:%S.%f", "2022-03-15 08:46:39.387"),
+])
+def test_parse_timestamp_formats(value, time_format, expected):
+    assert parse_timestamp(value, time_format) == pd.Timestamp(expected).value
+
+
+@pytest.mark.parametrize("value", ["", "2022/03/1"])
+def test_parse_timestamp_raises_on_invalid_strings(value):
+    with pytest.raises(ValueError):
+        parse_timestamp(value, "%Y/%m/%d %H:%M:%S")
+
+
+def test_parse_timestamps_is_exact_int64():
+    timestamps = parse_timestamps(pd.Series(["2022/03/15 08:18:00.266", "2022/03/15 08:18:01.507"]),
+                                  "%Y/%m/%d %H:%M:%S.%f")
+    assert timestamps.dtype == np.int64
+    assert timestamps[1] - timestamps[0] == 1241000000
+
+
+def test_timestamps_roundtrip():
+    timestamps = np.array([1647252474553786001, 1647252474553786002], dtype=np.int64)
+    datetimes = timestamps_to_datetimes(timestamps)
+    assert datetimes.dtype == np.dtype("datetime64[ns]")
+    assert (datetimes_to_timestamps(datetimes) == timestamps).all()
+
+
+def test_add_time_columns():
+    df = pd.DataFrame({"x": [1, 2]})
+    add_time_columns(df, [0, 1000000000])
+    assert df["timestamp"].dtype == np.int64
+    assert df["datetime"].iloc[1] == pd.Timestamp("1970-01-01 00:00:01")
+
+
+def test_to_timestamp():
+    expected = parse_timestamp("2022/03/14 10:07:41", "%Y/%m/%d %H:%M:%S")
+    assert to_timestamp(expected) == expected
+    assert to_timestamp(dt.datetime(2022, 3, 14, 10, 7, 41)) == expected
+    assert to_timestamp("2022-03-14 10:07:41") == expected
+    assert to_timestamp(np.datetime64("2022-03-14T10:07:41")) == expected
+
+
+@pytest.mark.parametrize("resolution, ticks, expected", [
+    ("1.000000e-009", [0, 7], [0, 7]),
+    ("1.000000e-006", [3, 2 * 10**12], [3000, 2 * 10**15]),
+    ("2.500000e-009", [1, 2, 4 * 10**12 + 1], [3, 5, 10**13 + 3]),
+    ("3.333333e-010", [3, 10**13], [1, 3333333 * 10**6]),
+])
+def test_ticks_to_ns_is_exact(resolution, ticks, expected):
+    ns_per_tick = parse_seconds_to_ns(resolution)
+    assert ticks_to_ns(np.array(ticks), ns_per_tick).tolist() == expected
+
+
+def test_ticks_to_ns_keeps_the_order_of_close_pulses():
+    start_ns = 1_647_220_074 * 10**9
+    timestamps = start_ns + ticks_to_ns(np.arange(7 * 10**12, 7 * 10**12 + 100), parse_seconds_to_ns("1e-9"))
+    assert (np.diff(timestamps) == 1).all()
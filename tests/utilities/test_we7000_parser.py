@@ -0,0 +1,27 @@
+import pandas as pd
+import pytest
+
+from src.data_eng_utokyo._utilities.general_constants import unittest_long_loc
+from src.data_eng_utokyo._utilities.we7000_parser import parse_list_mode, parse_list_mode_file
+
+
+@pytest.mark.parametrize("block_bytes", [1, 100, 1 << 22])
+def test_parse_list_mode_equals_pandas(block_bytes):
+    expected_df = pd.read_csv(
+        unittest_long_loc.ssd, skiprows=38, header=None, names=["TraceName", "Time_x", "PulseHeight"])
+    with open(unittest_long_loc.ssd, "rb") as f:
+        data = f.read()
+    for buffer in (data, data.rstrip(b"\n")):
+        df = parse_list_mode(buffer, header_lines=38, block_bytes=block_bytes)
+        assert df.dtypes.tolist() == ["int64", "int64", "int16"]
+        pd.testing.assert_frame_equal(df, expected_df, check_dtype=False)
+    assert parse_list_mode_file(unittest_long_loc.ssd, header_lines=38).equals(df)
+
+
+@pytest.mark.parametrize("data", [b"1,2\n", b"1,2,3,4\n", b"1,2,3\n4,,6\n", b"1,2,x\n", b"1,2,40000\n"])
+def test_parse_list_mode_rejects_other_formats(data):
+    assert parse_list_mode(data) is None
+
+
+def test_parse_list_mode_of_empty_buffer():
+    assert len(parse_list_mode(b"header\n", header_lines=1).index) == 0